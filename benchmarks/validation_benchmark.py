@@ -0,0 +1,125 @@
+"""
+Measures the Pydantic work per fetched record.
+
+Compares the two ways a batch of fetched records reaches the database:
+
+- per record: each worker builds a model, the models are pickled back to the parent process, wrapped in the list
+  model and dumped one by one;
+- per batch: the workers return plain dictionaries, the parent validates the batch once through a cached
+  TypeAdapter, builds the list model with `model_construct` and dumps the batch in one call.
+
+Run from the root of the repository, with the environment configured for the ETL:
+
+    python benchmarks/validation_benchmark.py --records 5000
+"""
+
+import argparse
+import pickle
+import time
+
+from steam_sales.steam_etl.validation import (
+    Game,
+    GameDetails,
+    GameDetailsList,
+    GameList,
+    get_list_adapter,
+    validate_batch,
+)
+
+
+def make_steamspy_record(appid: int) -> dict:
+    return {
+        "appid": appid,
+        "name": f"Game {appid}",
+        "developer": "Valve",
+        "publisher": "Valve",
+        "score_rank": "",
+        "positive": 1000,
+        "negative": 100,
+        "userscore": 0,
+        "owners": "1,000,000 .. 2,000,000",
+        "average_forever": 300,
+        "average_2weeks": 20,
+        "median_forever": 150,
+        "median_2weeks": 10,
+        "price": "999",
+        "initialprice": "999",
+        "discount": "0",
+        "ccu": 50,
+        "languages": "English, French, German",
+        "genre": "Action",
+        "tags": {"Action": 500, "Indie": 200, "Multiplayer": 50},
+    }
+
+
+def make_steam_record(appid: int) -> dict:
+    return {
+        "appid": appid,
+        "name": f"Game {appid}",
+        "type": "game",
+        "required_age": "0",
+        "is_free": False,
+        "controller_support": "full",
+        "dlc": [1, 2, 3],
+        "detailed_description": "A game. " * 50,
+        "short_description": "A game.",
+        "about_the_game": "About the game. " * 30,
+        "supported_languages": "English, French",
+        "reviews": None,
+        "header_image": "https://cdn.akamai.steamstatic.com/steam/apps/10/header.jpg",
+        "capsule_image": "https://cdn.akamai.steamstatic.com/steam/apps/10/capsule.jpg",
+        "website": "https://www.example.com",
+        "requirements": {"minimum": "OS: Windows 10"},
+        "developers": ["Valve"],
+        "publishers": ["Valve"],
+        "price_overview": {"currency": "USD", "initial": 999, "final": 999, "discount_percent": 0},
+        "platform": {"windows": True, "mac": False, "linux": True},
+        "metacritic": 80,
+        "categories": [{"id": 2, "description": "Single-player"}],
+        "genres": [{"id": "1", "description": "Action"}],
+        "recommendations": 1000,
+        "achievements": 20,
+        "release_date": "Nov 1, 2000",
+        "coming_soon": False,
+    }
+
+
+def per_record(model, list_model, records: list):
+    results = pickle.loads(pickle.dumps([model(**record) for record in records]))
+    games = list_model(games=results)
+    return [game.model_dump() for game in games.games]
+
+
+def per_batch(model, list_model, records: list):
+    results = pickle.loads(pickle.dumps(records))
+    games = list_model.model_construct(games=validate_batch(model, results))
+    return get_list_adapter(model).dump_python(games.games)
+
+
+def measure(func, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--records", type=int, default=5000, help="Number of records per batch.")
+    args = parser.parse_args()
+
+    print(f"{'Model':<12} {'Per record (us)':>16} {'Per batch (us)':>16} {'Speedup':>8}")
+    for model, list_model, make_record in [
+        (GameDetails, GameDetailsList, make_steamspy_record),
+        (Game, GameList, make_steam_record),
+    ]:
+        records = [make_record(appid) for appid in range(args.records)]
+        baseline = measure(per_record, model, list_model, records) / args.records * 1e6
+        batched = measure(per_batch, model, list_model, records) / args.records * 1e6
+        print(f"{model.__name__:<12} {baseline:>16.2f} {batched:>16.2f} {baseline / batched:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,25 @@
-from typing import Annotated
+from datetime import timedelta
+from typing import Annotated, List, Optional
 
 import typer
 
-from steam_sales.steam_etl import SteamDataClean, SteamSpyFetcher, SteamSpyMetadataFetcher, SteamStoreFetcher
+from steam_sales.steam_etl import (
+    AppDetailsFields,
+    CleanDataExporter,
+    CleanerBackend,
+    FetchOrder,
+    PlayerCountSampler,
+    RefreshScheduler,
+    RegionalPriceFetcher,
+    SteamDataClean,
+    SteamPriceFetcher,
+    SteamReviewFetcher,
+    SteamSpyFetcher,
+    SteamSpyMetadataFetcher,
+    SteamStoreFetcher,
+    ValidationMode,
+)
+from steam_sales.steam_etl.settings import Path
 
 app = typer.Typer(name="steamstore", help="CLI for Steam Store Data Ingestion ETL Pipeline")
 
@@ -26,14 +43,36 @@ def fetch_steamspy_metadata(max_pages: Annotated[int, typer.Option(help="Number
 @app.command(name="fetch_steamspy_data", help="Fetch from SteamSpy Database and ingest data into Custom Database")
 def fetch_steamspy_data(
     batch_size: Annotated[int, typer.Option(help="Number of records to process in each batch.")] = 1000,
+    refresh: Annotated[bool, typer.Option(help="Fetch every known app ID again, skipping unchanged ones.")] = False,
+    bulk: Annotated[
+        bool, typer.Option(help="Read the data from the paged bulk responses instead of one request per app.")
+    ] = False,
+    max_pages: Annotated[int, typer.Option(help="Number of pages to read in bulk mode.")] = 100,
+    details_max_age: Annotated[
+        int, typer.Option(help="Days after which the tags, languages and genre of a game are requested again.")
+    ] = 30,
 ):
     """
     Fetches SteamSpy data using the specified batch size.
 
     Parameters:
         - batch_size (int): The number of records to fetch in each batch. Defaults to 1000.
+        - refresh (bool): If set to True, every known app ID is fetched again instead of the new ones only. Games whose
+        payload did not change since they were stored are skipped. Defaults to False.
+        - bulk (bool): If set to True, the data of every game is read from the `request=all` pages, 1000 games per
+        request, which also fill the metadata table. Games are only requested one by one when their tags, languages
+        and genre, which the pages lack, are missing or stale. Defaults to False.
+        - max_pages (int): The number of pages to read in bulk mode. Defaults to 100.
+        - details_max_age (int): The number of days after which the tags, languages and genre of a game are requested
+        again in bulk mode. Defaults to 30.
     """
-    fetcher = SteamSpyFetcher(batch_size=batch_size)
+    fetcher = SteamSpyFetcher(
+        batch_size=batch_size,
+        refresh=refresh,
+        bulk=bulk,
+        max_pages=max_pages,
+        details_max_age=timedelta(days=details_max_age),
+    )
     fetcher.run()
     typer.echo("SteamSpy data fetched successfully.", color=typer.colors.GREEN)
 
@@ -45,6 +84,19 @@ def fetch_steamstore_data(
         int, typer.Option(help="Factor to determine when to perform a bulk insert (batch_size * bulk_factor).")
     ] = 10,
     reverse: Annotated[bool, typer.Option(help="Process app IDs in reverse order.")] = False,
+    refresh: Annotated[bool, typer.Option(help="Fetch every known app ID again, skipping unchanged ones.")] = False,
+    changes: Annotated[
+        bool, typer.Option(help="Fetch only the apps the Steam change feed reports as modified since the last run.")
+    ] = False,
+    fields: Annotated[
+        AppDetailsFields, typer.Option(help="Request only the fields the fetcher reads, or the full documents.")
+    ] = AppDetailsFields.parsed,
+    order: Annotated[
+        FetchOrder, typer.Option(help="Fetch the most popular games on SteamSpy first, or in app ID order.")
+    ] = FetchOrder.popularity,
+    sample_payloads: Annotated[
+        bool, typer.Option(help="Also request 1 app in 100 in full to measure the bytes saved by the field filters.")
+    ] = False,
 ):
     """
     This command fetches unique app IDs from the Steam Store Database, processes the data in batches,
@@ -56,26 +108,228 @@ def fetch_steamstore_data(
         - bulk_factor (int): Determines when to perform a bulk insert. Data is ingested in bulk when the
         number of processed games reaches batch_size * bulk_factor. Default is 10.
         - reverse (bool): If set to True, the app IDs are processed in reverse order. Default is False.
+        - refresh (bool): If set to True, every known app ID is fetched again instead of the new ones only. Games whose
+        payload did not change since they were stored are neither parsed, validated nor written. Default is False.
+        - changes (bool): If set to True, only the apps reported by the Steam app list change feed as modified since
+        the last `steam` run are fetched. The feed needs `STEAM_API_KEY`; `STEAM_API_BASE_URL` can point to a local
+        stand-in of the API. Default is False.
+        - fields (AppDetailsFields): `parsed` requests only the appdetails fields the fetcher reads, leaving out
+        screenshots, movies, packages and the other fields it does not store. `all` requests the full documents.
+        Default is parsed.
+        - order (FetchOrder): `popularity` fetches the games with the most SteamSpy owners, concurrent users and
+        reviews first, so that an interrupted run has already stored the most valuable games. `appid` fetches them in
+        app ID order. Default is popularity.
+        - sample_payloads (bool): If set to True with the `parsed` fields, one app in 100 on average, drawn at random,
+        is requested a second time without filters, and the bytes saved per request by the filters are logged. This
+        costs one extra request per sampled app. Default is False.
     """
-    fetcher = SteamStoreFetcher(batch_size=batch_size, bulk_factor=bulk_factor, reverse=reverse)
+    fetcher = SteamStoreFetcher(
+        batch_size=batch_size,
+        bulk_factor=bulk_factor,
+        reverse=reverse,
+        refresh=refresh,
+        changes=changes,
+        fields=fields,
+        order=order,
+        sample_payloads=sample_payloads,
+    )
     fetcher.run()
     typer.echo("SteamStore data fetched successfully.", color=typer.colors.GREEN)
 
 
+@app.command(name="refresh_prices", help="Refresh the prices of the paid Steam Store games with batched requests")
+def refresh_prices(
+    batch_size: Annotated[int, typer.Option(help="Number of app IDs to request prices for at once.")] = 250,
+):
+    """
+    Refreshes the prices of the paid games stored in the database. The prices of `batch_size` games are requested at
+    once, filtered down to their price overview. Prices that changed are appended to the `price_snapshots` history and
+    written to the raw rows, so that the next cleaning run picks them up.
+
+    Parameters:
+        - batch_size (int): The number of app IDs to request prices for at once. Default is 250.
+    """
+    fetcher = SteamPriceFetcher(batch_size=batch_size)
+    fetcher.run()
+    typer.echo("Steam prices refreshed successfully.", color=typer.colors.GREEN)
+
+
+@app.command(name="refresh_stale", help="Fetch the most overdue SteamSpy and Steam Store records again")
+def refresh_stale(
+    budget: Annotated[int, typer.Option(help="Maximum number of records, and requests, per run.")] = 1000,
+):
+    """
+    Fetches the raw SteamSpy and Steam Store records whose refresh deadline has passed, most overdue first. The
+    deadline of a record is the time it was last fetched plus a time-to-live, from a day for upcoming and popular
+    games to a month for games without players, so the catalogue stays fresh without fetching everything again.
+
+    Parameters:
+        - budget (int): The maximum number of records fetched again, one request each. Default is 1000.
+    """
+    scheduler = RefreshScheduler(budget=budget)
+    scheduler.run()
+    typer.echo("Stale records refreshed successfully.", color=typer.colors.GREEN)
+
+
+@app.command(
+    name="collect_regional_prices", help="Collect the prices of the paid games in the stores of several countries"
+)
+def collect_regional_prices(
+    batch_size: Annotated[int, typer.Option(help="Number of app IDs to request prices for at once.")] = 250,
+    regions: Annotated[
+        Optional[List[str]], typer.Option(help="Country code of a store, repeatable. Defaults to PRICE_REGIONS.")
+    ] = None,
+    requests_per_minute: Annotated[int, typer.Option(help="Maximum number of requests per minute.")] = 40,
+    max_workers: Annotated[int, typer.Option(help="Number of regions requested in parallel.")] = 8,
+):
+    """
+    Collects the prices of the paid games in the store of every configured country. The regions are requested in
+    parallel under one shared rate limit, the prices are converted to USD with `CURRENCY_RATES` and the latest price
+    per game and country is stored in the `regional_prices` table.
+
+    Parameters:
+        - batch_size (int): The number of app IDs to request prices for at once. Default is 250.
+        - regions (List[str], optional): The country codes of the stores. Default is `PRICE_REGIONS` of the settings.
+        - requests_per_minute (int): The maximum number of requests per minute, over all regions. Default is 40.
+        - max_workers (int): The number of regions requested in parallel. Default is 8.
+    """
+    fetcher = RegionalPriceFetcher(
+        batch_size=batch_size, regions=regions, requests_per_minute=requests_per_minute, max_workers=max_workers
+    )
+    fetcher.run()
+    typer.echo("Regional prices collected successfully.", color=typer.colors.GREEN)
+
+
+@app.command(name="fetch_reviews", help="Stream the user reviews of the Steam Store games into the Custom Database")
+def fetch_reviews(
+    batch_size: Annotated[int, typer.Option(help="Number of games read concurrently and written together.")] = 50,
+    max_pages: Annotated[
+        int, typer.Option(help="Maximum number of pages of newer and of older reviews read per game.")
+    ] = 50,
+    requests_per_minute: Annotated[int, typer.Option(help="Maximum number of requests per minute.")] = 60,
+    max_workers: Annotated[int, typer.Option(help="Number of games read in parallel.")] = 8,
+):
+    """
+    Streams the user reviews of the Steam Store games into the `game_reviews` table, page by page with the cursor of
+    the reviews endpoint. The cursor of every game is stored, so later runs read the reviews posted since the last
+    run and continue the backfill of the older reviews where it stopped.
+
+    Parameters:
+        - batch_size (int): The number of games read concurrently and written together. Default is 50.
+        - max_pages (int): The maximum number of pages of newer and of older reviews read per game and run. A read of
+        the newer reviews that stops before the stored ones is resumed on the next run. Default is 50.
+        - requests_per_minute (int): The maximum number of requests per minute, over all games. Default is 60.
+        - max_workers (int): The number of games read in parallel. Default is 8.
+    """
+    fetcher = SteamReviewFetcher(
+        batch_size=batch_size, max_pages=max_pages, requests_per_minute=requests_per_minute, max_workers=max_workers
+    )
+    fetcher.run()
+    typer.echo("Reviews fetched successfully.", color=typer.colors.GREEN)
+
+
+@app.command(name="sample_player_counts", help="Sample the current player counts of the most played games continuously")
+def sample_player_counts(
+    top_n: Annotated[int, typer.Option(help="Number of games with the highest ccu to sample.")] = 500,
+    interval: Annotated[int, typer.Option(help="Minutes between the start of two samples.")] = 10,
+    samples: Annotated[
+        Optional[int], typer.Option(help="Number of samples to take. Runs until stopped if unset.")
+    ] = None,
+    requests_per_minute: Annotated[int, typer.Option(help="Maximum number of requests per minute.")] = 600,
+    max_workers: Annotated[int, typer.Option(help="Number of requests sent in parallel.")] = 32,
+):
+    """
+    Samples the current number of players of the games with the highest `ccu` every few minutes and appends them to
+    the `player_counts` table. The requests are sent in parallel over keep-alive connections and the samples are
+    inserted in batches, so the sampler can run continuously next to the rest of the pipeline. A sample that fails,
+    for example when the database connection is lost, is logged and the sampler carries on with the next one.
+
+    Parameters:
+        - top_n (int): The number of games with the highest ccu to sample. Default is 500.
+        - interval (int): The number of minutes between the start of two samples. Default is 10.
+        - samples (int, optional): The number of samples to take. Default is None, which samples until stopped.
+        - requests_per_minute (int): The maximum number of requests per minute. Default is 600.
+        - max_workers (int): The number of requests sent in parallel. Default is 32.
+    """
+    sampler = PlayerCountSampler(
+        top_n=top_n,
+        interval=timedelta(minutes=interval),
+        samples=samples,
+        requests_per_minute=requests_per_minute,
+        max_workers=max_workers,
+    )
+    sampler.run()
+    typer.echo("Player counts sampled successfully.", color=typer.colors.GREEN)
+
+
 @app.command(name="clean_steam_data", help="Clean the Steam Data and ingest into the Custom Database")
 def clean_steam_data(
     batch_size: Annotated[int, typer.Option(help="Number of records to process in each batch.")] = 1000,
+    validation: Annotated[
+        ValidationMode, typer.Option(help="How records are validated against the Clean schema before writing.")
+    ] = ValidationMode.columnar,
+    profile: Annotated[bool, typer.Option(help="Profile the cleaning stages and write a report.")] = False,
+    backend: Annotated[
+        CleanerBackend, typer.Option(help="DataFrame library used to run the cleaning stages.")
+    ] = CleanerBackend.pandas,
+    normalize_entities: Annotated[
+        bool, typer.Option(help="Map developer and publisher name variants to canonical names.")
+    ] = False,
+    memory_budget: Annotated[
+        Optional[int], typer.Option(help="Clean in appid chunks that fit in this many megabytes of memory.")
+    ] = None,
 ):
     """
     Cleans the Steam data by running the SteamDataClean class with the specified batch size.
 
     Parameters:
         - batch_size (int): The number of records to process in each batch. Default is 1000.
+        - validation (ValidationMode): How records are validated against the `Clean` schema before they are written.
+        `columnar` checks whole columns at once and quarantines the invalid records in the `quarantined_games` table,
+        `pydantic` builds a `Clean` model per record and fails the batch on the first invalid one, and `none` skips
+        validation. Default is columnar.
+        - profile (bool): If set to True, the wall time, CPU time, memory and row counts of every cleaning stage are
+        written to a JSON report in the logs directory and printed as a table. Profiling traces every memory allocation,
+        which slows the cleaning down noticeably. Default is False.
+        - backend (CleanerBackend): The DataFrame library used to run the cleaning stages, `pandas` or `polars`. The
+        Polars backend runs the stages as a single multi-threaded lazy query and produces the same records. When
+        profiling, the Polars stages are run one at a time so that each is reported on its own. Default is pandas.
+        - normalize_entities (bool): If set to True, variants of the same developer or publisher name are mapped to
+        one canonical name. The mapping is stored in the `entity_aliases` table and only names that were never seen
+        before are compared. Default is False.
+        - memory_budget (int, optional): If set, the records are read, cleaned, merged and written in consecutive
+        appid ranges sized to keep the memory used within this number of megabytes. Default is None, which cleans
+        all records at once.
     """
-    cleaner = SteamDataClean(batch_size=batch_size)
+    cleaner = SteamDataClean(
+        batch_size=batch_size,
+        validation=validation,
+        profile=profile,
+        backend=backend,
+        normalize_entities=normalize_entities,
+        memory_budget=memory_budget,
+    )
     cleaner.ingest()
     typer.echo("Steam data cleaned successfully.", color=typer.colors.GREEN)
 
 
+@app.command(name="export", help="Export the clean game data to a Parquet dataset partitioned by release year")
+def export(
+    output_dir: Annotated[str, typer.Option(help="Directory of the Parquet dataset.")] = Path.parquet_export,
+    full_refresh: Annotated[bool, typer.Option(help="Rewrite the whole dataset instead of updating it.")] = False,
+):
+    """
+    Exports the `clean_game_data` table to a Parquet dataset partitioned by release year. After the first export,
+    only the rows updated since the last export are read and merged into the dataset.
+
+    Parameters:
+        - output_dir (str): The directory of the Parquet dataset. Default is `data/clean_game_data`.
+        - full_refresh (bool): If set to True, the dataset is rewritten from scratch. Default is False.
+    """
+    exporter = CleanDataExporter(output_dir=output_dir, full_refresh=full_refresh)
+    exporter.run()
+    typer.echo("Clean game data exported successfully.", color=typer.colors.GREEN)
+
+
 if __name__ == "__main__":
     app()
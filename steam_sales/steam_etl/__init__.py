@@ -1,11 +1,33 @@
-from .cleaner import SteamDataClean, SteamSpyCleaner, SteamStoreCleaner
-from .fetcher import SteamSpyFetcher, SteamSpyMetadataFetcher, SteamStoreFetcher
+from .cleaner import CleanerBackend, SteamDataClean, SteamSpyCleaner, SteamStoreCleaner, ValidationMode
+from .exporter import CleanDataExporter
+from .fetcher import (
+    AppDetailsFields,
+    FetchOrder,
+    PlayerCountSampler,
+    RegionalPriceFetcher,
+    SteamPriceFetcher,
+    SteamReviewFetcher,
+    SteamSpyFetcher,
+    SteamSpyMetadataFetcher,
+    SteamStoreFetcher,
+)
+from .scheduler import RefreshScheduler
 
 __all__ = [
+    "AppDetailsFields",
+    "CleanDataExporter",
+    "CleanerBackend",
+    "FetchOrder",
+    "PlayerCountSampler",
+    "RefreshScheduler",
+    "RegionalPriceFetcher",
     "SteamDataClean",
+    "SteamPriceFetcher",
+    "SteamReviewFetcher",
     "SteamSpyCleaner",
     "SteamStoreCleaner",
     "SteamSpyFetcher",
     "SteamSpyMetadataFetcher",
     "SteamStoreFetcher",
+    "ValidationMode",
 ]
@@ -1,50 +1,105 @@
 import json
+import os
+import tempfile
 import warnings
 from abc import ABC, abstractmethod
 from ast import literal_eval
+from datetime import datetime, timedelta
+from enum import Enum
+from multiprocessing import Pool
 
 import dateparser
 import numpy as np
 import pandas as pd
+import pyarrow.feather as feather
 from bs4 import BeautifulSoup
 from deep_translator import GoogleTranslator
+from rich.console import Console
 from tqdm import tqdm
 
-from steam_sales.steam_etl.crud import bulk_ingest_clean_data
-from steam_sales.steam_etl.db import get_db
-from steam_sales.steam_etl.settings import get_logger
+from steam_sales.steam_etl.columnar_validation import ColumnarValidator
+from steam_sales.steam_etl.crud import (
+    bulk_replace_game_facets,
+    bulk_upsert_clean_records,
+    game_facets_exist,
+    get_last_run_time,
+    log_last_run_time,
+    release_quarantined_games,
+    upsert_quarantined_games,
+)
+from steam_sales.steam_etl.db import engine, get_db
+from steam_sales.steam_etl.normalizer import EntityNormalizer
+from steam_sales.steam_etl.profiler import StageProfiler
+from steam_sales.steam_etl.settings import Path, config, get_logger
 from steam_sales.steam_etl.utils import get_sql_query
-from steam_sales.steam_etl.validation import Clean, CleanList
+from steam_sales.steam_etl.validation import Clean, CleanList, LastRun, get_current_utc_time
 
 warnings.filterwarnings("ignore")
 
+ALL_APPIDS = (0, 2**31 - 1)
+
 
 class BaseCleaner(ABC):
     """
     Base class for common data cleaning methods.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, profile: bool = False):
+        self.profiler = StageProfiler() if profile else None
+        self.dtypes = {}
 
-    def fetch_data(self, source: str) -> pd.DataFrame:
+    def fetch_data(self, source: str, params: dict = None) -> pd.DataFrame:
         """
         Fetches data from the specified source and returns it as a pandas DataFrame.
 
         Parameters:
         - source (str): The source from which to fetch the data.
+        - params (dict, optional): Values for the bind parameters of the query. Defaults to None.
 
         Returns:
         - df (pd.DataFrame): The fetched data as a pandas DataFrame.
         """
         with get_db() as db:
             query = get_sql_query(source)
-            result = db.execute(query)
+            result = db.execute(query, params)
             data = result.fetchall()
             columns = result.keys()
 
         df = pd.DataFrame(data, columns=columns)
-        return df
+        return self.apply_dtypes(df)
+
+    def apply_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts the columns of the given DataFrame to the compact dtypes declared in `self.dtypes`.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to convert.
+
+        Returns:
+            pd.DataFrame: The converted DataFrame.
+        """
+        dtypes = {col: dtype for col, dtype in self.dtypes.items() if col in df.columns}
+        return df.astype(dtypes)
+
+    def map_values(self, series: pd.Series, func) -> pd.Series:
+        """
+        Applies a function once per distinct value of a Series instead of once per row.
+
+        Missing values are left untouched. The result is categorical, so repeated values are stored once.
+
+        Args:
+            series (pd.Series): The Series to map.
+            func (callable): The function to apply to each distinct value.
+
+        Returns:
+            pd.Series: The mapped Series.
+        """
+        values = series.astype("category")
+        mapped_codes, mapped = pd.factorize(values.cat.categories.map(func))
+
+        codes = values.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, mapped_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=mapped), index=series.index, name=series.name)
 
     def process_null(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -57,7 +112,13 @@ class BaseCleaner(ABC):
             pd.DataFrame: The processed DataFrame with null values replaced.
         """
         convert_to_none = ["", " ", "None", "none", "null", "N/a", "n/a", "N/A", "NA", '["none"]', '["null"]', "{}"]
-        df.replace(convert_to_none, None, inplace=True)
+
+        categorical = df.select_dtypes("category").columns
+        for col in categorical:
+            df[col] = df[col].cat.remove_categories(df[col].cat.categories.intersection(convert_to_none))
+
+        others = df.columns.difference(categorical, sort=False)
+        df[others] = df[others].replace(convert_to_none, None)
         return df
 
     def safe_literal_eval(self, val):
@@ -85,6 +146,8 @@ class BaseCleaner(ABC):
         """
         Process the given DataFrame using a list of process functions and display a progress bar.
 
+        If profiling is enabled, the resource usage of every function is recorded by the cleaner's profiler.
+
         Args:
             df (pd.DataFrame): The DataFrame to be processed.
             process_functions (list): A list of functions to be applied to the DataFrame.
@@ -94,7 +157,10 @@ class BaseCleaner(ABC):
             pd.DataFrame: The processed DataFrame.
         """
         for func in tqdm(process_functions, desc=f"Processing {df_name} DataFrame"):
-            df = func(df)
+            if self.profiler:
+                df = self.profiler.profile(func, df, df_name)
+            else:
+                df = func(df)
         return df
 
     @abstractmethod
@@ -123,8 +189,8 @@ class SteamSpyCleaner(BaseCleaner):
     Class for cleaning SteamSpy data.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, profile: bool = False):
+        super().__init__(profile=profile)
         self.logger = get_logger(self.__class__.__name__)
 
         self.col_to_drop = [
@@ -141,11 +207,29 @@ class SteamSpyCleaner(BaseCleaner):
             "ccu",  # not interested in temporally specific columns
         ]
 
+        self.dtypes = {
+            "name": "string[pyarrow]",
+            "developer": "category",
+            "publisher": "category",
+            "positive": "Int32",
+            "negative": "Int32",
+            "owners": "category",
+            "average_forever": "Int32",
+            "median_forever": "Int32",
+            "languages": "category",
+            "genre": "category",
+        }
+
     def process_col_rows(self, df: pd.DataFrame) -> pd.DataFrame:
         df.dropna(subset=["name", "languages", "tags"], inplace=True)
         df.drop(columns=self.col_to_drop, inplace=True)
         return df
 
+    @staticmethod
+    def parse_owners(x):
+        lower, upper = map(lambda x: int(x) / 1000000, x.replace(",", "").split(" .. "))
+        return f"{lower} - {upper}"
+
     def process_owners(self, df):
         """
         Process the 'owners' column in the given DataFrame.
@@ -170,11 +254,7 @@ class SteamSpyCleaner(BaseCleaner):
         2  10 - 100
         """
 
-        df["owners"] = (
-            df["owners"]
-            .apply(lambda x: tuple(map(lambda x: int(x) / 1000000, x.replace(",", "").split(" .. "))))
-            .apply(lambda x: f"{x[0]} - {x[1]}")
-        )
+        df["owners"] = self.map_values(df["owners"], self.parse_owners)
         return df
 
     def rename(self, df):
@@ -193,8 +273,11 @@ class SteamSpyCleaner(BaseCleaner):
         process_functions = [self.process_null, self.process_col_rows, self.process_owners, self.rename]
         return self.process_with_progress(df, process_functions, "SteamSpy")
 
-    def run(self):
-        steamspy_df = self.fetch_data("get_new_steamspy_data.sql")
+    def run(self, since: datetime, appid_range: tuple = ALL_APPIDS):
+        start_appid, end_appid = appid_range
+        steamspy_df = self.fetch_data(
+            "get_new_steamspy_data.sql", {"since": since, "start_appid": start_appid, "end_appid": end_appid}
+        )
         # steamspy_df = self.fetch_data("get_all_steamspy_data.sql")
         self.logger.info(f"{steamspy_df.shape[0]} new records found")
         cleaned_steamspy_df = self.process(steamspy_df)
@@ -208,11 +291,34 @@ class SteamStoreCleaner(BaseCleaner):
     Class for cleaning Steam data.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, profile: bool = False):
+        super().__init__(profile=profile)
         self.logger = get_logger(self.__class__.__name__)
 
-        self.currency_rates = {"EUR": 1.08, "TWD": 0.03, "SGD": 0.74, "BRL": 0.18, "AUD": 0.67}
+        self.currency_rates = config.CURRENCY_RATES
+
+        self.dtypes = {
+            "type": "category",
+            "name": "string[pyarrow]",
+            "required_age": "Int16",
+            "is_free": "Int8",
+            "controller_support": "category",
+            "dlc": "category",
+            "supported_languages": "category",
+            "header_image": "string[pyarrow]",
+            "capsule_image": "string[pyarrow]",
+            "website": "string[pyarrow]",
+            "developers": "category",
+            "publishers": "category",
+            "platform": "category",
+            "metacritic": "Int16",
+            "categories": "category",
+            "genres": "category",
+            "recommendations": "Int32",
+            "achievements": "Int32",
+            "release_date": "category",
+            "coming_soon": "Int8",
+        }
 
     def process_age(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -236,12 +342,13 @@ class SteamStoreCleaner(BaseCleaner):
         return ";".join(platform for platform in d.keys() if d[platform])
 
     def process_platforms(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["platform"] = df["platform"].apply(self.parse_platforms)
+        df["platform"] = self.map_values(df["platform"], self.parse_platforms)
         return df
 
     def process_language(self, df: pd.DataFrame) -> pd.DataFrame:
         df.dropna(subset=["supported_languages"], inplace=True)
-        df["english"] = df["supported_languages"].apply(lambda x: 1 if "english" in x.lower() else 0)
+        df["english"] = self.map_values(df["supported_languages"], lambda x: 1 if "english" in x.lower() else 0)
+        df["english"] = df["english"].astype("int64")
         df.drop("supported_languages", axis=1, inplace=True)
         return df
 
@@ -255,8 +362,8 @@ class SteamStoreCleaner(BaseCleaner):
         df = df[~df["publishers"].str.contains(pattern, na=False)]
         df = df[~df["developers"].str.contains(";", na=False)]
         df = df[~df["publishers"].str.contains(";", na=False)]
-        df["developer"] = df["developers"].apply(self.safe_literal_eval)
-        df["publisher"] = df["publishers"].apply(self.safe_literal_eval)
+        df["developer"] = self.map_values(df["developers"], self.safe_literal_eval)
+        df["publisher"] = self.map_values(df["publishers"], self.safe_literal_eval)
         df.drop(columns=["developers", "publishers"], inplace=True)
         return df
 
@@ -292,16 +399,25 @@ class SteamStoreCleaner(BaseCleaner):
         except Exception:
             return text
 
+    @staticmethod
+    def parse_descriptions(x):
+        return ";".join(item["description"] for item in literal_eval(x))
+
     def process_categories_and_genres(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df[(df["categories"].notna()) & (df["genres"].notna())]
+        non_english = df["english"] == 0
         for col in ["categories", "genres"]:
-            df[col] = df[col].apply(lambda x: ";".join(item["description"] for item in literal_eval(x)))
-        df.loc[df["english"] == 0, "genres"] = df.loc[df["english"] == 0, "genres"].apply(self.translate)
-        df.loc[df["english"] == 0, "categories"] = df.loc[df["english"] == 0, "categories"].apply(self.translate)
+            df[col] = self.map_values(df[col], self.parse_descriptions)
+
+            # Translate each distinct value used by a non-English game once
+            translations = {value: self.translate(value) for value in df.loc[non_english, col].unique()}
+            values = df[col].astype(object)
+            values[non_english] = values[non_english].map(translations)
+            df[col] = values.astype("category")
         return df
 
     def process_controller(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["controller_support"] = df["controller_support"].apply(lambda x: 1 if x == "full" else 0)
+        df["controller_support"] = (df["controller_support"] == "full").astype("int64")
         return df
 
     @staticmethod
@@ -310,7 +426,7 @@ class SteamStoreCleaner(BaseCleaner):
         return len(lst)
 
     def process_dlc(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["dlc"] = df["dlc"].apply(self.parse_list)
+        df["dlc"] = self.map_values(df["dlc"], self.parse_list)
         return df
 
     def process_requirement(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -332,7 +448,7 @@ class SteamStoreCleaner(BaseCleaner):
         return pd.NaT
 
     def process_date(self, df: pd.DataFrame) -> pd.DataFrame:
-        df["release_date"] = df["release_date"].apply(self.parse_date)
+        df["release_date"] = self.map_values(df["release_date"], self.parse_date).astype("datetime64[ns]")
         return df
 
     def process_descriptions(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -340,7 +456,8 @@ class SteamStoreCleaner(BaseCleaner):
         df["detailed_description"] = df["detailed_description"].fillna("")
         df["about_the_game"] = df["about_the_game"].fillna("")
         df["short_description"] = df["short_description"].fillna("")
-        df["website"] = df["website"].fillna("Not available")
+        # Missing websites leave the column with object dtype
+        df["website"] = df["website"].fillna("Not available").astype("string[pyarrow]")
         df["header_image"] = df["header_image"].fillna("Not available")
 
         # Concatenate the columns into the 'description' column using f-strings
@@ -384,8 +501,11 @@ class SteamStoreCleaner(BaseCleaner):
         ]
         return self.process_with_progress(df, process_functions, "Steam Store")
 
-    def run(self):
-        steam_df = self.fetch_data("get_new_steam_data.sql")
+    def run(self, since: datetime, appid_range: tuple = ALL_APPIDS):
+        start_appid, end_appid = appid_range
+        steam_df = self.fetch_data(
+            "get_new_steam_data.sql", {"since": since, "start_appid": start_appid, "end_appid": end_appid}
+        )
         # steam_df = self.fetch_data("get_all_steam_data.sql")
         self.logger.info(f"{steam_df.shape[0]} new records found")
         cleaned_steam_df = self.process(steam_df)
@@ -393,39 +513,370 @@ class SteamStoreCleaner(BaseCleaner):
         return cleaned_steam_df
 
 
+def init_cleaner_worker():
+    """
+    Drops the connections inherited from the parent process so that each worker opens its own.
+    """
+    engine.dispose(close=False)
+
+
+def run_cleaner(cleaner_cls: type, path: str, since: datetime, appid_range: tuple, profile: bool) -> tuple:
+    """
+    Runs a cleaner and writes its output to an Arrow IPC (Feather) file.
+
+    Args:
+        cleaner_cls (type): The cleaner class to run.
+        path (str): The file the cleaned DataFrame is written to.
+        since (datetime): The watermark passed to the cleaner.
+        appid_range (tuple): The first and last appid passed to the cleaner.
+        profile (bool): Whether the cleaner profiles its stages.
+
+    Returns:
+        tuple: The path of the written file and the stages recorded by the cleaner's profiler.
+    """
+    cleaner = cleaner_cls(profile=profile)
+    df = cleaner.run(since, appid_range)
+    feather.write_feather(df.reset_index(drop=True), path, compression="uncompressed")
+    return path, cleaner.profiler.stages if profile else []
+
+
+class CleanerBackend(str, Enum):
+    pandas = "pandas"
+    polars = "polars"
+
+
+class ValidationMode(str, Enum):
+    none = "none"
+    columnar = "columnar"
+    pydantic = "pydantic"
+
+
 class SteamDataClean:
-    def __init__(self, batch_size: int = 1000):
+    # Rows of the first chunk in chunked mode, before the memory used per row is known
+    initial_chunk_size = 1000
+    # Estimated ratio between the peak memory of cleaning a chunk and the size of its cleaned DataFrame
+    memory_overhead = 8
+
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        validation: ValidationMode = ValidationMode.columnar,
+        parallel: bool = True,
+        profile: bool = False,
+        watermark_overlap: timedelta = timedelta(hours=1),
+        backend: CleanerBackend = CleanerBackend.pandas,
+        normalize_entities: bool = False,
+        memory_budget: int = None,
+    ):
 
         self.batch_size = batch_size
+        self.backend = CleanerBackend(backend)
+        self.normalizer = EntityNormalizer() if normalize_entities else None
+        self.memory_budget = memory_budget
+        self.validation = ValidationMode(validation)
+        self.validator = ColumnarValidator() if self.validation == ValidationMode.columnar else None
+        self.validation_reports = []
+        self.parallel = parallel
+        self.profiler = StageProfiler() if profile else None
+        self.watermark_overlap = watermark_overlap
         self.logger = get_logger(self.__class__.__name__)
 
-    def merge(self):
-        steamspy_cleaner = SteamSpyCleaner()
-        steam_cleaner = SteamStoreCleaner()
+    def get_watermark(self) -> datetime:
+        """
+        Returns the watermark used to select changed raw records.
+
+        Raw rows written since the start of the last cleaning run, minus a small overlap for writes that were still
+        in flight, are considered. Rows in the overlap that are already clean are excluded per record by comparing
+        their `updated_at` with `clean_game_data.source_updated_at`.
+
+        Returns:
+            datetime: The watermark.
+        """
+        with get_db() as db:
+            last_run = get_last_run_time("cleaner", db)
+
+        if last_run is None:
+            return datetime(1970, 1, 1)
+        return last_run - self.watermark_overlap
+
+    def get_cleaners(self) -> list:
+        """
+        Returns the SteamSpy and Steam Store cleaner classes of the selected backend.
+
+        The Polars backend is imported only when selected, so that Polars is not needed to run the pandas backend.
+
+        Returns:
+            list: The cleaner classes.
+        """
+        if self.backend == CleanerBackend.polars:
+            from steam_sales.steam_etl.polars_cleaner import PolarsSteamSpyCleaner, PolarsSteamStoreCleaner
 
-        steamspy_df = steamspy_cleaner.run()
-        steam_df = steam_cleaner.run()
+            return [PolarsSteamSpyCleaner, PolarsSteamStoreCleaner]
+        return [SteamSpyCleaner, SteamStoreCleaner]
 
-        merged_df = pd.merge(steamspy_df, steam_df, on="appid")
+    def run_cleaners(self, since: datetime, appid_range: tuple = ALL_APPIDS):
+        """
+        Runs the SteamSpy and Steam Store cleaners.
+
+        When `parallel` is set, each cleaner runs in its own process. The cleaned frames are handed back as Arrow IPC
+        files which are read by the parent instead of being pickled through the pool. They are read into memory rather
+        than memory mapped, as the files are deleted with their temporary directory.
+
+        Args:
+            since (datetime): Only raw records updated after this watermark are cleaned.
+            appid_range (tuple, optional): The first and last appid to clean. Defaults to all appids.
+
+        Returns:
+            tuple: The cleaned SteamSpy and Steam Store DataFrames.
+        """
+        cleaners = self.get_cleaners()
+        profile = self.profiler is not None
+
+        if not self.parallel:
+            frames = []
+            for cleaner_cls in cleaners:
+                cleaner = cleaner_cls(profile=profile)
+                frames.append(cleaner.run(since, appid_range))
+                if profile:
+                    self.profiler.extend(cleaner.profiler.stages)
+            return tuple(frames)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tasks = [
+                (cleaner_cls, os.path.join(tmp_dir, f"{cleaner_cls.__name__}.arrow"), since, appid_range, profile)
+                for cleaner_cls in cleaners
+            ]
+
+            with Pool(processes=len(cleaners), initializer=init_cleaner_worker) as pool:
+                results = pool.starmap(run_cleaner, tasks)
+
+            frames = []
+            for path, stages in results:
+                frames.append(feather.read_table(path, memory_map=False).to_pandas())
+                if profile:
+                    self.profiler.extend(stages)
+            return tuple(frames)
+
+    def write_profile(self):
+        """
+        Writes the stage profile as a JSON report to the logs directory and prints a summary table.
+        """
+        path = os.path.join(Path.log_file, f"clean_profile_{datetime.now():%Y%m%d_%H%M%S}.json")
+        self.profiler.write_json(path)
+
+        Console().print(self.profiler.summary_table())
+        self.logger.info(f"Stage profile written to '{path}'")
+
+    def merge(self, since: datetime, appid_range: tuple = ALL_APPIDS):
+        steamspy_df, steam_df = self.run_cleaners(since, appid_range)
+
+        merged_df = (
+            steamspy_df.set_index("appid")
+            .join(steam_df.set_index("appid"), how="inner", lsuffix="_steamspy", rsuffix="_steam")
+            .reset_index()
+        )
+        merged_df["source_updated_at"] = merged_df[["updated_at_steamspy", "updated_at_steam"]].max(axis=1)
+        merged_df.drop(columns=["updated_at_steamspy", "updated_at_steam"], inplace=True)
         self.logger.info(f"Merged data shape: {merged_df.shape}")
         return merged_df
 
-    def ingest(self):
-        merged_df = self.merge()
+    @staticmethod
+    def parse_tags(x):
+        if isinstance(x, str):
+            return json.loads(x)
+        return x
+
+    def to_records(self, df: pd.DataFrame) -> list:
+        """
+        Converts a cleaned DataFrame into a list of records matching the `Clean` schema.
+
+        The conversion is columnar: missing values are replaced by None, timestamps are converted to `datetime`
+        objects and the JSON encoded SteamSpy tags are decoded before the frame is turned into records.
+
+        Args:
+            df (pd.DataFrame): The cleaned DataFrame.
+
+        Returns:
+            list: A list of dictionaries keyed by `clean_game_data` column names.
+        """
+        df = df[list(Clean.model_fields)]
+        timestamps = {
+            col: pd.Series(np.array(df[col].dt.to_pydatetime()), index=df.index, dtype=object)
+            for col in df.select_dtypes("datetime").columns
+        }
+
+        df = df.astype(object)
+        df = df.where(df.notna(), None)
+        for col, values in timestamps.items():
+            df[col] = values.where(values.notna(), None)
+        df["steamspy_tags"] = df["steamspy_tags"].map(self.parse_tags)
+        return df.to_dict("records")
+
+    def clean(self, since: datetime, appid_range: tuple = ALL_APPIDS) -> pd.DataFrame:
+        """
+        Cleans, merges and normalizes the raw records of an appid range.
+
+        Args:
+            since (datetime): Only raw records updated after this watermark are cleaned.
+            appid_range (tuple, optional): The first and last appid to clean. Defaults to all appids.
 
-        merged_df = np.array_split(merged_df, len(merged_df) // self.batch_size + 1)
+        Returns:
+            pd.DataFrame: The merged DataFrame.
+        """
+        merged_df = self.merge(since, appid_range)
+
+        if self.normalizer and self.profiler:
+            merged_df = self.profiler.profile(self.normalizer.normalize, merged_df, "Merged")
+        elif self.normalizer:
+            merged_df = self.normalizer.normalize(merged_df)
+        return merged_df
+
+    def quarantine(self, merged_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validates the merged DataFrame column by column and quarantines the records that fail.
+
+        The failed checks of every invalid record are stored in the `quarantined_games` table, and games whose records
+        are valid again are released from it.
+
+        Args:
+            merged_df (pd.DataFrame): The merged DataFrame.
+
+        Returns:
+            pd.DataFrame: The valid records.
+        """
+        valid_df, invalid_df, report = self.validator.validate(merged_df)
 
         with get_db() as db:
-            for chunk in tqdm(merged_df, desc="Batch progress"):
-                bulk_data = CleanList(games=[])
-                for i in range(chunk.shape[0]):
-                    data = chunk.iloc[i].to_dict()
-                    bulk_data.games.append(Clean(**data))
+            if not report.empty:
+                upsert_quarantined_games(self.validator.violations_per_key(report), db)
+                self.validation_reports.append(report)
+                self.logger.warning(f"{invalid_df.shape[0]} records failed validation and were quarantined")
+            release_quarantined_games(valid_df["appid"].tolist(), db)
+
+        return valid_df
+
+    def write_validation_report(self):
+        """
+        Writes the violations found by the columnar validation as a JSON report to the logs directory.
+        """
+        report = pd.concat(self.validation_reports, ignore_index=True)
+        report = report.groupby(["column", "check"], as_index=False).agg({"violations": "sum", "appids": "sum"})
 
-                bulk_ingest_clean_data(bulk_data, db)
+        path = os.path.join(Path.log_file, f"clean_validation_{datetime.now():%Y%m%d_%H%M%S}.json")
+        report.to_json(path, orient="records", indent=2)
+        self.logger.info(f"Validation report written to '{path}'")
+
+    def write(self, merged_df: pd.DataFrame):
+        if self.validator:
+            merged_df = self.quarantine(merged_df)
+
+        with get_db() as db:
+            for start in tqdm(range(0, merged_df.shape[0], self.batch_size), desc="Batch progress"):
+                records = self.to_records(merged_df.iloc[start : start + self.batch_size])
+
+                if self.validation == ValidationMode.pydantic:
+                    games = CleanList(games=records).games
+                    records = [game.model_dump(mode="json") for game in games]
+
+                bulk_upsert_clean_records(records, db)
+                bulk_replace_game_facets(records, db)
+
+    def backfill_facets(self):
+        """
+        Fills the genre, category and tag bridge tables from the games already in `clean_game_data`.
+
+        Games cleaned from now on update their own rows as they are written, so this only runs while the bridge
+        tables are still empty.
+        """
+        with get_db() as db:
+            if game_facets_exist(db):
+                return
+
+            self.logger.info("Filling the genre, category and tag tables from the clean game data")
+            after_appid = 0
+            while True:
+                params = {"after_appid": after_appid, "limit": self.batch_size}
+                rows = db.execute(get_sql_query("get_game_facets.sql"), params).mappings().all()
+                if not rows:
+                    break
+
+                records = [dict(row, steamspy_tags=self.parse_tags(row["steamspy_tags"])) for row in rows]
+                bulk_replace_game_facets(records, db)
+                after_appid = rows[-1]["appid"]
+
+    def get_changed_appids(self, since: datetime) -> np.ndarray:
+        with get_db() as db:
+            start_appid, end_appid = ALL_APPIDS
+            params = {"since": since, "start_appid": start_appid, "end_appid": end_appid}
+            result = db.execute(get_sql_query("get_changed_appids.sql"), params)
+            return np.array([row[0] for row in result], dtype=np.int64)
+
+    def get_chunk_size(self, merged_df: pd.DataFrame, rows: int) -> int:
+        """
+        Estimates the number of raw records that can be cleaned at once within the memory budget.
+
+        The estimate is the memory budget divided by the memory used per raw record by the last chunk, which is the
+        deep size of its merged DataFrame times `memory_overhead`.
+
+        Args:
+            merged_df (pd.DataFrame): The merged DataFrame of the last chunk.
+            rows (int): The number of raw records of the last chunk.
+
+        Returns:
+            int: The number of raw records of the next chunk.
+        """
+        bytes_per_row = merged_df.memory_usage(deep=True).sum() * self.memory_overhead / rows
+        return max(1, int(self.memory_budget * 2**20 / bytes_per_row))
+
+    def ingest_chunked(self, since: datetime):
+        """
+        Cleans and writes the changed records chunk by chunk.
+
+        The appids to clean are split into consecutive ranges; both raw tables are read for the same range, so every
+        chunk is cleaned, merged and written on its own. The size of each chunk is derived from the memory used by
+        the previous one, so that the memory used stays within `memory_budget` megabytes.
+
+        Args:
+            since (datetime): Only raw records updated after this watermark are cleaned.
+        """
+        appids = self.get_changed_appids(since)
+        self.logger.info(f"{appids.size} records to clean within a {self.memory_budget} MB memory budget")
+
+        chunk_size = self.initial_chunk_size
+        start = 0
+        with tqdm(total=appids.size, desc="Chunk progress") as progress:
+            while start < appids.size:
+                chunk = appids[start : start + chunk_size]
+                merged_df = self.clean(since, (int(chunk[0]), int(chunk[-1])))
+                self.write(merged_df)
+
+                if not merged_df.empty:
+                    chunk_size = self.get_chunk_size(merged_df, chunk.size)
+                start += chunk.size
+                progress.update(chunk.size)
+                del merged_df
+
+    def ingest(self):
+        started_at = get_current_utc_time()
+        since = self.get_watermark()
+        self.backfill_facets()
+
+        if self.memory_budget is None:
+            self.write(self.clean(since))
+        else:
+            self.ingest_chunked(since)
+
+        with get_db() as db:
+            log_last_run_time(LastRun(scraper="cleaner", last_run=started_at), db)
 
         self.logger.info("Game data has been written to the database.")
 
+        if self.validation_reports:
+            self.write_validation_report()
+
+        if self.profiler:
+            self.write_profile()
+
 
 if __name__ == "__main__":
     cleaner = SteamDataClean()
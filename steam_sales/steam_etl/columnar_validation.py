@@ -0,0 +1,215 @@
+import typing
+from datetime import datetime
+from types import NoneType, UnionType
+
+import annotated_types
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from pydantic_core import Url
+
+from steam_sales.steam_etl.validation import Clean
+
+URL_PATTERN = r"^https?://[^\s/?#]+[^\s]*$"
+
+
+class ColumnarValidator:
+    """
+    Class for validating a whole DataFrame against a Pydantic model with vectorized masks.
+
+    One rule is generated per field of the model: the accepted Python types, whether the field is nullable, its
+    `max_length`, its `ge`/`gt`/`le`/`lt` bounds and, for `HttpUrl` fields, the URL shape. Every rule is evaluated
+    over a whole column at once; categorical columns are checked once per category.
+    """
+
+    report_columns = ["column", "check", "violations", "appids"]
+
+    def __init__(self, model: type[BaseModel] = Clean, key: str = "appid"):
+        self.model = model
+        self.key = key
+        self.rules = [self.make_rule(name, field) for name, field in model.model_fields.items()]
+
+    @staticmethod
+    def flatten_types(annotation) -> list:
+        """
+        Flattens a field annotation into the list of types it accepts, including `NoneType` for optional fields.
+
+        Args:
+            annotation: The annotation of the field.
+
+        Returns:
+            list: The accepted types.
+        """
+        origin = typing.get_origin(annotation)
+        if origin is typing.Annotated:
+            return ColumnarValidator.flatten_types(typing.get_args(annotation)[0])
+        if origin in (typing.Union, UnionType):
+            return [t for arg in typing.get_args(annotation) for t in ColumnarValidator.flatten_types(arg)]
+        return [origin or annotation]
+
+    def make_rule(self, name: str, field) -> dict:
+        types = self.flatten_types(field.annotation)
+        rule = {
+            "column": name,
+            "types": [t for t in types if t is not NoneType],
+            "nullable": NoneType in types,
+            "max_length": None,
+            "bounds": {},
+        }
+
+        for constraint in field.metadata:
+            if isinstance(constraint, annotated_types.MaxLen):
+                rule["max_length"] = constraint.max_length
+            for bound in ("ge", "gt", "le", "lt"):
+                if isinstance(constraint, getattr(annotated_types, bound.capitalize())):
+                    rule["bounds"][bound] = getattr(constraint, bound)
+
+        rule["url"] = rule["types"] == [Url]
+        return rule
+
+    @staticmethod
+    def is_instance(values: pd.Series, types: tuple) -> pd.Series:
+        return values.map(lambda value: isinstance(value, types)).astype(bool)
+
+    def type_mask(self, values: pd.Series, types: list) -> pd.Series:
+        """
+        Flags the non-null values that are not of any of the accepted types.
+
+        Args:
+            values (pd.Series): The non-null values of a column.
+            types (list): The accepted types.
+
+        Returns:
+            pd.Series: True where the value has the wrong type.
+        """
+        valid = pd.Series(False, index=values.index)
+
+        for t in types:
+            if t is int:
+                if pd.api.types.is_bool_dtype(values) or pd.api.types.is_integer_dtype(values):
+                    return pd.Series(False, index=values.index)
+                numbers = pd.to_numeric(values, errors="coerce")
+                valid |= numbers.notna() & (numbers == np.floor(numbers))
+            elif t is float:
+                if pd.api.types.is_numeric_dtype(values):
+                    return pd.Series(False, index=values.index)
+                valid |= pd.to_numeric(values, errors="coerce").notna()
+            elif t in (str, Url):
+                if pd.api.types.is_string_dtype(values) and pd.api.types.infer_dtype(values) == "string":
+                    return pd.Series(False, index=values.index)
+                valid |= self.is_instance(values, (str,))
+            elif t is datetime:
+                if pd.api.types.is_datetime64_any_dtype(values):
+                    return pd.Series(False, index=values.index)
+                valid |= self.is_instance(values, (datetime,))
+            elif t is dict:
+                # JSON encoded objects are decoded when the records are built
+                valid |= self.is_instance(values, (dict, str))
+            else:
+                valid |= self.is_instance(values, (t,))
+
+        return ~valid
+
+    def check_values(self, values: pd.Series, rule: dict) -> dict:
+        """
+        Evaluates the type, length, URL and range checks of a rule on the non-null values of a column.
+
+        Args:
+            values (pd.Series): The non-null values of a column.
+            rule (dict): The rule of the column.
+
+        Returns:
+            dict: A boolean mask per check, True where the value violates the check.
+        """
+        checks = {"dtype": self.type_mask(values, rule["types"])}
+        typed = values[~checks["dtype"]]
+
+        if rule["max_length"] is not None:
+            checks["max_length"] = typed.astype(str).str.len() > rule["max_length"]
+        if rule["url"]:
+            checks["url"] = ~typed.astype(str).str.match(URL_PATTERN)
+        if rule["bounds"]:
+            numbers = pd.to_numeric(typed, errors="coerce")
+            out_of_range = pd.Series(False, index=typed.index)
+            for bound, limit in rule["bounds"].items():
+                out_of_range |= {
+                    "ge": numbers < limit,
+                    "gt": numbers <= limit,
+                    "le": numbers > limit,
+                    "lt": numbers >= limit,
+                }[bound]
+            checks["range"] = out_of_range
+
+        return {check: mask.reindex(values.index, fill_value=False) for check, mask in checks.items()}
+
+    def check_column(self, series: pd.Series, rule: dict) -> dict:
+        """
+        Evaluates a rule on a column.
+
+        Categorical columns are checked once per category and the result is mapped back to the rows through the
+        category codes.
+
+        Args:
+            series (pd.Series): The column.
+            rule (dict): The rule of the column.
+
+        Returns:
+            dict: A boolean array per check, True where the row violates the check.
+        """
+        missing = series.isna().to_numpy()
+        checks = {"null": missing if not rule["nullable"] else np.zeros(len(series), dtype=bool)}
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            categories = pd.Series(series.cat.categories)
+            for check, mask in self.check_values(categories, rule).items():
+                checks[check] = np.where(codes >= 0, mask.to_numpy()[codes], False)
+            return checks
+
+        values = series[~missing]
+        for check, mask in self.check_values(values, rule).items():
+            row_mask = np.zeros(len(series), dtype=bool)
+            row_mask[~missing] = mask.to_numpy()
+            checks[check] = row_mask
+        return checks
+
+    def validate(self, df: pd.DataFrame) -> tuple:
+        """
+        Validates a DataFrame against the model.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to validate.
+
+        Returns:
+            tuple: The valid rows, the rows violating at least one rule, and a report with the number of violations
+            and the offending keys per column and check.
+        """
+        invalid = np.zeros(df.shape[0], dtype=bool)
+        report = []
+
+        for rule in self.rules:
+            if rule["column"] in df.columns:
+                checks = self.check_column(df[rule["column"]], rule)
+            else:
+                checks = {"missing": np.ones(df.shape[0], dtype=bool)}
+
+            for check, mask in checks.items():
+                if mask.any():
+                    report.append([rule["column"], check, int(mask.sum()), df.loc[mask, self.key].tolist()])
+                    invalid |= mask
+
+        return df[~invalid], df[invalid], pd.DataFrame(report, columns=self.report_columns)
+
+    def violations_per_key(self, report: pd.DataFrame) -> dict:
+        """
+        Lists the violated checks of every offending key.
+
+        Args:
+            report (pd.DataFrame): A report returned by `validate`.
+
+        Returns:
+            dict: A mapping of key to a list of "column:check" strings.
+        """
+        violations = report.explode("appids")
+        violations = violations.assign(violation=violations["column"] + ":" + violations["check"])
+        return violations.groupby("appids")["violation"].agg(list).to_dict()
@@ -1,11 +1,28 @@
+import unicodedata
+from datetime import timedelta
+
+from sqlalchemy import bindparam, delete, func, select, text, update
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.orm import Session
 
 from steam_sales.steam_etl import model
 from steam_sales.steam_etl.settings import get_logger
-from steam_sales.steam_etl.validation import CleanList, GameDetailsList, GameList, GameMetaDataList, LastRun
+from steam_sales.steam_etl.validation import (
+    CleanList,
+    Game,
+    GameDetails,
+    GameDetailsList,
+    GameList,
+    GameMetaDataList,
+    LastRun,
+    get_current_utc_time,
+    get_list_adapter,
+)
 
 logger = get_logger(__name__)
 
+DESCRIPTION_COLUMNS = ["detailed_description", "about_the_game", "short_description"]
+
 
 def remove_duplicates_meta(all_data: GameMetaDataList, unique_games: list = []) -> GameMetaDataList:
     """
@@ -26,7 +43,7 @@ def remove_duplicates_meta(all_data: GameMetaDataList, unique_games: list = [])
             seen_appids.add(game.appid)
             unique_games.append(game)
 
-    return GameMetaDataList(games=unique_games)
+    return GameMetaDataList.model_construct(games=unique_games)
 
 
 def bulk_ingest_meta_data(requests: GameMetaDataList, db: Session):
@@ -60,6 +77,9 @@ def bulk_ingest_steamspy_data(requests: GameDetailsList, db: Session):
     """
     Bulk ingests SteamSpy data into the database.
 
+    Games that are already stored, because their payload changed since they were last fetched, are overwritten.
+    The player counts and review counts that changed are appended to `player_snapshots`.
+
     Args:
         requests (GameDetailsList): A list of game details to be ingested.
         db (Session): The database session.
@@ -67,22 +87,27 @@ def bulk_ingest_steamspy_data(requests: GameDetailsList, db: Session):
     Returns:
         List[GameDetails]: The list of newly added game details documents.
     """
-    new_docs = []
+    updated_at = get_current_utc_time()
 
-    for np in requests.games:
-        new_post = model.GameDetails(**np.model_dump())
-        new_docs.append(new_post)
+    records = get_list_adapter(GameDetails).dump_python(requests.games)
+    for record in records:
+        record["updated_at"] = updated_at
+        record["details_updated_at"] = record["details_updated_at"] or updated_at
 
-    db.bulk_save_objects(new_docs)
+    upsert_raw_records(model.GameDetails.__table__, records, db)
+    append_snapshots(model.PlayerSnapshot.__table__, [player_snapshot(record) for record in records], db)
     db.commit()
 
-    return len(new_docs)
+    return len(records)
 
 
 def bulk_ingest_steam_data(requests: GameList, db: Session):
     """
     Bulk ingests Steam data into the database.
 
+    Games that are already stored, because their payload changed since they were last fetched, are overwritten.
+    The prices that changed are appended to `price_snapshots`.
+
     Args:
         requests (GameList): A list of game requests.
         db (Session): The database session.
@@ -95,15 +120,18 @@ def bulk_ingest_steam_data(requests: GameList, db: Session):
     """
     try:
         new_docs = []
-
-        for np in requests.games:
-            if game_exists(np.appid, db):
-                continue
-
-            new_post = model.Game(**np.model_dump())
-            new_docs.append(new_post)
-
-        db.bulk_save_objects(new_docs)
+        new_descriptions = []
+        updated_at = get_current_utc_time()
+
+        for record in get_list_adapter(Game).dump_python(requests.games):
+            descriptions = {col: record.pop(col) for col in DESCRIPTION_COLUMNS}
+            new_docs.append({**record, "updated_at": updated_at})
+            new_descriptions.append({"appid": record["appid"], **descriptions})
+
+        upsert_raw_records(model.Game.__table__, new_docs, db)
+        upsert_raw_records(model.GameDescription.__table__, new_descriptions, db)
+        snapshots = filter(None, (price_snapshot(record) for record in new_docs))
+        append_snapshots(model.PriceSnapshot.__table__, list(snapshots), db)
         db.commit()
 
         # logger.info(f"Successfully added '{len(new_docs)}' documents to the database")
@@ -113,6 +141,345 @@ def bulk_ingest_steam_data(requests: GameList, db: Session):
         return 0
 
 
+def upsert_raw_records(table, records: list, db: Session):
+    """
+    Inserts raw records, overwriting the stored rows with the same primary key.
+
+    Args:
+        table (Table): The raw table.
+        records (list): A list of dictionaries keyed by column names.
+        db (Session): The database session.
+    """
+    if not records:
+        return
+
+    stmt = insert(table)
+    update_columns = {col.name: stmt.inserted[col.name] for col in table.columns if not col.primary_key}
+    db.execute(stmt.on_duplicate_key_update(update_columns), records)
+
+
+def get_steamspy_details(appids: list, db: Session) -> dict:
+    """
+    Retrieves the stored SteamSpy fields that are only returned by per-app requests.
+
+    Args:
+        appids (list): The app IDs to look up.
+        db (Session): The database session.
+
+    Returns:
+        dict: A mapping of app ID to its `languages`, `genre`, `tags` and `details_updated_at`.
+    """
+    if not appids:
+        return {}
+
+    table = model.GameDetails.__table__
+    columns = ["languages", "genre", "tags", "details_updated_at"]
+    rows = db.execute(select(table.c.appid, *[table.c[col] for col in columns]).where(table.c.appid.in_(appids)))
+    return {appid: dict(zip(columns, values)) for appid, *values in rows}
+
+
+def get_content_hashes(table, appids: list, db: Session) -> dict:
+    """
+    Retrieves the stored payload hashes of the given app IDs.
+
+    Args:
+        table (Table): The raw table, `steamspy_games_raw` or `steam_games_raw`.
+        appids (list): The app IDs to look up.
+        db (Session): The database session.
+
+    Returns:
+        dict: A mapping of app ID to payload hash, for the stored games that have one.
+    """
+    if not appids:
+        return {}
+
+    rows = db.execute(
+        select(table.c.appid, table.c.content_hash).where(table.c.appid.in_(appids), table.c.content_hash.is_not(None))
+    )
+    return {appid: digest for appid, digest in rows}
+
+
+def price_snapshot(record: dict):
+    """
+    Builds the price snapshot of a raw Steam record.
+
+    Args:
+        record (dict): The raw Steam record, with its `updated_at`.
+
+    Returns:
+        dict or None: The snapshot, or None if the record has no price.
+    """
+    price_overview = record["price_overview"] or {}
+    if "final" not in price_overview and not record["is_free"]:
+        return None
+
+    return {
+        "appid": record["appid"],
+        "captured_at": record["updated_at"],
+        "currency": price_overview.get("currency", "USD"),
+        "initial_price": price_overview.get("initial", price_overview.get("final", 0)),
+        "final_price": price_overview.get("final", 0),
+        "discount_percent": price_overview.get("discount_percent", 0),
+    }
+
+
+def player_snapshot(record: dict) -> dict:
+    """
+    Builds the player count snapshot of a raw SteamSpy record.
+
+    Args:
+        record (dict): The raw SteamSpy record, with its `updated_at`.
+
+    Returns:
+        dict: The snapshot.
+    """
+    return {
+        "appid": record["appid"],
+        "captured_at": record["updated_at"],
+        "ccu": record["ccu"],
+        "positive": record["positive"],
+        "negative": record["negative"],
+    }
+
+
+def get_latest_snapshots(table, appids: list, db: Session) -> dict:
+    """
+    Retrieves the most recent snapshot of each of the given app IDs.
+
+    Args:
+        table (Table): The snapshot table.
+        appids (list): The app IDs to look up.
+        db (Session): The database session.
+
+    Returns:
+        dict: A mapping of app ID to the tuple of snapshot values, without the app ID and timestamp.
+    """
+    if not appids:
+        return {}
+
+    latest = (
+        select(table.c.appid, func.max(table.c.captured_at).label("captured_at"))
+        .where(table.c.appid.in_(appids))
+        .group_by(table.c.appid)
+        .subquery()
+    )
+    value_columns = [col for col in table.columns if not col.primary_key]
+    rows = db.execute(
+        select(table.c.appid, *value_columns).join(
+            latest, (table.c.appid == latest.c.appid) & (table.c.captured_at == latest.c.captured_at)
+        )
+    )
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def append_snapshots(table, snapshots: list, db: Session):
+    """
+    Appends the snapshots whose values differ from the most recent snapshot of their app ID.
+
+    Args:
+        table (Table): The snapshot table, `price_snapshots` or `player_snapshots`.
+        snapshots (list): A list of dictionaries keyed by column names.
+        db (Session): The database session.
+
+    Returns:
+        list: The snapshots appended.
+    """
+    latest = get_latest_snapshots(table, [snapshot["appid"] for snapshot in snapshots], db)
+    value_columns = [col.name for col in table.columns if not col.primary_key]
+
+    changed = [
+        snapshot
+        for snapshot in snapshots
+        if latest.get(snapshot["appid"]) != tuple(snapshot[col] for col in value_columns)
+    ]
+    if changed:
+        db.execute(insert(table).prefix_with("IGNORE"), changed)
+    return changed
+
+
+def bulk_update_prices(prices: dict, db: Session) -> int:
+    """
+    Records refreshed Steam Store prices.
+
+    The prices that differ from the latest snapshot of their game are appended to `price_snapshots` and written to
+    the `price_overview` of the raw rows in a single executemany update, which also marks the rows for cleaning.
+
+    Args:
+        prices (dict): A mapping of app ID to its `price_overview` object.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of prices that changed.
+    """
+    updated_at = get_current_utc_time()
+    snapshots = [
+        price_snapshot({"appid": appid, "updated_at": updated_at, "price_overview": price_overview, "is_free": False})
+        for appid, price_overview in prices.items()
+    ]
+    # Price overviews without a final price have no snapshot
+    snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+    changed = append_snapshots(model.PriceSnapshot.__table__, snapshots, db)
+
+    if changed:
+        table = model.Game.__table__
+        stmt = (
+            update(table)
+            .where(table.c.appid == bindparam("b_appid"))
+            .values(
+                price_overview=bindparam("b_price_overview", type_=table.c.price_overview.type),
+                updated_at=updated_at,
+            )
+        )
+        db.execute(
+            stmt,
+            [{"b_appid": snapshot["appid"], "b_price_overview": prices[snapshot["appid"]]} for snapshot in changed],
+        )
+
+    db.commit()
+    return len(changed)
+
+
+def ensure_monthly_partitions(table, db: Session, months_ahead: int = 2):
+    """
+    Partitions a snapshot table by month of `captured_at` and adds the partitions of the coming months.
+
+    Each month gets a partition named `pYYYYMM`; rows past the last month land in the `pfuture` partition, which is
+    split when the partitions of later months are added.
+
+    Args:
+        table (Table): The snapshot table.
+        db (Session): The database session.
+        months_ahead (int, optional): The number of months after the current one to create partitions for. Defaults
+        to 2.
+    """
+    existing = set(
+        db.execute(
+            text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+            ),
+            {"table": table.name},
+        ).scalars()
+    )
+
+    month = get_current_utc_time().date().replace(day=1)
+    definitions = []
+    for _ in range(months_ahead + 1):
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        if f"p{month:%Y%m}" not in existing:
+            definitions.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{next_month:%Y-%m-%d}'))")
+        month = next_month
+
+    if not definitions:
+        return
+    definitions.append("PARTITION pfuture VALUES LESS THAN MAXVALUE")
+
+    if existing:
+        statement = f"ALTER TABLE {table.name} REORGANIZE PARTITION pfuture INTO ({', '.join(definitions)})"
+    else:
+        statement = f"ALTER TABLE {table.name} PARTITION BY RANGE (TO_DAYS(captured_at)) ({', '.join(definitions)})"
+    db.execute(text(statement))
+    logger.info(f"Added {len(definitions) - 1} monthly partitions to '{table.name}'")
+
+
+def insert_player_counts(records: list, db: Session) -> int:
+    """
+    Bulk inserts a batch of player count samples.
+
+    Args:
+        records (list): A list of dictionaries keyed by `player_counts` column names.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of samples submitted.
+    """
+    if not records:
+        return 0
+
+    db.execute(insert(model.PlayerCount.__table__).prefix_with("IGNORE"), records)
+    db.commit()
+    return len(records)
+
+
+def mark_refreshed(source: str, appids: list, db: Session) -> int:
+    """
+    Records that the raw records of the given app IDs were fetched again by the refresh scheduler.
+
+    Args:
+        source (str): The raw table the records belong to, `steam` or `steamspy`.
+        appids (list): The app IDs fetched again.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of app IDs recorded.
+    """
+    checked_at = get_current_utc_time()
+    records = [{"source": source, "appid": appid, "checked_at": checked_at} for appid in appids]
+    upsert_raw_records(model.RefreshSchedule.__table__, records, db)
+    db.commit()
+    return len(records)
+
+
+def upsert_regional_prices(records: list, db: Session) -> int:
+    """
+    Bulk upserts the latest price of games per country.
+
+    Args:
+        records (list): A list of dictionaries keyed by `regional_prices` column names.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of records written.
+    """
+    if not records:
+        return 0
+
+    upsert_raw_records(model.RegionalPrice.__table__, records, db)
+    db.commit()
+    return len(records)
+
+
+def get_review_cursors(appids: list, db: Session) -> dict:
+    """
+    Retrieves the review pagination state of the given app IDs.
+
+    Args:
+        appids (list): The app IDs to look up.
+        db (Session): The database session.
+
+    Returns:
+        dict: A mapping of app ID to its `cursor`, `newest_created_at`, `head_cursor` and `head_newest_created_at`, for
+        the apps read before.
+    """
+    if not appids:
+        return {}
+
+    table = model.ReviewCursor.__table__
+    columns = ["cursor", "newest_created_at", "head_cursor", "head_newest_created_at"]
+    rows = db.execute(select(table.c.appid, *(table.c[column] for column in columns)).where(table.c.appid.in_(appids)))
+    return {appid: dict(zip(columns, state)) for appid, *state in rows}
+
+
+def bulk_ingest_reviews(reviews: list, cursors: list, db: Session) -> int:
+    """
+    Bulk upserts user reviews and the pagination state of their apps in one transaction.
+
+    Reviews read again have their votes and update time refreshed.
+
+    Args:
+        reviews (list): A list of dictionaries keyed by `game_reviews` column names.
+        cursors (list): A list of dictionaries keyed by `review_cursors` column names.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of reviews written.
+    """
+    upsert_raw_records(model.GameReview.__table__, reviews, db)
+    upsert_raw_records(model.ReviewCursor.__table__, cursors, db)
+    db.commit()
+    return len(reviews)
+
+
 def game_exists(appid: str, db: Session):
     """
     Check if a game with the given appid exists in the database.
@@ -157,6 +524,192 @@ def bulk_ingest_clean_data(requests: CleanList, db: Session):
     return new_docs
 
 
+def bulk_upsert_clean_records(records: list, db: Session):
+    """
+    Bulk upserts clean data records into the database without building ORM objects.
+
+    Records whose appid already exists in `clean_game_data` are overwritten and their `updated_at` is refreshed with
+    the current UTC time, the clock of the `updated_at` watermarks of the raw tables.
+
+    Args:
+        records (list): A list of dictionaries keyed by `clean_game_data` column names.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of records written.
+    """
+    if not records:
+        return 0
+
+    table = model.CleanData.__table__
+    stmt = insert(table)
+    update_columns = {col.name: stmt.inserted[col.name] for col in table.columns if not col.primary_key}
+
+    db.execute(stmt.on_duplicate_key_update(update_columns), records)
+    db.commit()
+    return len(records)
+
+
+def facet_key(value: str) -> str:
+    """
+    Builds the key a genre, category or tag is compared on, ignoring case and accents like the keys of the bridge
+    tables.
+
+    Args:
+        value (str): The genre, category or tag.
+
+    Returns:
+        str: The case folded value without accents.
+    """
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def split_facets(value: str, max_length: int = 255) -> list:
+    """
+    Splits a semicolon separated list of genres or categories into its distinct values.
+
+    Values are compared without case and accents, like the keys of the bridge tables.
+
+    Args:
+        value (str): The semicolon separated values.
+        max_length (int, optional): Values longer than this are skipped. Defaults to 255.
+
+    Returns:
+        list: The distinct values, in order.
+    """
+    values = (item.strip() for item in (value or "").split(";"))
+    distinct = {}
+    for item in values:
+        if item and len(item) <= max_length:
+            distinct.setdefault(facet_key(item), item)
+    return list(distinct.values())
+
+
+def bulk_replace_game_facets(records: list, db: Session):
+    """
+    Replaces the rows of the genre, category and tag bridge tables of the given games.
+
+    Args:
+        records (list): A list of dictionaries with the `appid`, `genres`, `categories` and `steamspy_tags` of the
+        games.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of games updated.
+    """
+    if not records:
+        return 0
+
+    genres, categories, tags = [], [], []
+    for record in records:
+        appid = record["appid"]
+        genres.extend({"appid": appid, "genre": genre} for genre in split_facets(record["genres"]))
+        categories.extend({"appid": appid, "category": category} for category in split_facets(record["categories"]))
+        game_tags = {}
+        for tag, votes in (record["steamspy_tags"] or {}).items():
+            if len(tag) <= 255:
+                game_tags.setdefault(facet_key(tag), {"appid": appid, "tag": tag, "votes": votes})
+        tags.extend(game_tags.values())
+
+    appids = [record["appid"] for record in records]
+    for table, rows in [(model.GameGenre, genres), (model.GameCategory, categories), (model.GameTag, tags)]:
+        db.query(table).filter(table.appid.in_(appids)).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(table.__table__), rows)
+
+    db.commit()
+    return len(records)
+
+
+def game_facets_exist(db: Session) -> bool:
+    """
+    Checks whether the bridge tables have been filled.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        bool: True if the bridge tables hold any row or there is no clean data yet.
+    """
+    if db.query(model.CleanData.appid).first() is None:
+        return True
+    return db.query(model.GameGenre.appid).first() is not None
+
+
+def upsert_quarantined_games(violations: dict, db: Session):
+    """
+    Records the clean records that failed validation, replacing the violations of games already quarantined.
+
+    Args:
+        violations (dict): A mapping of appid to the list of failed checks.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of quarantined games.
+    """
+    if not violations:
+        return 0
+
+    records = [{"appid": appid, "violations": checks} for appid, checks in violations.items()]
+    stmt = insert(model.QuarantinedGame.__table__)
+    db.execute(
+        stmt.on_duplicate_key_update(violations=stmt.inserted.violations, quarantined_at=func.now()),
+        records,
+    )
+    db.commit()
+    return len(records)
+
+
+def release_quarantined_games(appids: list, db: Session):
+    """
+    Removes games that passed validation from the quarantine.
+
+    Args:
+        appids (list): The appids of the valid records.
+        db (Session): The database session.
+    """
+    if appids:
+        db.query(model.QuarantinedGame).filter(model.QuarantinedGame.appid.in_(appids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+
+
+def get_entity_aliases(db: Session) -> dict:
+    """
+    Get the canonical developer/publisher name of every known alias.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        dict: A mapping of alias to canonical name.
+    """
+    return dict(db.query(model.EntityAlias.name, model.EntityAlias.canonical).all())
+
+
+def bulk_insert_entity_aliases(aliases: dict, db: Session):
+    """
+    Bulk upserts developer/publisher aliases. Aliases that already exist get the new canonical name.
+
+    Args:
+        aliases (dict): A mapping of alias to canonical name.
+        db (Session): The database session.
+
+    Returns:
+        int: The number of aliases submitted.
+    """
+    if not aliases:
+        return 0
+
+    records = [{"name": name, "canonical": canonical} for name, canonical in aliases.items()]
+    stmt = insert(model.EntityAlias.__table__)
+    db.execute(stmt.on_duplicate_key_update(canonical=stmt.inserted.canonical), records)
+    db.commit()
+    return len(records)
+
+
 def log_last_run_time(log: LastRun, db: Session):
     """
     Log the last run time for a scraper.
@@ -176,6 +729,88 @@ def log_last_run_time(log: LastRun, db: Session):
     logger.info(f"Updated last run time to '{log.last_run}' for worker '{log.scraper}'")
 
 
+def get_last_run_time(scraper: str, db: Session):
+    """
+    Get the last run time logged for a scraper.
+
+    Args:
+        scraper (str): The name of the scraper.
+        db (Session): The database session.
+
+    Returns:
+        datetime or None: The last run time, or None if the scraper has never been logged.
+    """
+    entry = db.query(model.LastRun).filter(model.LastRun.scraper == scraper).first()
+    return entry.last_run if entry else None
+
+
+def get_retry_attempts(source: str, appids: list, db: Session) -> dict:
+    """
+    Retrieves the number of failed fetches of the given app IDs.
+
+    Args:
+        source (str): The fetcher the app IDs failed in, `steam`.
+        appids (list): The app IDs to look up.
+        db (Session): The database session.
+
+    Returns:
+        dict: A mapping of app ID to its number of failed fetches, for the app IDs in the retry queue.
+    """
+    if not appids:
+        return {}
+
+    table = model.FetchRetry.__table__
+    rows = db.execute(
+        select(table.c.appid, table.c.attempts).where(table.c.source == source, table.c.appid.in_(appids))
+    )
+    return {appid: attempts for appid, attempts in rows}
+
+
+def get_due_retries(source: str, db: Session) -> list:
+    """
+    Retrieves the failed app IDs whose next attempt is due.
+
+    Args:
+        source (str): The fetcher the app IDs failed in, `steam`.
+        db (Session): The database session.
+
+    Returns:
+        list: The app IDs, longest overdue first.
+    """
+    table = model.FetchRetry.__table__
+    now = get_current_utc_time().replace(tzinfo=None)
+    rows = db.execute(
+        select(table.c.appid)
+        .where(table.c.source == source, table.c.next_attempt_at <= now)
+        .order_by(table.c.next_attempt_at)
+    )
+    return [appid for (appid,) in rows]
+
+
+def update_retries(source: str, retries: list, succeeded: list, db: Session):
+    """
+    Queues the failed fetches of a batch and removes the app IDs fetched successfully from the retry queue.
+
+    The app IDs fetched successfully are also no longer flagged as faulty.
+
+    Args:
+        source (str): The fetcher of the batch, `steam`.
+        retries (list): A list of dictionaries keyed by `fetch_retries` column names.
+        succeeded (list): The app IDs fetched successfully.
+        db (Session): The database session.
+    """
+    upsert_raw_records(model.FetchRetry.__table__, retries, db)
+
+    if succeeded:
+        db.execute(
+            delete(model.FetchRetry).where(model.FetchRetry.source == source, model.FetchRetry.appid.in_(succeeded))
+        )
+        db.execute(
+            update(model.GameMeta).where(model.GameMeta.appid.in_(succeeded), model.GameMeta.dne).values(dne=False)
+        )
+    db.commit()
+
+
 def flag_faulty_appid(appid: int, db: Session):
     """
     Flag an appid as faulty in the database.
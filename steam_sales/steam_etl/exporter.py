@@ -0,0 +1,192 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from steam_sales.steam_etl.db import get_db
+from steam_sales.steam_etl.settings import Path, get_logger
+from steam_sales.steam_etl.utils import get_sql_query
+
+
+class CleanDataExporter:
+    """
+    Class for exporting the `clean_game_data` table to a Parquet dataset partitioned by release year.
+
+    The dataset is partitioned on `release_year`, a copy of `year` where games without a release date are stored
+    under 0, so that the partition key is never null. The `year` column itself is kept unchanged in the files.
+    """
+
+    watermark_file = "_watermark.json"
+    partition_col = "release_year"
+    dictionary_cols = ["genres", "categories", "platform"]
+
+    def __init__(self, output_dir: str = Path.parquet_export, full_refresh: bool = False):
+        self.logger = get_logger(self.__class__.__name__)
+
+        self.output_dir = output_dir
+        self.full_refresh = full_refresh
+        self.partitioning = ds.partitioning(pa.schema([(self.partition_col, pa.int16())]), flavor="hive")
+
+    def read_watermark(self):
+        """
+        Reads the `updated_at` watermark of the last export from the output directory.
+
+        Returns:
+            datetime or None: The watermark, or None if nothing has been exported yet.
+        """
+        path = os.path.join(self.output_dir, self.watermark_file)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as f:
+            return datetime.fromisoformat(json.load(f)["updated_at"])
+
+    def write_watermark(self, watermark: datetime):
+        """
+        Stores the `updated_at` watermark of an export, once all of its partitions are written.
+
+        The watermark is written to a temporary file which then replaces the stored one, so an interrupted write
+        leaves the previous watermark in place.
+
+        Args:
+            watermark (datetime): The latest `updated_at` of the exported rows.
+        """
+        path = os.path.join(self.output_dir, self.watermark_file)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"updated_at": watermark.isoformat()}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def fetch_data(self, since: datetime = None) -> pd.DataFrame:
+        """
+        Fetches the clean game data updated since the given watermark, or the whole table if no watermark is given.
+
+        Args:
+            since (datetime, optional): The watermark. Defaults to None.
+
+        Returns:
+            pd.DataFrame: The fetched data.
+        """
+        with get_db() as db:
+            if since is None:
+                result = db.execute(get_sql_query("get_all_game_data.sql"))
+            else:
+                result = db.execute(get_sql_query("get_updated_game_data.sql"), {"since": since})
+            data = result.fetchall()
+            columns = result.keys()
+
+        df = pd.DataFrame(data, columns=columns)
+        df["year"] = df["year"].astype("Int16")
+        df[self.partition_col] = df["year"].fillna(0).astype("int16")
+        return df
+
+    def partition_dir(self, year: int) -> str:
+        return os.path.join(self.output_dir, f"{self.partition_col}={year}")
+
+    def read_partitions(self, years: set) -> pd.DataFrame:
+        """
+        Reads the given year partitions of the existing dataset.
+
+        Args:
+            years (set): The partition values to read.
+
+        Returns:
+            pd.DataFrame: The rows stored in the partitions.
+        """
+        dataset = ds.dataset(self.output_dir, format="parquet", partitioning=self.partitioning)
+        return dataset.to_table(filter=ds.field(self.partition_col).isin(list(years))).to_pandas()
+
+    def merge_with_existing(self, df: pd.DataFrame):
+        """
+        Merges updated rows into the partitions they touch.
+
+        A partition is touched if an updated row goes into it, or if it is the `release_year` an updated appid was
+        stored under before. Touched partitions are read back, the outdated rows are replaced and the partitions are
+        rewritten as a whole; the other partitions are left as they are.
+
+        Args:
+            df (pd.DataFrame): The updated rows.
+
+        Returns:
+            tuple: The rows to write and the set of touched partition values.
+        """
+        dataset = ds.dataset(self.output_dir, format="parquet", partitioning=self.partitioning)
+        index = dataset.to_table(columns=["appid", self.partition_col]).to_pandas()
+        previous_years = dict(zip(index["appid"], index[self.partition_col]))
+
+        touched = set(df[self.partition_col].tolist())
+        touched |= {previous_years[appid] for appid in df["appid"] if appid in previous_years}
+
+        existing = self.read_partitions(touched)
+        existing = existing[~existing["appid"].isin(df["appid"])]
+
+        for col in self.dictionary_cols:
+            existing[col] = existing[col].astype(object)
+
+        return pd.concat([existing, df], ignore_index=True), touched
+
+    def write(self, df: pd.DataFrame, touched: set):
+        """
+        Writes the rows to the Parquet dataset, replacing the partitions they belong to.
+
+        Genre, category and platform strings are dictionary encoded. Touched partitions that end up empty are
+        removed.
+
+        Args:
+            df (pd.DataFrame): The rows to write.
+            touched (set): The partition values being replaced.
+        """
+        for col in self.dictionary_cols:
+            df[col] = df[col].astype("category")
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            self.output_dir,
+            partitioning=self.partitioning,
+            existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet",
+            use_dictionary=self.dictionary_cols,
+            compression="zstd",
+        )
+
+        written = set(df[self.partition_col].tolist())
+        for year in touched:
+            if year not in written and os.path.exists(self.partition_dir(year)):
+                shutil.rmtree(self.partition_dir(year))
+
+    def run(self):
+        """
+        Exports the clean game data to Parquet.
+
+        On the first run, or with `full_refresh`, the whole table is exported. Afterwards only the rows whose
+        `updated_at` is at or past the stored watermark are read from the database and merged into the dataset. The
+        watermark only moves once the partitions are written, so a failed export is read again by the next run.
+
+        Returns:
+            int: The number of rows exported.
+        """
+        if self.full_refresh and os.path.exists(self.output_dir):
+            shutil.rmtree(self.output_dir)
+
+        since = self.read_watermark()
+        df = self.fetch_data(since)
+        self.logger.info(f"{df.shape[0]} updated records found")
+
+        if df.empty:
+            return 0
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        if since is None:
+            self.write(df, set())
+        else:
+            merged_df, touched = self.merge_with_existing(df)
+            self.write(merged_df, touched)
+
+        self.write_watermark(df["updated_at"].max().to_pydatetime())
+        self.logger.info(f"Successfully exported {df.shape[0]} records to '{self.output_dir}'")
+        return df.shape[0]
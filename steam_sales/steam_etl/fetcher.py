@@ -1,33 +1,99 @@
 import os
+import random
+import threading
 import time
 import warnings
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from enum import Enum
 from multiprocessing import Pool, cpu_count
 
+import pandas as pd
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, SSLError
 from sqlalchemy import text
 from tqdm import tqdm
 
+from steam_sales.steam_etl import model
 from steam_sales.steam_etl.crud import (
     bulk_ingest_meta_data,
+    bulk_ingest_reviews,
     bulk_ingest_steam_data,
     bulk_ingest_steamspy_data,
+    bulk_update_prices,
+    ensure_monthly_partitions,
     flag_faulty_appid,
+    get_content_hashes,
+    get_due_retries,
+    get_last_run_time,
+    get_retry_attempts,
+    get_review_cursors,
+    get_steamspy_details,
+    insert_player_counts,
+    update_retries,
+    upsert_regional_prices,
 )
 from steam_sales.steam_etl.db import get_db
 from steam_sales.steam_etl.settings import Path, config, get_logger
-from steam_sales.steam_etl.utils import log_last_run
-from steam_sales.steam_etl.validation import Game, GameDetails, GameDetailsList, GameList, GameMetaDataList
+from steam_sales.steam_etl.utils import content_hash, log_last_run
+from steam_sales.steam_etl.validation import (
+    Game,
+    GameDetails,
+    GameDetailsList,
+    GameList,
+    GameMetaData,
+    GameMetaDataList,
+    GameReview,
+    get_current_utc_time,
+    get_list_adapter,
+    validate_batch,
+)
 
 warnings.filterwarnings("ignore")
 
 
+class RateLimiter:
+    """
+    Spaces out the requests of all the threads sharing it to at most `requests_per_minute`.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60 / requests_per_minute
+        self.next_request = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_request - now
+            self.next_request = max(now, self.next_request) + self.interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
 class BaseFetcher(ABC):
     def __init__(self):
         self.base_logger = get_logger(name="BaseFetcher")
 
+        # Size in bytes of the body of the last response received by this process
+        self.last_response_size = 0
+        # Shared by the threads of a fetcher to stay under the rate limit of the API
+        self.rate_limiter = None
+        # Keeps the connections alive between requests when set, a new connection per request otherwise
+        self.session = None
+
+        # Payload hashes of the stored games of the current batch, sent to the worker processes with the fetcher
+        self.known_hashes = {}
+        self.unchanged = 0
+
+        # Kind of failure of the failed apps of the last batch, and the apps that failed in the last `ingest_batches`
+        self.batch_failures = {}
+        self.failed_appids = set()
+
     def get_request(self, url: str, parameters=None, max_retries=4, wait_time=4, exponential_multiplier=4):
         """
         Sends a GET request to the specified URL with optional parameters.
@@ -45,11 +111,15 @@ class BaseFetcher(ABC):
         """
 
         try_count = 0
+        self.last_response_size = 0
         headers = {"User-Agent": "YourCustomUserAgent/1.0", "DNT": "1"}
         while try_count < max_retries:
             try:
-                response = requests.get(url=url, params=parameters, headers=headers)
+                if self.rate_limiter:
+                    self.rate_limiter.wait()
+                response = (self.session or requests).get(url=url, params=parameters, headers=headers)
                 if response.status_code == 200:
+                    self.last_response_size = len(response.content)
                     return response.json()
                 elif response.status_code == 429:
                     retry_after = int(response.headers.get("Retry-After", wait_time))
@@ -69,11 +139,41 @@ class BaseFetcher(ABC):
             wait_time *= exponential_multiplier
 
         self.base_logger.error(
-            f"Failed to retrieve data from {url}?appids={parameters['appids']} after {max_retries} retries."
+            f"Failed to retrieve data from {url}?appids={(parameters or {}).get('appids')} after {max_retries} retries."
         )
 
         return None
 
+    def hash_payload(self, appid: int, payload: dict):
+        """
+        Hashes a fetched payload and compares it with the stored hash of the game.
+
+        Args:
+            appid (int): The ID of the app.
+            payload (dict): The payload returned by the API for the app.
+
+        Returns:
+            tuple: The hash of the payload and whether it matches the stored hash.
+        """
+        digest = content_hash(payload)
+        return digest, self.known_hashes.get(appid) == digest
+
+    def split_unchanged(self, results: list):
+        """
+        Drops the failed requests and the unchanged games from the results of a batch.
+
+        Args:
+            results (list): The `(hash, record)` pairs returned by the workers, `None` for failed requests and `None`
+            in place of the record for unchanged games.
+
+        Returns:
+            list: The records of the new and changed games, with their payload hash.
+        """
+        results = [result for result in results if result is not None]
+        records = [{**record, "content_hash": digest} for digest, record in results if record is not None]
+        self.unchanged += len(results) - len(records)
+        return records
+
     def get_sql_query(self, file_name: str):
         with open(os.path.join(Path.sql_queries, file_name), "r") as f:
             query = text(f.read())
@@ -106,19 +206,30 @@ class SteamSpyMetadataFetcher(BaseFetcher):
                 if json_data is None:
                     continue
 
-                games = GameMetaDataList(games=json_data.values())
+                games = GameMetaDataList.model_construct(games=validate_batch(GameMetaData, list(json_data.values())))
                 new_docs_added += bulk_ingest_meta_data(games, db)
 
         self.logger.info(f"Successfully added {new_docs_added} documents to the 'steamspy_games_metadata' table")
 
 
 class SteamSpyFetcher(BaseFetcher):
-    def __init__(self, batch_size: int = 1000):
+    def __init__(
+        self,
+        batch_size: int = 1000,
+        refresh: bool = False,
+        bulk: bool = False,
+        max_pages: int = 100,
+        details_max_age: timedelta = timedelta(days=30),
+    ):
         super().__init__()
         self.logger = get_logger(name="SteamSpyFetcher")
 
         self.url = config.STEAMSPY_BASE_URL
         self.batch_size = batch_size
+        self.refresh = refresh
+        self.bulk = bulk
+        self.max_pages = max_pages
+        self.details_max_age = details_max_age
 
     def parse_steamspy_request(self, appid: int):
         """
@@ -128,13 +239,19 @@ class SteamSpyFetcher(BaseFetcher):
             appid (int): The ID of the app to retrieve details for.
 
         Returns:
-            GameDetails: An instance of the GameDetails class containing the parsed data.
+            tuple: The hash of the payload and the raw game details, validated by the parent process as part of the
+            batch. The details are None if the payload did not change since the game was stored. Returns None if the
+            request fails.
         """
         url = config.STEAMSPY_BASE_URL
         parameters = {"request": "appdetails", "appid": appid}
         json_data = self.get_request(url, parameters)
 
-        return GameDetails(**json_data)
+        if json_data is None:
+            return None
+
+        digest, unchanged = self.hash_payload(appid, json_data)
+        return digest, None if unchanged else json_data
 
     def fetch_and_process_app_data(self, app_id_list):
         """
@@ -147,48 +264,318 @@ class SteamSpyFetcher(BaseFetcher):
             GameDetailsList: A list of game details objects containing the fetched app data.
         """
 
-        app_data = []
         with Pool(processes=cpu_count()) as pool:
             results = pool.map(self.parse_steamspy_request, app_id_list)
-            app_data.extend(filter(None, results))
+        self.batch_failures = {appid: "request" for appid, result in zip(app_id_list, results) if result is None}
+        app_data = self.split_unchanged(results)
+
+        # The batch is validated once; the list model is built without validating the games again
+        return GameDetailsList.model_construct(games=validate_batch(GameDetails, app_data))
+
+    def split_stale(self, entries: list, db):
+        """
+        Completes the games of a `request=all` page with their stored tags, languages and genre.
+
+        Pages lack these fields, so they are taken from the stored record of the game as long as they were fetched
+        less than `details_max_age` ago. The other games need a per-app request.
+
+        Args:
+            entries (list): The games of the page.
+            db (Session): The database session.
+
+        Returns:
+            tuple: The `(hash, record)` pairs of the completed games, with None in place of the record for unchanged
+            games, and the app IDs of the games whose details are missing or stale.
+        """
+        appids = [entry["appid"] for entry in entries]
+        details = get_steamspy_details(appids, db)
+        self.known_hashes = get_content_hashes(model.GameDetails.__table__, appids, db)
+        cutoff = get_current_utc_time().replace(tzinfo=None) - self.details_max_age
+
+        results, stale = [], []
+        for entry in entries:
+            stored = details.get(entry["appid"])
+            if stored is None or stored["details_updated_at"] is None or stored["details_updated_at"] < cutoff:
+                stale.append(entry["appid"])
+                continue
+
+            # Same fields as a per-app response, so the hashes of both kinds of payload can be compared
+            details_updated_at = stored.pop("details_updated_at")
+            payload = {**entry, **stored}
+            digest, unchanged = self.hash_payload(entry["appid"], payload)
+            results.append((digest, None if unchanged else {**payload, "details_updated_at": details_updated_at}))
+
+        return results, stale
+
+    def ingest_pages(self, db) -> int:
+        """
+        Ingests SteamSpy data from the `request=all` pages, which return most fields of up to 1000 games each.
+
+        The app IDs and names also go to `steamspy_games_metadata`. Only the games whose tags, languages and genre
+        are missing or stale are requested one by one.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            int: The number of records written.
+        """
+        new_docs_added = 0
+        stale_count = 0
+
+        for page in tqdm(range(self.max_pages)):
+            json_data = self.get_request(self.url, {"request": "all", "page": page})
+
+            if json_data is None:
+                continue
+            if not json_data:
+                break
+
+            entries = list(json_data.values())
+            bulk_ingest_meta_data(GameMetaDataList.model_construct(games=validate_batch(GameMetaData, entries)), db)
+
+            results, stale = self.split_stale(entries, db)
+            app_data = GameDetailsList.model_construct(games=validate_batch(GameDetails, self.split_unchanged(results)))
+            new_docs_added += bulk_ingest_steamspy_data(app_data, db)
+
+            # Stale games are written even if their payload did not change, to record when their details were fetched
+            self.known_hashes = {}
+            for i in range(0, len(stale), self.batch_size):
+                new_docs_added += bulk_ingest_steamspy_data(
+                    self.fetch_and_process_app_data(stale[i : i + self.batch_size]), db
+                )
+            stale_count += len(stale)
+
+        self.logger.info(f"Requested {stale_count} games one by one for missing or stale details")
+        return new_docs_added
+
+    def ingest_app_ids(self, db) -> int:
+        """
+        Ingests SteamSpy data with one `request=appdetails` call per game, for the new or all known app IDs.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            int: The number of records written.
+        """
+        query = self.get_sql_query("steamspy_appids.sql" if self.refresh else "steamspy_appid_dup.sql")
+
+        result = db.execute(query)
+        app_id_list = [row[0] for row in result.fetchall()]
+        self.logger.info(f"{len(app_id_list)} ID's found")
+
+        return self.ingest_batches(app_id_list, db)
+
+    def ingest_batches(self, app_id_list: list, db) -> int:
+        """
+        Fetches the given app IDs in batches and writes the new and changed games.
+
+        The app IDs that could not be fetched are left in `failed_appids`.
+
+        Args:
+            app_id_list (list): The app IDs to fetch.
+            db (Session): The database session.
+
+        Returns:
+            int: The number of records written.
+        """
+        new_docs_added = 0
+        self.failed_appids = set()
+
+        for i in tqdm(range(0, len(app_id_list), self.batch_size)):
+            batch = app_id_list[i : i + self.batch_size]
+            self.known_hashes = get_content_hashes(model.GameDetails.__table__, batch, db)
+            app_data = self.fetch_and_process_app_data(batch)
+            self.failed_appids.update(self.batch_failures)
+
+            new_docs_added += bulk_ingest_steamspy_data(app_data, db)
 
-        return GameDetailsList(games=app_data)
+        return new_docs_added
 
     @log_last_run(scraper_name="steamspy")
     def run(self):
         """
         Collects SteamSpy data for a list of app IDs in batches and ingests the data into a database.
 
+        Games whose payload has the same hash as the stored one are neither validated nor written, so they are not
+        cleaned again either.
+        The player and review counts that changed are appended to the `player_snapshots` history.
+
         Args:
             batch_size (int, optional): The number of app IDs to process in each batch. Defaults to 1000.
+            refresh (bool, optional): If True, every known app ID is fetched again instead of the new ones only.
+            Defaults to False.
+            bulk (bool, optional): If True, the data is read from the `request=all` pages and per-app requests are
+            only made for games whose tags, languages and genre are missing or older than `details_max_age`.
+            Defaults to False.
+            max_pages (int, optional): The number of `request=all` pages to read in bulk mode. Defaults to 100.
+            details_max_age (timedelta, optional): The age after which the tags, languages and genre of a game are
+            requested again in bulk mode. Defaults to 30 days.
         """
-        new_docs_added = 0
-
         with get_db() as db:
-            query = self.get_sql_query("steamspy_appid_dup.sql")
+            ensure_monthly_partitions(model.PlayerSnapshot.__table__, db)
 
-            result = db.execute(query)
-            app_id_list = [row[0] for row in result.fetchall()]
-            self.logger.info(f"{len(app_id_list)} ID's found")
+            new_docs_added = self.ingest_pages(db) if self.bulk else self.ingest_app_ids(db)
 
-            for i in tqdm(range(0, len(app_id_list), self.batch_size)):
-                batch = app_id_list[i : i + self.batch_size]
-                app_data = self.fetch_and_process_app_data(batch)
+        self.logger.info(f"Successfully added {new_docs_added} documents to the 'steamspy_games_raw' table")
+        self.logger.info(f"Skipped {self.unchanged} unchanged documents")
 
-                new_docs_added += bulk_ingest_steamspy_data(app_data, db)
 
-        self.logger.info(f"Successfully added {new_docs_added} documents to the 'steamspy_games_raw' table")
+class AppDetailsFields(str, Enum):
+    all = "all"
+    parsed = "parsed"
+
+
+class FetchOrder(str, Enum):
+    appid = "appid"
+    popularity = "popularity"
 
 
 class SteamStoreFetcher(BaseFetcher):
-    def __init__(self, batch_size: int = 5, bulk_factor: int = 10, reverse: bool = False):
+    change_feed_page_size = 50000
+    # The last run is logged with the time it started, this margin covers the clock difference with Steam
+    change_feed_overlap = timedelta(hours=1)
+
+    # The appdetails fields read by `parse_game_data`, which leaves out screenshots, movies, packages, etc. "basic" is
+    # the group of the descriptive fields; they are also named one by one, as not all of them belong to the group
+    parsed_fields = [
+        "basic",
+        "type",
+        "name",
+        "steam_appid",
+        "required_age",
+        "is_free",
+        "controller_support",
+        "dlc",
+        "detailed_description",
+        "about_the_game",
+        "short_description",
+        "supported_languages",
+        "reviews",
+        "header_image",
+        "capsule_image",
+        "website",
+        "pc_requirements",
+        "developers",
+        "publishers",
+        "price_overview",
+        "platforms",
+        "metacritic",
+        "categories",
+        "genres",
+        "recommendations",
+        "achievements",
+        "release_date",
+    ]
+    # With `sample_payloads`, one app in this many on average is also requested without filters, to estimate the
+    # bytes saved
+    payload_sample_every = 100
+
+    # Delay before the first retry of a failed app per kind of failure, doubled with every failed attempt
+    retry_delays = {"request": timedelta(hours=1), "not_found": timedelta(days=1), "parse": timedelta(days=1)}
+    max_retry_delay = timedelta(days=60)
+    # Apps are given up on after this many failed fetches in a row
+    max_attempts = 8
+
+    def __init__(
+        self,
+        batch_size: int = 5,
+        bulk_factor: int = 10,
+        reverse: bool = False,
+        refresh: bool = False,
+        changes: bool = False,
+        fields: AppDetailsFields = AppDetailsFields.parsed,
+        order: FetchOrder = FetchOrder.popularity,
+        sample_payloads: bool = False,
+    ):
         super().__init__()
         self.logger = get_logger(name="SteamStoreFetcher")
 
         self.url = config.STEAM_BASE_SEARCH_URL
+        self.change_feed_url = f"{config.STEAM_API_BASE_URL}/IStoreService/GetAppList/v1/"
         self.batch_size = batch_size
         self.bulk_factor = bulk_factor
         self.reverse = reverse
+        self.refresh = refresh
+        self.changes = changes
+        self.filters = ",".join(self.parsed_fields) if fields == AppDetailsFields.parsed else None
+        self.order = order
+        self.sample_payloads = sample_payloads
+
+        self.payload_sizes = []
+        self.sampled_payload_sizes = []
+
+        # Kind of failure of the last app fetched by this process, None if it was fetched successfully
+        self.last_failure = None
+
+    def prioritize(self, app_id_list: list, db) -> list:
+        """
+        Orders app IDs by popularity on SteamSpy, so that the most valuable games are fetched first.
+
+        Games are ranked by the lower bound of their owners range, then by their concurrent users and then by their
+        number of reviews. Games unknown to SteamSpy come last, in their original order.
+
+        Args:
+            app_id_list (list): The app IDs to order.
+            db (Session): The database session.
+
+        Returns:
+            list: The app IDs, most popular first.
+        """
+        result = db.execute(self.get_sql_query("get_popularity.sql"))
+        popularity = {appid: (owners or 0, ccu or 0, reviews or 0) for appid, owners, ccu, reviews in result.fetchall()}
+
+        # The sort is stable, so games with the same popularity keep their order
+        return sorted(app_id_list, key=lambda appid: popularity.get(appid, (-1, -1, -1)), reverse=True)
+
+    def get_changed_appids(self, db):
+        """
+        Asks the Steam app list change feed which apps changed since the last `steam` run.
+
+        The period starts when the last completed `steam` run started, so apps changed while it was running are asked
+        for again. The feed is paged by app ID. If a page cannot be retrieved, the whole run fails, so that it is not
+        logged and the next run asks for the same period again.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            list or None: The app IDs of the games and DLCs modified since the last run, or None if no `steam` run was
+            logged yet.
+
+        Raises:
+            RequestException: If a page of the change feed cannot be retrieved.
+        """
+        last_run = get_last_run_time("steam", db)
+        if last_run is None:
+            return None
+
+        since = (last_run - self.change_feed_overlap).replace(tzinfo=timezone.utc)
+        parameters = {
+            "key": config.STEAM_API_KEY,
+            "if_modified_since": int(since.timestamp()),
+            "include_games": "true",
+            "include_dlc": "true",
+            "max_results": self.change_feed_page_size,
+            "last_appid": 0,
+        }
+
+        app_id_list = []
+        while True:
+            json_data = self.get_request(self.change_feed_url, parameters)
+            if json_data is None:
+                raise RequestException(f"Change feed stopped after {len(app_id_list)} app IDs")
+
+            response = json_data.get("response", {})
+            app_id_list.extend(app["appid"] for app in response.get("apps", []))
+
+            if not response.get("have_more_results"):
+                break
+            parameters["last_appid"] = response["last_appid"]
+
+        self.logger.info(f"{len(app_id_list)} apps changed since {since:%Y-%m-%d %H:%M} UTC")
+        return sorted(set(app_id_list))
 
     def parse_steam_request(self, appid: int):
         """
@@ -198,21 +585,32 @@ class SteamStoreFetcher(BaseFetcher):
             appid (int): The ID of the Steam application.
 
         Returns:
-            dict: The data retrieved from the Steam request, or None if the request fails.
+            tuple: The hash of the payload and the data retrieved from the Steam request. The data is None if the
+            payload did not change since the game was stored, in which case it is not parsed. Returns None if the
+            request fails.
         """
         url = f"{self.url}/api/appdetails/"
         parameters = {"appids": appid}
+        if self.filters:
+            parameters["filters"] = self.filters
 
         json_data = self.get_request(url, parameters=parameters)
+        self.last_failure = "request"
 
         if json_data:
             resp = json_data[str(appid)]
+            self.last_failure = "not_found"
             if resp["success"]:
-                data = resp["data"]
-                data = self.parse_game_data(data)
+                self.last_failure = None
+                digest, unchanged = self.hash_payload(appid, resp["data"])
+                if unchanged:
+                    return digest, None
 
-                if data and appid == data.appid:
-                    return data
+                data = self.parse_game_data(resp["data"])
+
+                if data and appid == data["appid"]:
+                    return digest, data
+                self.last_failure = "parse"
 
             self.logger.error(f"Could not find data for appid {appid} in Steam Store Database")
 
@@ -262,13 +660,15 @@ class SteamStoreFetcher(BaseFetcher):
 
     def parse_game_data(self, data: dict):
         """
-        Parses the Steam game data and returns a Game object.
+        Parses the Steam game data into the fields of a Game object.
+
+        The fields are validated by the parent process, once per batch.
 
         Args:
             data (dict): The Steam game data to be parsed.
 
         Returns:
-            Game: A Game object containing the parsed data, or None if the data is invalid.
+            dict: The fields of the Game object, or None if the data is invalid.
         """
         try:
             game_data = {
@@ -301,12 +701,58 @@ class SteamStoreFetcher(BaseFetcher):
                 "coming_soon": data["release_date"]["coming_soon"],
             }
 
-            return Game(**game_data)
+            return game_data
         except KeyError as ke:
             self.logger.error(f"KeyError parsing game data for `{data['steam_appid']}`: Missing key {ke}")
 
         return None
 
+    def fetch_app(self, appid: int):
+        """
+        Fetches and parses the data of an app, measuring the size of the payload.
+
+        When fields are filtered and `sample_payloads` is set, apps are also requested without filters at random, one in
+        `payload_sample_every` on average.
+
+        Args:
+            appid (int): The ID of the Steam application.
+
+        Returns:
+            tuple: The result of `parse_steam_request`, the size in bytes of the payload, the size of the unfiltered
+            payload for sampled apps, None otherwise, and the kind of failure if the app could not be fetched.
+        """
+        result = self.parse_steam_request(appid)
+        size = self.last_response_size
+        failure = self.last_failure
+
+        unfiltered_size = None
+        # A random draw rather than the app ID, whose residues are not spread evenly across types of apps
+        sampled = random.random() < 1 / self.payload_sample_every
+        if self.sample_payloads and self.filters and size and sampled:
+            self.get_request(f"{self.url}/api/appdetails/", parameters={"appids": appid})
+            unfiltered_size = self.last_response_size or None
+
+        return result, size, unfiltered_size, failure
+
+    def report_payload_sizes(self):
+        """
+        Logs the average payload size per request and, when payloads are sampled, the bytes saved per request by the
+        field filters, estimated on the apps that were also requested without filters.
+        """
+        if not self.payload_sizes:
+            return
+
+        average = sum(self.payload_sizes) / len(self.payload_sizes)
+        self.logger.info(f"Received {sum(self.payload_sizes)} bytes, {average:.0f} bytes per request")
+
+        if self.sampled_payload_sizes:
+            saved = sum(unfiltered - size for size, unfiltered in self.sampled_payload_sizes)
+            unfiltered = sum(unfiltered for _, unfiltered in self.sampled_payload_sizes)
+            self.logger.info(
+                f"Field filters saved {saved / len(self.sampled_payload_sizes):.0f} bytes per request "
+                f"({saved / unfiltered:.0%}), measured on {len(self.sampled_payload_sizes)} sampled apps"
+            )
+
     def fetch_and_process_app_data(self, batch_list: list):
         """
         Fetches and processes app data for a given list of app IDs.
@@ -315,17 +761,81 @@ class SteamStoreFetcher(BaseFetcher):
             app_id_list (list): A list of app IDs to fetch data for.
 
         Returns:
-            GameList: A GameList object containing the processed app data.
+            list: The validated Game objects of the batch.
         """
-        app_data = []
         if batch_list:
             with Pool(processes=cpu_count()) as pool:
-                results = pool.map(self.parse_steam_request, batch_list)
-                app_data.extend(filter(None, results))
+                results = pool.map(self.fetch_app, batch_list)
 
-            return app_data
+            self.payload_sizes.extend(size for _, size, _, _ in results if size)
+            self.sampled_payload_sizes.extend((size, unfiltered) for _, size, unfiltered, _ in results if unfiltered)
+            self.batch_failures = {
+                appid: failure for appid, (_, _, _, failure) in zip(batch_list, results) if failure is not None
+            }
+            return validate_batch(Game, self.split_unchanged([result for result, _, _, _ in results]))
         return None
 
+    def update_retry_queue(self, batch_list: list, failures: dict, db):
+        """
+        Queues the failed apps for a retry and removes the other apps from the queue.
+
+        The delay before the next attempt doubles with every failed fetch, starting from the delay of the kind of
+        failure, up to `max_retry_delay`. After `max_attempts` failed fetches the app is given up on.
+
+        Args:
+            batch_list (list): The app IDs fetched.
+            failures (dict): A mapping of the app IDs that could not be fetched to the kind of failure.
+            db (Session): The database session.
+        """
+        attempts = get_retry_attempts("steam", list(failures), db)
+        failed_at = get_current_utc_time()
+
+        retries = []
+        for appid, failure in failures.items():
+            attempt = attempts.get(appid, 0) + 1
+            delay = min(self.retry_delays[failure] * 2 ** (attempt - 1), self.max_retry_delay)
+            retries.append(
+                {
+                    "source": "steam",
+                    "appid": appid,
+                    "kind": failure,
+                    "attempts": attempt,
+                    "last_failed_at": failed_at,
+                    "next_attempt_at": failed_at + delay if attempt < self.max_attempts else None,
+                }
+            )
+
+        succeeded = [appid for appid in batch_list if appid not in failures]
+        update_retries("steam", retries, succeeded, db)
+
+    def write_games(self, games: GameList, batch_list: list, failures: dict, db) -> int:
+        """
+        Writes the buffered games, then updates the retry queue with the apps fetched since the last write.
+
+        The apps fetched successfully only leave the queue once their games are written, so a failed write leaves them
+        queued.
+
+        Args:
+            games (GameList): The buffered games, emptied once written.
+            batch_list (list): The app IDs fetched since the last write.
+            failures (dict): A mapping of the app IDs that could not be fetched to the kind of failure.
+            db (Session): The database session.
+
+        Returns:
+            int: The number of records written.
+        """
+        if not batch_list:
+            return 0
+
+        num_games = games.get_num_games()
+        written = bulk_ingest_steam_data(games, db) if num_games else 0
+        games.games = []
+
+        if written < num_games:
+            batch_list = list(failures)
+        self.update_retry_queue(batch_list, failures, db)
+        return written
+
     @log_last_run(scraper_name="steam")
     def run(self):
         """
@@ -338,42 +848,574 @@ class SteamStoreFetcher(BaseFetcher):
         - bulk_factor (int): Determines when to perform a bulk insert. Data is ingested in bulk when the
         number of processed games reaches batch_size * bulk_factor. Default is 10.
         - reverse (bool): If set to True, the app IDs are processed in reverse order. Default is False.
+        - refresh (bool): If set to True, every known app ID is fetched again instead of the new ones only. Games
+        whose payload has the same hash as the stored one are neither parsed, validated nor written. Default is False.
+        - changes (bool): If set to True, only the app IDs reported by the Steam app list change feed as modified
+        since the last `steam` run are fetched. Until a run is logged, the new app IDs are fetched. Default is False.
+        - fields (AppDetailsFields): The appdetails fields to request, `parsed` for the fields read by
+        `parse_game_data` only or `all` for the full documents. Default is parsed.
+        - sample_payloads (bool): If set to True with the `parsed` fields, apps drawn at random, one in
+        `payload_sample_every` on average, are requested a second time without filters, to log the bytes saved per
+        request by the filters. Default is False.
+        - order (FetchOrder): The order the app IDs are fetched in, `popularity` for the most owned, played and
+        reviewed games on SteamSpy first or `appid` for ascending app IDs. Default is popularity.
+
+        The apps that failed in earlier runs and whose next attempt is due are fetched as well. Failed apps are queued
+        in `fetch_retries` with an exponential backoff, and left out of the new and refreshed app IDs until they
+        are due. Apps leave the queue once their games are written.
+
+        The prices that changed are appended to the `price_snapshots` history.
         """
-        new_docs_added = 0
-
         # Create a database session
         with get_db() as db:
+            ensure_monthly_partitions(model.PriceSnapshot.__table__, db)
 
-            # Query unique appids from the database
-            query = self.get_sql_query("steam_appid_dup.sql")
+            app_id_list = self.get_changed_appids(db) if self.changes else None
 
-            result = db.execute(query)
-            app_id_list = [row[0] for row in result.fetchall()]
+            if app_id_list is None:
+                # Query unique appids from the database
+                query = self.get_sql_query("steam_appids.sql" if self.refresh else "steam_appid_dup.sql")
+
+                result = db.execute(query)
+                app_id_list = [row[0] for row in result.fetchall()]
+
+            queued = set(app_id_list)
+            retries = [appid for appid in get_due_retries("steam", db) if appid not in queued]
+            self.logger.info(f"{len(retries)} failed ID's due for a retry")
+            app_id_list += retries
+
+            if self.order == FetchOrder.popularity:
+                app_id_list = self.prioritize(app_id_list, db)
 
             if self.reverse:
                 app_id_list.reverse()
 
             self.logger.info(f"{len(app_id_list)} ID's found")
 
-            # Get the list of games batch them and insert into db
-            games = GameList(games=[])
+            new_docs_added = self.ingest_batches(app_id_list, db)
+
+        self.logger.info(f"Successfully added {new_docs_added} documents to the 'steam_games_raw' table")
+        self.logger.info(f"Skipped {self.unchanged} unchanged documents")
+        self.report_payload_sizes()
+
+    def ingest_batches(self, app_id_list: list, db) -> int:
+        """
+        Fetches the given app IDs in batches and writes the new and changed games in bulk.
+
+        The app IDs that could not be fetched are left in `failed_appids`.
+
+        Args:
+            app_id_list (list): The app IDs to fetch.
+            db (Session): The database session.
+
+        Returns:
+            int: The number of records written.
+        """
+        new_docs_added = 0
+        self.failed_appids = set()
+
+        # Get the list of games batch them and insert into db
+        games = GameList.model_construct(games=[])
+        # The apps fetched since the last write and their failures, applied to the retry queue once written
+        fetched, failures = [], {}
+
+        for i in tqdm(range(0, len(app_id_list), self.batch_size)):
+            batch = app_id_list[i : i + self.batch_size]
+            self.known_hashes = get_content_hashes(model.Game.__table__, batch, db)
+            app_data = self.fetch_and_process_app_data(batch)
+            self.failed_appids.update(self.batch_failures)
+            fetched.extend(batch)
+            failures.update(self.batch_failures)
+
+            if app_data:
+                games.games.extend(app_data)
+
+            if games.get_num_games() >= self.batch_size * self.bulk_factor:
+                new_docs_added += self.write_games(games, fetched, failures, db)
+                fetched, failures = [], {}
+
+        # Additional check to process remaining records
+        new_docs_added += self.write_games(games, fetched, failures, db)
+
+        return new_docs_added
+
+
+class SteamPriceFetcher(BaseFetcher):
+    def __init__(self, batch_size: int = 250):
+        super().__init__()
+        self.logger = get_logger(name="SteamPriceFetcher")
+
+        self.url = f"{config.STEAM_BASE_SEARCH_URL}/api/appdetails/"
+        self.batch_size = batch_size
+
+    def fetch_prices(self, app_id_list: list, country_code: str = None) -> dict:
+        """
+        Fetches the prices of several apps in a single request, filtered down to their `price_overview`.
+
+        Args:
+            app_id_list (list): The IDs of the apps.
+            country_code (str, optional): The country of the store, which sets the currency. Defaults to None, the
+            country of the requesting IP address.
+
+        Returns:
+            dict: A mapping of app ID to its `price_overview` object, for the apps that have a price.
+        """
+        parameters = {"appids": ",".join(map(str, app_id_list)), "filters": "price_overview"}
+        if country_code:
+            parameters["cc"] = country_code
+        json_data = self.get_request(self.url, parameters)
+
+        if json_data is None:
+            return {}
+
+        prices = {}
+        for appid, resp in json_data.items():
+            # Apps without a price have an empty list as data
+            data = resp.get("data") if resp.get("success") else None
+            if isinstance(data, dict) and "price_overview" in data:
+                prices[int(appid)] = data["price_overview"]
+        return prices
+
+    @log_last_run(scraper_name="prices")
+    def run(self):
+        """
+        Refreshes the prices of the paid games stored in `steam_games_raw`.
+
+        The prices are requested for `batch_size` games at a time. Prices that changed are appended to the
+        `price_snapshots` history and written to the raw rows, so that the cleaner picks them up.
+
+        Args:
+            batch_size (int, optional): The number of app IDs per request. Defaults to 250.
+        """
+        changed = 0
+
+        with get_db() as db:
+            ensure_monthly_partitions(model.PriceSnapshot.__table__, db)
+
+            result = db.execute(self.get_sql_query("get_priced_appids.sql"))
+            app_id_list = [row[0] for row in result.fetchall()]
+            self.logger.info(f"{len(app_id_list)} ID's found")
 
             for i in tqdm(range(0, len(app_id_list), self.batch_size)):
-                batch = app_id_list[i : i + self.batch_size]
-                app_data = self.fetch_and_process_app_data(batch)
+                prices = self.fetch_prices(app_id_list[i : i + self.batch_size])
+                changed += bulk_update_prices(prices, db)
 
-                if app_data:
-                    games.games.extend(app_data)
+        self.logger.info(f"Successfully updated {changed} prices in the 'steam_games_raw' table")
 
-                if games.get_num_games() >= self.batch_size * self.bulk_factor:
-                    new_docs_added += bulk_ingest_steam_data(games, db)
-                    games.games = []
 
-            # Additional check to process remaining records
-            if games.get_num_games() > 0:
-                new_docs_added += bulk_ingest_steam_data(games, db)
+class RegionalPriceFetcher(SteamPriceFetcher):
+    def __init__(
+        self,
+        batch_size: int = 250,
+        regions: list = None,
+        requests_per_minute: int = 40,
+        max_workers: int = 8,
+    ):
+        super().__init__(batch_size=batch_size)
+        self.logger = get_logger(name="RegionalPriceFetcher")
 
-        self.logger.info(f"Successfully added {new_docs_added} documents to the 'steam_games_raw' table")
+        self.regions = regions or config.PRICE_REGIONS
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.usd_rates = pd.Series({"USD": 1.0, **config.CURRENCY_RATES})
+
+    def fetch_region(self, app_id_list: list, country_code: str) -> list:
+        """
+        Fetches the prices of a batch of apps in the store of a country.
+
+        Args:
+            app_id_list (list): The IDs of the apps.
+            country_code (str): The country of the store.
+
+        Returns:
+            list: A record per app with a final price. Without an initial price, the game is not discounted.
+        """
+        records = []
+        for appid, price_overview in self.fetch_prices(app_id_list, country_code).items():
+            final_price = price_overview.get("final")
+            if final_price is None:
+                continue
+
+            records.append(
+                {
+                    "appid": appid,
+                    "country_code": country_code,
+                    "currency": price_overview["currency"],
+                    "initial_price": price_overview.get("initial", final_price),
+                    "final_price": final_price,
+                    "discount_percent": price_overview.get("discount_percent", 0),
+                }
+            )
+        return records
+
+    def normalize(self, records: list) -> list:
+        """
+        Converts the final prices of a batch to USD with the rates of the settings, all at once.
+
+        Args:
+            records (list): The records of the batch, for all regions.
+
+        Returns:
+            list: The records with their `final_price_usd` and `captured_at`.
+        """
+        df = pd.DataFrame(records)
+        df["final_price_usd"] = df["final_price"] / 100 * df["currency"].map(self.usd_rates)
+
+        unknown = df.loc[df["final_price_usd"].isna(), "currency"].unique()
+        if unknown.size:
+            self.logger.warning(f"No USD rate for {', '.join(unknown)}, add them to CURRENCY_RATES")
+
+        df["final_price_usd"] = df["final_price_usd"].astype(object).where(df["final_price_usd"].notna(), None)
+        captured_at = get_current_utc_time()
+        return [{**record, "captured_at": captured_at} for record in df.to_dict("records")]
+
+    @log_last_run(scraper_name="regional")
+    def run(self):
+        """
+        Collects the prices of the paid games stored in `steam_games_raw` in the store of every configured country.
+
+        The regions of a batch are requested in parallel threads, which share one rate limit. The prices are
+        converted to USD per batch and upserted into `regional_prices`.
+
+        Args:
+            batch_size (int, optional): The number of app IDs per request. Defaults to 250.
+            regions (list, optional): The country codes of the stores. Defaults to `PRICE_REGIONS` of the settings.
+            requests_per_minute (int, optional): The maximum number of requests per minute, over all threads.
+            Defaults to 40.
+            max_workers (int, optional): The number of threads. Defaults to 8.
+        """
+        written = 0
+
+        with get_db() as db:
+            result = db.execute(self.get_sql_query("get_priced_appids.sql"))
+            app_id_list = [row[0] for row in result.fetchall()]
+            self.logger.info(f"{len(app_id_list)} ID's found, {len(self.regions)} regions")
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for i in tqdm(range(0, len(app_id_list), self.batch_size)):
+                    batch = app_id_list[i : i + self.batch_size]
+                    results = executor.map(lambda country_code: self.fetch_region(batch, country_code), self.regions)
+                    records = [record for region_records in results for record in region_records]
+
+                    if records:
+                        written += upsert_regional_prices(self.normalize(records), db)
+
+        self.logger.info(f"Successfully wrote {written} prices to the 'regional_prices' table")
+
+
+class SteamReviewFetcher(BaseFetcher):
+    page_size = 100
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        max_pages: int = 50,
+        requests_per_minute: int = 60,
+        max_workers: int = 8,
+    ):
+        super().__init__()
+        self.logger = get_logger(name="SteamReviewFetcher")
+
+        self.url = f"{config.STEAM_BASE_SEARCH_URL}/appreviews"
+        self.batch_size = batch_size
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_minute)
+
+    @staticmethod
+    def parse_review(appid: int, review: dict) -> dict:
+        """
+        Flattens a review of the appreviews endpoint into the fields of a GameReview object.
+
+        Args:
+            appid (int): The ID of the reviewed app.
+            review (dict): The review.
+
+        Returns:
+            dict: The fields of the GameReview object.
+        """
+
+        def to_datetime(timestamp: int) -> datetime:
+            return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+        return {
+            "recommendationid": review["recommendationid"],
+            "appid": appid,
+            "language": review["language"],
+            "voted_up": review["voted_up"],
+            "votes_up": review["votes_up"],
+            "votes_funny": review["votes_funny"],
+            "weighted_vote_score": review["weighted_vote_score"],
+            "playtime_at_review": review.get("author", {}).get("playtime_at_review"),
+            "steam_purchase": review["steam_purchase"],
+            "received_for_free": review["received_for_free"],
+            "written_during_early_access": review["written_during_early_access"],
+            "created_at": to_datetime(review["timestamp_created"]),
+            "updated_at": to_datetime(review["timestamp_updated"]),
+        }
+
+    def read_pages(self, appid: int, cursor: str, max_pages: int = None, newer_than: datetime = None):
+        """
+        Reads pages of reviews of an app, newest first, starting at a cursor.
+
+        Args:
+            appid (int): The ID of the app.
+            cursor (str): The cursor of the first page, "*" for the newest reviews.
+            max_pages (int, optional): The maximum number of pages to read. Defaults to None, no limit.
+            newer_than (datetime, optional): Stop at the first review created at or before this time. Defaults to
+            None.
+
+        Returns:
+            tuple: The reviews read, and the cursor of the next page, None if there are no more pages to read.
+        """
+        url = f"{self.url}/{appid}"
+        parameters = {
+            "json": 1,
+            "filter": "recent",
+            "language": "all",
+            "purchase_type": "all",
+            "num_per_page": self.page_size,
+        }
+
+        reviews = []
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            json_data = self.get_request(url, {**parameters, "cursor": cursor})
+            pages += 1
+
+            # The page is asked for again on the next run
+            if not json_data or not json_data.get("success"):
+                self.logger.error(f"Could not read the reviews of appid {appid}")
+                return reviews, cursor
+
+            page = [self.parse_review(appid, review) for review in json_data.get("reviews", [])]
+            if newer_than is not None:
+                new = [review for review in page if review["created_at"] > newer_than]
+                reviews.extend(new)
+                if len(new) < len(page):
+                    return reviews, None
+            else:
+                reviews.extend(page)
+
+            # The last page returns no reviews, or the cursor it was asked with
+            next_cursor = json_data.get("cursor")
+            if not page or not next_cursor or next_cursor == cursor:
+                return reviews, None
+            cursor = next_cursor
+
+        return reviews, cursor
+
+    def fetch_app_reviews(self, appid: int, state: dict):
+        """
+        Fetches the reviews of an app that are not stored yet.
+
+        Reviews created since the newest stored review are read first, down to that review. Then the older reviews
+        are read from the stored cursor, until the first review is reached. Both reads stop after `max_pages` pages
+        per run.
+
+        A read of the newest reviews that stops before the newest stored review is resumed from `head_cursor` on the
+        next run. `newest_created_at` only moves to the newest review read, kept in `head_newest_created_at` until
+        then, once the read reaches the stored reviews, so the reviews in between are never skipped.
+
+        Args:
+            appid (int): The ID of the app.
+            state (dict): The stored `cursor`, `newest_created_at`, `head_cursor` and `head_newest_created_at` of the
+            app, None if it was never read.
+
+        Returns:
+            tuple: The reviews read, and the new pagination state of the app.
+        """
+        state = state or {"cursor": "*", "newest_created_at": None}
+        newest_created_at = state["newest_created_at"]
+        head_cursor = state.get("head_cursor")
+        head_newest_created_at = state.get("head_newest_created_at")
+        reviews = []
+
+        if newest_created_at is not None:
+            reviews, head_cursor = self.read_pages(
+                appid, head_cursor or "*", max_pages=self.max_pages, newer_than=newest_created_at
+            )
+            if reviews:
+                newest_read = max(review["created_at"] for review in reviews)
+                head_newest_created_at = max(head_newest_created_at or newest_read, newest_read)
+            if head_cursor is None:
+                newest_created_at = head_newest_created_at or newest_created_at
+                head_newest_created_at = None
+
+        # Apps without any review are read from the first page on every run
+        cursor = state["cursor"] if newest_created_at is not None else state["cursor"] or "*"
+        if cursor is not None:
+            older, cursor = self.read_pages(appid, cursor, max_pages=self.max_pages)
+            if newest_created_at is None and older:
+                newest_created_at = max(review["created_at"] for review in older)
+            reviews.extend(older)
+
+        return reviews, {
+            "appid": appid,
+            "cursor": cursor,
+            "newest_created_at": newest_created_at,
+            "head_cursor": head_cursor,
+            "head_newest_created_at": head_newest_created_at,
+        }
+
+    @log_last_run(scraper_name="reviews")
+    def run(self):
+        """
+        Streams the user reviews of the games stored in `steam_games_raw` into the `game_reviews` table.
+
+        The apps of a batch are read concurrently by threads sharing one rate limit, and the reviews of the batch are
+        written in bulk together with the pagination state of its apps, so an interrupted run resumes where it
+        stopped and later runs only read the reviews posted since.
+
+        Args:
+            batch_size (int, optional): The number of apps read concurrently and written together. Defaults to 50.
+            max_pages (int, optional): The maximum number of pages of newer and of older reviews read per app and run.
+            Defaults to 50.
+            requests_per_minute (int, optional): The maximum number of requests per minute, over all threads.
+            Defaults to 60.
+            max_workers (int, optional): The number of threads. Defaults to 8.
+        """
+        new_docs_added = 0
+
+        with get_db() as db:
+            result = db.execute(self.get_sql_query("get_review_appids.sql"))
+            app_id_list = [row[0] for row in result.fetchall()]
+            self.logger.info(f"{len(app_id_list)} ID's found")
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for i in tqdm(range(0, len(app_id_list), self.batch_size)):
+                    batch = app_id_list[i : i + self.batch_size]
+                    states = get_review_cursors(batch, db)
+                    results = list(executor.map(lambda appid: self.fetch_app_reviews(appid, states.get(appid)), batch))
+
+                    reviews = validate_batch(
+                        GameReview, [review for app_reviews, _ in results for review in app_reviews]
+                    )
+                    cursors = [state for _, state in results]
+                    new_docs_added += bulk_ingest_reviews(
+                        get_list_adapter(GameReview).dump_python(reviews), cursors, db
+                    )
+
+        self.logger.info(f"Successfully added {new_docs_added} documents to the 'game_reviews' table")
+
+
+class PlayerCountSampler(BaseFetcher):
+    # Samples are written in batches of this many rows, so a sample of any size is never held in memory at once
+    insert_batch_size = 1000
+
+    def __init__(
+        self,
+        top_n: int = 500,
+        interval: timedelta = timedelta(minutes=10),
+        samples: int = None,
+        requests_per_minute: int = 600,
+        max_workers: int = 32,
+    ):
+        super().__init__()
+        self.logger = get_logger(name="PlayerCountSampler")
+
+        self.url = f"{config.STEAM_API_BASE_URL}/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+        self.top_n = top_n
+        self.interval = interval
+        self.samples = samples
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_minute)
+
+        # One keep-alive connection per thread, reused by every sample
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch_player_count(self, appid: int):
+        """
+        Fetches the current number of players of an app.
+
+        A failed request is not retried, the app is sampled again with the next sample.
+
+        Args:
+            appid (int): The ID of the app.
+
+        Returns:
+            dict or None: The app ID and its `player_count`, None if the request failed.
+        """
+        json_data = self.get_request(self.url, {"appid": appid}, max_retries=1, wait_time=0)
+        player_count = (json_data or {}).get("response", {}).get("player_count")
+        if player_count is None:
+            return None
+        return {"appid": appid, "player_count": player_count}
+
+    def sample(self, app_id_list: list, executor: ThreadPoolExecutor, db) -> int:
+        """
+        Samples the current number of players of the given apps and writes them in batches.
+
+        Args:
+            app_id_list (list): The IDs of the apps.
+            executor (ThreadPoolExecutor): The threads sending the requests.
+            db (Session): The database session.
+
+        Returns:
+            int: The number of samples written.
+        """
+        captured_at = get_current_utc_time()
+        written = 0
+
+        batch = []
+        for record in executor.map(self.fetch_player_count, app_id_list):
+            if record is not None:
+                batch.append({**record, "captured_at": captured_at})
+            if len(batch) >= self.insert_batch_size:
+                written += insert_player_counts(batch, db)
+                batch = []
+
+        return written + insert_player_counts(batch, db)
+
+    def run(self):
+        """
+        Samples the current number of players of the most played games every `interval`, until `samples` samples are
+        taken or the process is stopped.
+
+        The games are the `top_n` games with the highest `ccu` in `steamspy_games_raw`. The requests are sent by a
+        fixed pool of threads over keep-alive connections and the samples are appended to `player_counts`, so the
+        sampler can run next to the other fetchers with a constant footprint.
+
+        Every sample uses a new database session. A sample that fails is logged and skipped, and the next sample is
+        taken on schedule with a new session. The monthly partitions are checked once a day.
+
+        Args:
+            top_n (int, optional): The number of games sampled. Defaults to 500.
+            interval (timedelta, optional): The time between the start of two samples. Defaults to 10 minutes.
+            samples (int, optional): The number of samples to take. Defaults to None, sampling until stopped.
+            requests_per_minute (int, optional): The maximum number of requests per minute, over all threads.
+            Defaults to 600.
+            max_workers (int, optional): The number of threads. Defaults to 32.
+        """
+        taken = 0
+        partitioned_on = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self.samples is None or taken < self.samples:
+                started = time.monotonic()
+
+                try:
+                    with get_db() as db:
+                        today = get_current_utc_time().date()
+                        if partitioned_on != today:
+                            ensure_monthly_partitions(model.PlayerCount.__table__, db)
+                            partitioned_on = today
+
+                        result = db.execute(self.get_sql_query("get_top_ccu_appids.sql"), {"limit": self.top_n})
+                        app_id_list = [row[0] for row in result.fetchall()]
+
+                        written = self.sample(app_id_list, executor, db)
+                    elapsed = time.monotonic() - started
+                    self.logger.info(f"Sampled {written}/{len(app_id_list)} player counts in {elapsed:.1f} seconds")
+                except Exception:
+                    self.logger.exception("Player count sample failed, retrying with the next sample")
+
+                taken += 1
+                if self.samples is None or taken < self.samples:
+                    time.sleep(max(0, self.interval.total_seconds() - (time.monotonic() - started)))
 
 
 if __name__ == "__main__":
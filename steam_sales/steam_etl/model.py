@@ -1,7 +1,8 @@
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, Text
-from sqlalchemy.dialects.mysql import JSON, LONGTEXT
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.mysql import BIGINT, INTEGER, JSON, LONGTEXT, TINYINT
 
 from steam_sales.steam_etl.db import Base, engine
+from steam_sales.steam_etl.validation import get_current_utc_time
 
 
 class GameDetails(Base):
@@ -27,6 +28,9 @@ class GameDetails(Base):
     languages = Column(Text, nullable=True)
     genre = Column(Text, nullable=False)
     tags = Column(JSON, nullable=True)
+    content_hash = Column(String(32), nullable=True, doc="Hash of the fetched payload")
+    details_updated_at = Column(DateTime, nullable=True, doc="Last per-app fetch of tags, languages and genre")
+    updated_at = Column(DateTime, nullable=False, default=get_current_utc_time, index=True, doc="Last write by fetcher")
 
 
 class GameMeta(Base):
@@ -48,9 +52,6 @@ class Game(Base):
     is_free = Column(Boolean, nullable=False)
     controller_support = Column(String(255))
     dlc = Column(JSON, nullable=True)
-    detailed_description = Column(LONGTEXT, nullable=True)
-    about_the_game = Column(LONGTEXT, nullable=True)
-    short_description = Column(LONGTEXT, nullable=True)
     supported_languages = Column(Text, nullable=True)
     reviews = Column(Text, nullable=True)
     header_image = Column(Text, nullable=False)
@@ -68,6 +69,22 @@ class Game(Base):
     achievements = Column(Integer, nullable=False)
     release_date = Column(Text, nullable=True)
     coming_soon = Column(Boolean, nullable=True)
+    content_hash = Column(String(32), nullable=True, doc="Hash of the fetched payload")
+    updated_at = Column(DateTime, nullable=False, default=get_current_utc_time, index=True, doc="Last write by fetcher")
+
+
+class GameDescription(Base):
+    """
+    Descriptions of the Steam games, kept out of `steam_games_raw` so that scans of the raw rows do not read them.
+    """
+
+    __tablename__ = "steam_game_descriptions"
+    __table_args__ = {"mysql_row_format": "COMPRESSED"}
+
+    appid = Column(Integer, primary_key=True, nullable=False)
+    detailed_description = Column(LONGTEXT, nullable=True)
+    about_the_game = Column(LONGTEXT, nullable=True)
+    short_description = Column(LONGTEXT, nullable=True)
 
 
 class CleanData(Base):
@@ -91,7 +108,7 @@ class CleanData(Base):
     developer = Column(Text, nullable=False)
     publisher = Column(Text, nullable=False)
     price = Column(Float, nullable=False)
-    description = Column(LONGTEXT, nullable=False)
+    description = Column(LONGTEXT, nullable=False, doc="Stored off-page, read only by the exports selecting it")
     website = Column(Text, default="")
     header_image = Column(Text, default="")
     year = Column(Integer, nullable=True)
@@ -104,12 +121,175 @@ class CleanData(Base):
     median_forever = Column(Integer, nullable=False)
     languages = Column(Text, nullable=False)
     steamspy_tags = Column(JSON, nullable=False)
+    source_updated_at = Column(DateTime, nullable=True, doc="Latest `updated_at` of the raw rows cleaned")
+    updated_at = Column(DateTime, nullable=False, default=get_current_utc_time, index=True, doc="Last write by cleaner")
+
+
+class GameGenre(Base):
+    __tablename__ = "game_genres"
+    __table_args__ = (Index("ix_game_genres_genre_appid", "genre", "appid"),)
+
+    appid = Column(Integer, ForeignKey("clean_game_data.appid", ondelete="CASCADE"), primary_key=True)
+    genre = Column(String(255), primary_key=True)
+
+
+class GameCategory(Base):
+    __tablename__ = "game_categories"
+    __table_args__ = (Index("ix_game_categories_category_appid", "category", "appid"),)
+
+    appid = Column(Integer, ForeignKey("clean_game_data.appid", ondelete="CASCADE"), primary_key=True)
+    category = Column(String(255), primary_key=True)
+
+
+class GameTag(Base):
+    __tablename__ = "game_tags"
+    __table_args__ = (Index("ix_game_tags_tag_appid", "tag", "appid"),)
+
+    appid = Column(Integer, ForeignKey("clean_game_data.appid", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(255), primary_key=True)
+    votes = Column(Integer, nullable=False, doc="Number of SteamSpy users who applied the tag")
+
+
+class EntityAlias(Base):
+    __tablename__ = "entity_aliases"
+
+    name = Column(String(255, collation="utf8mb4_bin"), primary_key=True, doc="Developer or publisher name as found")
+    canonical = Column(String(255, collation="utf8mb4_bin"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class QuarantinedGame(Base):
+    __tablename__ = "quarantined_games"
+
+    appid = Column(Integer, primary_key=True, nullable=False)
+    violations = Column(JSON, nullable=False, doc="Failed checks as 'column:check'")
+    quarantined_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+class PriceSnapshot(Base):
+    """
+    Append-only history of the Steam Store prices, one row per change, partitioned by month of `captured_at`.
+    """
+
+    __tablename__ = "price_snapshots"
+
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    captured_at = Column(DateTime, primary_key=True)
+    currency = Column(String(3), nullable=False)
+    initial_price = Column(INTEGER(unsigned=True), nullable=True, doc="Price before discount, in cents")
+    final_price = Column(INTEGER(unsigned=True), nullable=False, doc="Price after discount, in cents")
+    discount_percent = Column(TINYINT(unsigned=True), nullable=False)
+
+
+class PlayerSnapshot(Base):
+    """
+    Append-only history of the SteamSpy player counts and reviews, one row per change, partitioned by month of
+    `captured_at`.
+    """
+
+    __tablename__ = "player_snapshots"
+
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    captured_at = Column(DateTime, primary_key=True)
+    ccu = Column(INTEGER(unsigned=True), nullable=False, doc="Peak concurrent users of the previous day")
+    positive = Column(INTEGER(unsigned=True), nullable=False)
+    negative = Column(INTEGER(unsigned=True), nullable=False)
+
+
+class PlayerCount(Base):
+    """
+    Current player counts of the most played games, sampled every few minutes, partitioned by month of
+    `captured_at`.
+    """
+
+    __tablename__ = "player_counts"
+
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    captured_at = Column(DateTime, primary_key=True)
+    player_count = Column(INTEGER(unsigned=True), nullable=False)
+
+
+class RegionalPrice(Base):
+    """
+    Latest Steam Store price of each game in each collected country, with its USD value.
+    """
+
+    __tablename__ = "regional_prices"
+
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    country_code = Column(String(2), primary_key=True)
+    currency = Column(String(3), nullable=False)
+    initial_price = Column(INTEGER(unsigned=True), nullable=False, doc="Price before discount, in cents")
+    final_price = Column(INTEGER(unsigned=True), nullable=False, doc="Price after discount, in cents")
+    discount_percent = Column(TINYINT(unsigned=True), nullable=False)
+    final_price_usd = Column(Float, nullable=True, doc="Price after discount in USD, NULL for unknown currencies")
+    captured_at = Column(DateTime, nullable=False)
+
+
+class GameReview(Base):
+    __tablename__ = "game_reviews"
+    __table_args__ = (Index("ix_game_reviews_appid_created_at", "appid", "created_at"),)
+
+    recommendationid = Column(BIGINT(unsigned=True), primary_key=True, autoincrement=False)
+    appid = Column(Integer, nullable=False)
+    language = Column(String(32), nullable=False)
+    voted_up = Column(Boolean, nullable=False)
+    votes_up = Column(INTEGER(unsigned=True), nullable=False)
+    votes_funny = Column(INTEGER(unsigned=True), nullable=False)
+    weighted_vote_score = Column(Float, nullable=False)
+    playtime_at_review = Column(INTEGER(unsigned=True), nullable=True, doc="Playtime of the author, in minutes")
+    steam_purchase = Column(Boolean, nullable=False)
+    received_for_free = Column(Boolean, nullable=False)
+    written_during_early_access = Column(Boolean, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class ReviewCursor(Base):
+    __tablename__ = "review_cursors"
+
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    cursor = Column(String(255), nullable=True, doc="Cursor of the next page of older reviews, NULL once all were read")
+    newest_created_at = Column(DateTime, nullable=True, doc="Creation time of the newest review stored")
+    head_cursor = Column(String(255), nullable=True, doc="Cursor of the next page of newer reviews, NULL between reads")
+    head_newest_created_at = Column(DateTime, nullable=True, doc="Creation time of the newest review read by the head")
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+class RefreshSchedule(Base):
+    """
+    Last time the refresh scheduler fetched each raw record again, whether or not the record changed.
+    """
+
+    __tablename__ = "refresh_schedule"
+
+    source = Column(String(10), primary_key=True, doc="Options; steam, steamspy")
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    checked_at = Column(DateTime, nullable=False)
+
+
+class FetchRetry(Base):
+    """
+    Queue of the app IDs whose last fetch failed, with the time they may be fetched again. Retries are spaced out
+    exponentially; `next_attempt_at` is NULL once an app is given up on.
+    """
+
+    __tablename__ = "fetch_retries"
+
+    source = Column(String(10), primary_key=True, doc="Options; steam")
+    appid = Column(Integer, primary_key=True, autoincrement=False)
+    kind = Column(String(16), nullable=False, doc="Options; request, not_found, parse")
+    attempts = Column(Integer, nullable=False)
+    last_failed_at = Column(DateTime, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=True, index=True)
 
 
 class LastRun(Base):
     __tablename__ = "last_run"
 
-    scraper = Column(String(10), primary_key=True, doc="Options; meta, steamspy, steam")
+    scraper = Column(
+        String(10), primary_key=True, doc="Options; meta, steamspy, steam, prices, regional, reviews, refresh"
+    )
     last_run = Column(DateTime, nullable=False)
 
 
@@ -0,0 +1,218 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from steam_sales.steam_etl.crud import bulk_insert_entity_aliases, get_entity_aliases
+from steam_sales.steam_etl.db import get_db
+from steam_sales.steam_etl.settings import get_logger
+
+
+class EntityNormalizer:
+    """
+    Class for clustering developer and publisher names into canonical entities.
+
+    Names are compared on a key that ignores case, punctuation, a leading "The" and trailing legal suffixes such as
+    "Inc." or "Ltd.". Only names whose keys share the same prefix are compared with each other, and each block is
+    scored at once with rapidfuzz's `cdist`, so the number of comparisons grows with the block sizes instead of the
+    square of the number of names. Names with different numbers are never merged.
+
+    The mapping of alias to canonical name is stored in the `entity_aliases` table. Known aliases are reused as is;
+    new names are first matched against the existing canonical names of their block, and the remaining ones are
+    clustered among themselves with the most frequent name of each cluster becoming its canonical name.
+    """
+
+    columns = ["developer", "publisher"]
+    separator = ";"
+    max_length = 255
+    leading_words = {"the"}
+    legal_suffixes = {
+        "inc",
+        "llc",
+        "ltd",
+        "limited",
+        "co",
+        "corp",
+        "corporation",
+        "company",
+        "gmbh",
+        "ag",
+        "sa",
+        "sas",
+        "sarl",
+        "srl",
+        "spa",
+        "bv",
+        "ab",
+        "oy",
+        "as",
+        "plc",
+        "pty",
+        "kk",
+    }
+
+    def __init__(self, score_cutoff: int = 90, prefix_length: int = 3):
+        self.logger = get_logger(self.__class__.__name__)
+
+        self.score_cutoff = score_cutoff
+        self.prefix_length = prefix_length
+        self.aliases = {}
+
+    @classmethod
+    def make_key(cls, name: str) -> str:
+        """
+        Builds the comparison key of a name.
+
+        Args:
+            name (str): The developer or publisher name.
+
+        Returns:
+            str: The lower case name without punctuation, leading article and trailing legal suffixes.
+        """
+        key = name.casefold().replace(".", "")
+        tokens = re.sub(r"[^\w\s]|_", " ", key).split()
+
+        if len(tokens) > 1 and tokens[0] in cls.leading_words:
+            tokens = tokens[1:]
+        while len(tokens) > 1 and tokens[-1] in cls.legal_suffixes:
+            tokens = tokens[:-1]
+
+        return " ".join(tokens) or name.casefold().strip()
+
+    def block_key(self, key: str) -> str:
+        return key.replace(" ", "")[: self.prefix_length]
+
+    def score(self, keys: list, choices: list) -> np.ndarray:
+        """
+        Scores every key against every choice of a block.
+
+        Args:
+            keys (list): The keys to match.
+            choices (list): The keys to match against.
+
+        Returns:
+            np.ndarray: A matrix of similarity scores, 0 where the score is below the cutoff or the numbers differ.
+        """
+        scores = process.cdist(
+            keys, choices, scorer=fuzz.token_sort_ratio, score_cutoff=self.score_cutoff, dtype=np.uint8, workers=-1
+        )
+
+        key_numbers = np.array([" ".join(re.findall(r"\d+", key)) for key in keys])
+        choice_numbers = np.array([" ".join(re.findall(r"\d+", choice)) for choice in choices])
+        scores[key_numbers[:, None] != choice_numbers[None, :]] = 0
+        return scores
+
+    def match_block(self, names: list, canonicals: list) -> dict:
+        """
+        Maps the new names of a block to a canonical name.
+
+        Args:
+            names (list): The new names of the block, most frequent first.
+            canonicals (list): The existing canonical names of the block.
+
+        Returns:
+            dict: A mapping of every new name to its canonical name.
+        """
+        keys = np.array([self.make_key(name) for name in names], dtype=object)
+        aliases = {}
+
+        unmatched = np.ones(len(names), dtype=bool)
+        if canonicals:
+            scores = self.score(keys.tolist(), [self.make_key(canonical) for canonical in canonicals])
+            best = scores.argmax(axis=1)
+            unmatched = scores[np.arange(len(names)), best] == 0
+            for i in np.flatnonzero(~unmatched):
+                aliases[names[i]] = canonicals[best[i]]
+
+        remaining = np.flatnonzero(unmatched)
+        if remaining.size == 0:
+            return aliases
+
+        # Leader clustering: each unassigned name, in order of frequency, claims the unassigned names close to it
+        scores = self.score(keys[remaining].tolist(), keys[remaining].tolist())
+        leaders = np.full(remaining.size, -1)
+        for i in range(remaining.size):
+            if leaders[i] >= 0:
+                continue
+            leaders[(scores[i] > 0) & (leaders < 0)] = i
+            leaders[i] = i
+
+        for i, leader in enumerate(leaders):
+            aliases[names[remaining[i]]] = names[remaining[leader]]
+        return aliases
+
+    def cluster(self, names: list) -> dict:
+        """
+        Maps new names to canonical names, block by block.
+
+        Args:
+            names (list): The new names, most frequent first.
+
+        Returns:
+            dict: A mapping of every new name to its canonical name.
+        """
+        canonical_blocks = defaultdict(list)
+        for canonical in set(self.aliases.values()):
+            canonical_blocks[self.block_key(self.make_key(canonical))].append(canonical)
+
+        name_blocks = defaultdict(list)
+        for name in names:
+            name_blocks[self.block_key(self.make_key(name))].append(name)
+
+        aliases = {}
+        for block, block_names in name_blocks.items():
+            aliases.update(self.match_block(block_names, canonical_blocks[block]))
+        return aliases
+
+    def count_names(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Counts the games of every developer and publisher name.
+
+        Args:
+            df (pd.DataFrame): The merged DataFrame.
+
+        Returns:
+            pd.Series: The number of games per name, most frequent first.
+        """
+        names = pd.concat([df[col].astype(object).dropna().str.split(self.separator) for col in self.columns])
+        # `entity_aliases` pads names with spaces when comparing them, so "Valve " and "Valve" are the same alias
+        names = names.explode().str.rstrip()
+        names = names[names.notna() & (names != "")]
+        return names.value_counts()
+
+    def canonical(self, value: str) -> str:
+        names = [name.rstrip() for name in value.split(self.separator)]
+        return self.separator.join(self.aliases.get(name, name) for name in names)
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Replaces the developer and publisher names of the DataFrame with their canonical names.
+
+        The stored aliases are loaded, names seen for the first time are clustered and stored, and every name is
+        replaced with its canonical name. Multiple names separated by a semicolon are normalized one by one.
+
+        Args:
+            df (pd.DataFrame): The merged DataFrame.
+
+        Returns:
+            pd.DataFrame: The DataFrame with canonical developer and publisher names.
+        """
+        counts = self.count_names(df)
+
+        with get_db() as db:
+            self.aliases = get_entity_aliases(db)
+
+            new_names = [name for name in counts.index if name not in self.aliases and len(name) <= self.max_length]
+            new_aliases = self.cluster(new_names)
+            bulk_insert_entity_aliases(new_aliases, db)
+
+        self.aliases.update(new_aliases)
+        merged = sum(name != canonical for name, canonical in new_aliases.items())
+        self.logger.info(f"{len(new_aliases)} new developer/publisher names, {merged} mapped to another name")
+
+        for col in self.columns:
+            mapping = {value: self.canonical(value) for value in df[col].dropna().unique()}
+            df[col] = df[col].map(mapping, na_action="ignore")
+        return df
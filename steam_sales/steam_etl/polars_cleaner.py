@@ -0,0 +1,327 @@
+from functools import wraps
+
+import pandas as pd
+import polars as pl
+from bs4 import BeautifulSoup
+
+from steam_sales.steam_etl.cleaner import SteamSpyCleaner, SteamStoreCleaner
+from steam_sales.steam_etl.db import get_db
+from steam_sales.steam_etl.utils import get_sql_query
+
+
+class PolarsCleanerMixin:
+    """
+    Common methods of the Polars cleaning backend.
+
+    The stages of a cleaner are chained into a single lazy query which Polars optimises and runs multi-threaded.
+    When profiling is enabled, the stages are collected one at a time instead, so that each stage gets its own entry
+    in the profile at the cost of the optimisations across stages. Parsers that only exist in Python (`literal_eval`,
+    `dateparser`, BeautifulSoup and the translator) are applied once per distinct value of a column. The collected
+    result is converted to pandas with the same columns, values and dtypes as the pandas backend, so both backends feed
+    the same `Clean` records.
+    """
+
+    convert_to_none = ["", " ", "None", "none", "null", "N/a", "n/a", "N/A", "NA", '["none"]', '["null"]', "{}"]
+
+    def fetch_data(self, source: str, params: dict = None) -> pl.DataFrame:
+        """
+        Fetches data from the specified source and returns it as a Polars DataFrame.
+
+        Parameters:
+        - source (str): The source from which to fetch the data.
+        - params (dict, optional): Values for the bind parameters of the query. Defaults to None.
+
+        Returns:
+        - df (pl.DataFrame): The fetched data as a Polars DataFrame.
+        """
+        with get_db() as db:
+            query = get_sql_query(source)
+            result = db.execute(query, params)
+            data = result.fetchall()
+            columns = list(result.keys())
+
+        return pl.DataFrame(data, schema=columns, orient="row", infer_schema_length=None)
+
+    @staticmethod
+    def map_values(expr: pl.Expr, func, return_dtype: pl.DataType) -> pl.Expr:
+        """
+        Applies a Python function once per distinct value of a column instead of once per row.
+
+        Missing values are left untouched.
+
+        Args:
+            expr (pl.Expr): The column to map.
+            func (callable): The function to apply to each distinct value.
+            return_dtype (pl.DataType): The dtype of the mapped column.
+
+        Returns:
+            pl.Expr: The mapped column.
+        """
+
+        def map_series(series: pl.Series) -> pl.Series:
+            values = series.drop_nulls().unique().to_list()
+            mapping = {value: func(value) for value in values}
+            return series.replace_strict(mapping, default=None, return_dtype=return_dtype)
+
+        return expr.map_batches(map_series, return_dtype=return_dtype)
+
+    def process_null(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        string_cols = [col for col, dtype in lf.collect_schema().items() if dtype == pl.String]
+        return lf.with_columns(
+            pl.when(pl.col(col).is_in(self.convert_to_none)).then(None).otherwise(pl.col(col)).alias(col)
+            for col in string_cols
+        )
+
+    def to_pandas(self, df: pl.DataFrame) -> pd.DataFrame:
+        """
+        Converts the collected result to pandas, using the compact dtypes of the pandas backend.
+
+        Args:
+            df (pl.DataFrame): The collected result.
+
+        Returns:
+            pd.DataFrame: The converted DataFrame.
+        """
+        pdf = df.to_pandas()
+        for col, dtype in df.schema.items():
+            if dtype.is_integer() and df[col].null_count():
+                # Integer columns with nulls come out as floats
+                pdf[col] = pdf[col].astype("Int64")
+            elif isinstance(dtype, pl.Datetime):
+                pdf[col] = pdf[col].astype("datetime64[ns]")
+
+        for col, dtype in self.output_dtypes.items():
+            if col not in pdf.columns:
+                continue
+            if isinstance(dtype, str) and dtype == "category" and pdf[col].dtype == "Int64":
+                # Integer categories, as pandas infers them from a column without nulls
+                dtype = pd.CategoricalDtype(pdf[col].dropna().unique().astype("int64"))
+            pdf[col] = pdf[col].astype(dtype)
+        return pdf
+
+    def clean(self, df: pl.DataFrame) -> pd.DataFrame:
+        lf = df.lazy()
+        for stage in self.stages():
+            lf = stage(lf)
+        return self.to_pandas(lf.collect(engine="streaming"))
+
+    @staticmethod
+    def collect_stage(stage):
+        """
+        Wraps a lazy stage into a function collecting its result, named after the stage for the profiler.
+
+        Args:
+            stage (callable): The stage, taking and returning a LazyFrame.
+
+        Returns:
+            callable: The stage, taking and returning a DataFrame.
+        """
+
+        @wraps(stage)
+        def collect(df: pl.DataFrame) -> pl.DataFrame:
+            return stage(df.lazy()).collect(engine="streaming")
+
+        return collect
+
+    def process(self, df: pl.DataFrame) -> pd.DataFrame:
+        if self.profiler:
+            stages = [self.collect_stage(stage) for stage in self.stages()] + [self.to_pandas]
+            return self.process_with_progress(df, stages, f"{self.pipeline_name} (Polars)")
+        return self.process_with_progress(df, [self.clean], f"{self.pipeline_name} (Polars)")
+
+
+class PolarsSteamSpyCleaner(PolarsCleanerMixin, SteamSpyCleaner):
+    """
+    Class for cleaning SteamSpy data with Polars.
+    """
+
+    pipeline_name = "SteamSpy"
+
+    output_dtypes = {
+        "positive_ratings": "Int32",
+        "negative_ratings": "Int32",
+        "owners_in_millions": "category",
+        "average_forever": "Int32",
+        "median_forever": "Int32",
+        "languages": "category",
+    }
+
+    def process_col_rows(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.drop_nulls(subset=["name", "languages", "tags"]).drop(self.col_to_drop)
+
+    def process_owners(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.with_columns(self.map_values(pl.col("owners"), self.parse_owners, pl.String))
+
+    def rename(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.rename(
+            {
+                "tags": "steamspy_tags",
+                "positive": "positive_ratings",
+                "negative": "negative_ratings",
+                "owners": "owners_in_millions",
+            }
+        )
+
+    def stages(self) -> list:
+        return [self.process_null, self.process_col_rows, self.process_owners, self.rename]
+
+
+class PolarsSteamStoreCleaner(PolarsCleanerMixin, SteamStoreCleaner):
+    """
+    Class for cleaning Steam data with Polars.
+    """
+
+    pipeline_name = "Steam Store"
+
+    output_dtypes = {
+        "type": "category",
+        "name": "string[pyarrow]",
+        # The ordered age groups of `pd.cut` in the pandas backend
+        "required_age": pd.CategoricalDtype([0, 3, 7, 12, 16, 18], ordered=True),
+        "controller_support": "int64",
+        "dlc": "category",
+        "website": "string[pyarrow]",
+        "header_image": "string[pyarrow]",
+        "platform": "category",
+        "metacritic": "Int16",
+        "categories": "category",
+        "genres": "category",
+        "recommendations": "Int32",
+        "achievements": "Int32",
+        "coming_soon": "Int8",
+        "english": "int64",
+        "developer": "category",
+        "publisher": "category",
+        "year": "Int16",
+        "month": "Int16",
+        "day": "Int16",
+    }
+
+    def process_age(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        cut_points = [0, 3, 7, 12, 16, 1000]
+        categories = [0, 3, 7, 12, 16, 18]
+
+        age = pl.col("required_age")
+        expr = pl.when(age <= -1).then(None)
+        for cut_point, category in zip(cut_points, categories):
+            expr = expr.when(age <= cut_point).then(category)
+        return lf.filter(age.is_not_null()).with_columns(expr.otherwise(None).cast(pl.Int64).alias("required_age"))
+
+    def process_platforms(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        # Keys of the enabled platforms, in the order they appear in the JSON object
+        platforms = (
+            pl.col("platform")
+            .str.extract_all(r'"\w+"\s*:\s*true')
+            .list.eval(pl.element().str.extract(r'"(\w+)"', 1))
+            .list.join(";")
+        )
+        return lf.with_columns(pl.when(pl.col("platform").is_not_null()).then(platforms).alias("platform"))
+
+    def process_language(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        english = pl.col("supported_languages").str.to_lowercase().str.contains("english", literal=True)
+        return (
+            lf.drop_nulls(subset=["supported_languages"])
+            .with_columns(english.cast(pl.Int64).alias("english"))
+            .drop("supported_languages")
+        )
+
+    def process_developers_and_publishers(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        pattern = r'(?i)\["(n/a|na|null)"\]'
+        developers, publishers = pl.col("developers"), pl.col("publishers")
+        return (
+            lf.filter(
+                developers.is_not_null()
+                & publishers.is_not_null()
+                & ~publishers.is_in(['[""]', '[" "]'])
+                & ~developers.str.contains(pattern)
+                & ~publishers.str.contains(pattern)
+                & ~developers.str.contains(";", literal=True)
+                & ~publishers.str.contains(";", literal=True)
+            )
+            .with_columns(
+                self.map_values(developers, self.safe_literal_eval, pl.String).alias("developer"),
+                self.map_values(publishers, self.safe_literal_eval, pl.String).alias("publisher"),
+            )
+            .drop("developers", "publishers")
+        )
+
+    def process_price(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        rates = {"USD": 1.0, **self.currency_rates}
+        price_overview = pl.col("price_overview")
+
+        currency = price_overview.str.json_path_match("$.currency").fill_null("USD")
+        price = price_overview.str.json_path_match("$.initial").cast(pl.Int64).fill_null(-1)
+        price = pl.when(pl.col("is_free") == 1).then(0).otherwise(price)
+        # Polars divides floats by a scalar through its reciprocal, which is not bit-for-bit equal to pandas
+        cents = (price.cast(pl.Decimal(38, 2)) / 100).cast(pl.Float64)
+        price = pl.when(price > 0).then(cents).otherwise(price.cast(pl.Float64))
+        price = price * currency.replace_strict(rates, return_dtype=pl.Float64)
+        return lf.with_columns(price.alias("price")).drop("is_free", "price_overview")
+
+    def process_categories_and_genres(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        non_english = pl.col("english") == 0
+        lf = lf.filter(pl.col("categories").is_not_null() & pl.col("genres").is_not_null())
+        for col in ["categories", "genres"]:
+            lf = lf.with_columns(self.map_values(pl.col(col), self.parse_descriptions, pl.String))
+
+            # Translate each distinct value used by a non-English game once
+            translated = self.map_values(pl.when(non_english).then(pl.col(col)), self.translate, pl.String)
+            lf = lf.with_columns(pl.when(non_english).then(translated).otherwise(pl.col(col)).alias(col))
+        return lf
+
+    def process_controller(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        controller = (pl.col("controller_support") == "full").fill_null(False)
+        return lf.with_columns(controller.cast(pl.Int64).alias("controller_support"))
+
+    def process_dlc(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.with_columns(pl.col("dlc").str.json_decode(pl.List(pl.Int64)).list.len().cast(pl.Int64))
+
+    def process_requirement(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        requirements = self.map_values(pl.col("requirements"), self.parse_requirements, pl.String)
+        return lf.with_columns(requirements.fill_null("Not available"))
+
+    def process_date(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        release_date = self.map_values(pl.col("release_date"), self.parse_release_date, pl.Datetime("ns"))
+        return lf.with_columns(release_date)
+
+    def process_descriptions(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        description = pl.concat_str(
+            [pl.col(col).fill_null("") for col in ["detailed_description", "about_the_game", "short_description"]],
+            separator=" ",
+        )
+        return lf.with_columns(
+            pl.col("website").fill_null("Not available"),
+            pl.col("header_image").fill_null("Not available"),
+            pl.when(description == "").then(pl.lit("Not available")).otherwise(description).alias("description"),
+        ).drop("detailed_description", "about_the_game", "short_description")
+
+    def misc(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        release_date = pl.col("release_date").dt
+        return lf.with_columns(
+            release_date.year().alias("year"), release_date.month().alias("month"), release_date.day().alias("day")
+        ).drop("capsule_image", "reviews")
+
+    @staticmethod
+    def parse_requirements(x):
+        return BeautifulSoup(x, "lxml").get_text() if x else "Not available"
+
+    def parse_release_date(self, x):
+        date = self.parse_date(x)
+        return None if pd.isna(date) else date.to_pydatetime()
+
+    def stages(self) -> list:
+        return [
+            self.process_null,
+            self.process_age,
+            self.process_platforms,
+            self.process_language,
+            self.process_developers_and_publishers,
+            self.process_price,
+            self.process_categories_and_genres,
+            self.process_controller,
+            self.process_dlc,
+            self.process_requirement,
+            self.process_date,
+            self.process_descriptions,
+            self.misc,
+        ]
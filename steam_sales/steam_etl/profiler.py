@@ -0,0 +1,98 @@
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+from rich.table import Table
+
+
+class StageProfiler:
+    """
+    Records resource usage of the stages of a cleaning pipeline.
+
+    For every stage the wall time, CPU time, peak traced memory above the memory in use when the stage started, the
+    number of rows going in and out and the deep memory usage of the resulting DataFrame are recorded.
+
+    Polars DataFrames are accepted as well; their memory usage is Polars' estimate, and the memory Polars allocates
+    outside of Python is not traced.
+    """
+
+    def __init__(self):
+        self.stages = []
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def profile(self, func, df: pd.DataFrame, pipeline: str) -> pd.DataFrame:
+        """
+        Applies a stage to the DataFrame and records its resource usage.
+
+        Args:
+            func (callable): The stage to apply.
+            df (pd.DataFrame): The input DataFrame.
+            pipeline (str): The name of the pipeline the stage belongs to.
+
+        Returns:
+            pd.DataFrame: The output of the stage.
+        """
+        rows_in = df.shape[0]
+        memory_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        df = func(df)
+
+        cpu_time = time.process_time() - cpu_start
+        wall_time = time.perf_counter() - wall_start
+        _, memory_peak = tracemalloc.get_traced_memory()
+
+        self.stages.append(
+            {
+                "pipeline": pipeline,
+                "stage": func.__name__,
+                "wall_time_s": round(wall_time, 4),
+                "cpu_time_s": round(cpu_time, 4),
+                "peak_memory_delta_mb": round((memory_peak - memory_start) / 2**20, 2),
+                "rows_in": rows_in,
+                "rows_out": df.shape[0],
+                "df_memory_mb": round(self.memory_usage(df) / 2**20, 2),
+            }
+        )
+        return df
+
+    @staticmethod
+    def memory_usage(df) -> int:
+        if isinstance(df, pd.DataFrame):
+            return df.memory_usage(deep=True).sum()
+        return df.estimated_size()
+
+    def extend(self, stages: list):
+        self.stages.extend(stages)
+
+    def write_json(self, path: str):
+        """
+        Writes the recorded stages to a JSON report.
+
+        Args:
+            path (str): The path of the report.
+        """
+        with open(path, "w") as f:
+            json.dump({"stages": self.stages}, f, indent=2)
+
+    def summary_table(self) -> Table:
+        """
+        Builds a summary table of the recorded stages.
+
+        Returns:
+            Table: A rich table with one row per stage.
+        """
+        table = Table(title="Cleaning stage profile")
+        columns = ["Pipeline", "Stage", "Wall (s)", "CPU (s)", "Peak mem Δ (MB)", "Rows in", "Rows out", "DF mem (MB)"]
+        for col in columns:
+            table.add_column(col, justify="left" if col in ("Pipeline", "Stage") else "right")
+
+        for stage in self.stages:
+            table.add_row(*[str(value) for value in stage.values()])
+
+        return table
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from steam_sales.steam_etl import model
+from steam_sales.steam_etl.crud import ensure_monthly_partitions, mark_refreshed
+from steam_sales.steam_etl.db import get_db
+from steam_sales.steam_etl.fetcher import SteamSpyFetcher, SteamStoreFetcher
+from steam_sales.steam_etl.settings import get_logger
+from steam_sales.steam_etl.utils import get_sql_query, log_last_run
+from steam_sales.steam_etl.validation import get_current_utc_time
+
+
+class RefreshScheduler:
+    """
+    Class for keeping the raw SteamSpy and Steam Store records fresh within a request budget.
+
+    Every raw record is due again a time-to-live after it was last fetched. The TTL is the shortest for upcoming and
+    popular games, whose pages change the most, longer for recent releases and games with a few players, and the
+    longest for the rest of the catalogue. Each run fetches the most overdue records first, one request each and at
+    most `budget` of them, and records when they were checked so that unchanged records wait for their next deadline.
+    """
+
+    # Hours a record stays fresh after it was fetched, per tier
+    ttl_hours = {"coming_soon": 24, "popular": 24, "recent": 72, "active": 24 * 7, "default": 24 * 30}
+    popular_ccu = 1000
+    active_ccu = 10
+    recent_days = 90
+
+    def __init__(self, budget: int = 1000):
+        self.logger = get_logger(self.__class__.__name__)
+
+        self.budget = budget
+        self.fetchers = {"steam": SteamStoreFetcher(), "steamspy": SteamSpyFetcher()}
+
+    def get_overdue(self, db) -> dict:
+        """
+        Picks the most overdue raw records that fit in the request budget.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            dict: The overdue app IDs per source, `steam` or `steamspy`, most overdue first.
+        """
+        now = get_current_utc_time().replace(tzinfo=None)
+        params = {
+            **{f"{tier}_ttl": hours for tier, hours in self.ttl_hours.items()},
+            "popular_ccu": self.popular_ccu,
+            "active_ccu": self.active_ccu,
+            "recent_since": now - timedelta(days=self.recent_days),
+            "now": now,
+            "budget": self.budget,
+        }
+        result = db.execute(get_sql_query("get_overdue_appids.sql"), params)
+
+        overdue = {source: [] for source in self.fetchers}
+        for source, appid in result.fetchall():
+            overdue[source].append(appid)
+        return overdue
+
+    @log_last_run(scraper_name="refresh")
+    def run(self):
+        """
+        Fetches the most overdue raw records again and records when they were checked.
+
+        Records whose payload did not change are not written again, as with the `--refresh` option of the fetchers.
+        Records that could not be fetched are not marked as checked, so they stay overdue.
+        """
+        with get_db() as db:
+            ensure_monthly_partitions(model.PriceSnapshot.__table__, db)
+            ensure_monthly_partitions(model.PlayerSnapshot.__table__, db)
+
+            overdue = self.get_overdue(db)
+            self.logger.info(
+                ", ".join(f"{len(appids)} overdue '{source}' records" for source, appids in overdue.items())
+            )
+
+            for source, appids in overdue.items():
+                if not appids:
+                    continue
+
+                fetcher = self.fetchers[source]
+                written = fetcher.ingest_batches(appids, db)
+                fetched = [appid for appid in appids if appid not in fetcher.failed_appids]
+                mark_refreshed(source, fetched, db)
+                self.logger.info(
+                    f"Refreshed {len(fetched)}/{len(appids)} '{source}' records, {written} of them changed"
+                )
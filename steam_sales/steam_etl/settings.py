@@ -1,6 +1,7 @@
 import logging
 import logging.handlers
 import os
+from typing import Dict, List
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -15,6 +16,7 @@ class Path:
     env_file = os.path.join(root_dir, ".env")
     sql_queries = os.path.join(curr_file_dir, "sql")
     log_file = os.path.join(root_dir, "logs")
+    parquet_export = os.path.join(root_dir, "data", "clean_game_data")
 
     if not os.path.exists(log_file):
         os.mkdir(log_file)
@@ -36,6 +38,14 @@ class Settings(BaseSettings):
     STEAMSPY_BASE_URL: str = "https://steamspy.com/api.php"
     STEAM_BASE_SEARCH_URL: str = "http://store.steampowered.com"
 
+    # Steam Web API, used for the app list change feed. The base URL can point to a local stand-in for testing.
+    STEAM_API_BASE_URL: str = "https://api.steampowered.com"
+    STEAM_API_KEY: str = ""
+
+    # USD value of one unit of each currency, and the countries whose store prices are collected
+    CURRENCY_RATES: Dict[str, float] = {"EUR": 1.08, "GBP": 1.27, "TWD": 0.03, "SGD": 0.74, "BRL": 0.18, "AUD": 0.67}
+    PRICE_REGIONS: List[str] = ["us", "de", "gb", "br", "au", "sg", "tw"]
+
 
 def get_logger(name):
     # Create a logger
@@ -1,2 +1,30 @@
-SELECT *
-FROM SteamSales.steam_games_raw
\ No newline at end of file
+SELECT r.type,
+    r.name,
+    r.appid,
+    r.required_age,
+    r.is_free,
+    r.controller_support,
+    r.dlc,
+    d.detailed_description,
+    d.about_the_game,
+    d.short_description,
+    r.supported_languages,
+    r.reviews,
+    r.header_image,
+    r.capsule_image,
+    r.website,
+    r.requirements,
+    r.developers,
+    r.publishers,
+    r.price_overview,
+    r.platform,
+    r.metacritic,
+    r.categories,
+    r.genres,
+    r.recommendations,
+    r.achievements,
+    r.release_date,
+    r.coming_soon,
+    r.updated_at
+FROM SteamSales.steam_games_raw AS r
+    LEFT JOIN SteamSales.steam_game_descriptions AS d ON d.appid = r.appid
\ No newline at end of file
@@ -1,2 +1,22 @@
-SELECT *
+SELECT appid,
+    name,
+    developer,
+    publisher,
+    score_rank,
+    positive,
+    negative,
+    userscore,
+    owners,
+    average_forever,
+    average_2weeks,
+    median_forever,
+    median_2weeks,
+    price,
+    initialprice,
+    discount,
+    ccu,
+    languages,
+    genre,
+    tags,
+    updated_at
 FROM SteamSales.steamspy_games_raw
\ No newline at end of file
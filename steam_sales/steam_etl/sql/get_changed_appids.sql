@@ -0,0 +1,19 @@
+SELECT changed.appid
+FROM (
+        SELECT appid
+        FROM SteamSales.steam_games_raw
+        WHERE updated_at >= :since
+            AND appid BETWEEN :start_appid AND :end_appid
+        UNION
+        SELECT appid
+        FROM SteamSales.steamspy_games_raw
+        WHERE updated_at >= :since
+            AND appid BETWEEN :start_appid AND :end_appid
+    ) AS changed
+    INNER JOIN SteamSales.steam_games_raw AS r ON r.appid = changed.appid
+    INNER JOIN SteamSales.steamspy_games_raw AS s ON s.appid = changed.appid
+    LEFT JOIN SteamSales.clean_game_data AS c ON c.appid = changed.appid
+WHERE c.appid IS NULL
+    OR c.source_updated_at IS NULL
+    OR c.source_updated_at < GREATEST(r.updated_at, s.updated_at)
+ORDER BY changed.appid;
\ No newline at end of file
@@ -0,0 +1,5 @@
+SELECT appid, genres, categories, steamspy_tags
+FROM SteamSales.clean_game_data
+WHERE appid > :after_appid
+ORDER BY appid
+LIMIT :limit;
\ No newline at end of file
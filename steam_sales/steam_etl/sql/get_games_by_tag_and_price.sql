@@ -0,0 +1,7 @@
+SELECT c.appid, c.name, c.price, t.votes
+FROM SteamSales.game_tags AS t
+    INNER JOIN SteamSales.clean_game_data AS c ON c.appid = t.appid
+WHERE t.tag = :tag
+    AND c.price >= 0
+    AND c.price < :max_price
+ORDER BY t.votes DESC;
\ No newline at end of file
@@ -1,10 +1,46 @@
-SELECT r.*
-FROM SteamSales.steam_games_raw AS r
-    INNER JOIN SteamSales.steamspy_games_metadata AS m ON m.appid = r.appid
-    LEFT JOIN SteamSales.clean_game_data AS c ON r.appid = c.appid
-WHERE m.date_added >= (
-        SELECT DATE_SUB(last_run, INTERVAL 1 DAY)
-        FROM last_run
-        WHERE scraper = 'meta'
-    )
-    AND c.appid IS NULL;
\ No newline at end of file
+SELECT r.type,
+    r.name,
+    r.appid,
+    r.required_age,
+    r.is_free,
+    r.controller_support,
+    r.dlc,
+    d.detailed_description,
+    d.about_the_game,
+    d.short_description,
+    r.supported_languages,
+    r.reviews,
+    r.header_image,
+    r.capsule_image,
+    r.website,
+    r.requirements,
+    r.developers,
+    r.publishers,
+    r.price_overview,
+    r.platform,
+    r.metacritic,
+    r.categories,
+    r.genres,
+    r.recommendations,
+    r.achievements,
+    r.release_date,
+    r.coming_soon,
+    r.updated_at
+FROM (
+        SELECT appid
+        FROM SteamSales.steam_games_raw
+        WHERE updated_at >= :since
+            AND appid BETWEEN :start_appid AND :end_appid
+        UNION
+        SELECT appid
+        FROM SteamSales.steamspy_games_raw
+        WHERE updated_at >= :since
+            AND appid BETWEEN :start_appid AND :end_appid
+    ) AS changed
+    INNER JOIN SteamSales.steam_games_raw AS r ON r.appid = changed.appid
+    INNER JOIN SteamSales.steamspy_games_raw AS s ON s.appid = changed.appid
+    LEFT JOIN SteamSales.steam_game_descriptions AS d ON d.appid = changed.appid
+    LEFT JOIN SteamSales.clean_game_data AS c ON c.appid = changed.appid
+WHERE c.appid IS NULL
+    OR c.source_updated_at IS NULL
+    OR c.source_updated_at < GREATEST(r.updated_at, s.updated_at);
\ No newline at end of file
@@ -1,10 +1,38 @@
-SELECT r.*
-FROM SteamSales.steamspy_games_raw AS r
-    INNER JOIN SteamSales.steamspy_games_metadata AS m ON m.appid = r.appid
-    LEFT JOIN SteamSales.clean_game_data AS c ON r.appid = c.appid
-WHERE m.date_added >= (
-        SELECT DATE_SUB(last_run, INTERVAL 1 DAY)
-        FROM last_run
-        WHERE scraper = 'meta'
-    )
-    AND c.appid IS NULL;
\ No newline at end of file
+SELECT s.appid,
+    s.name,
+    s.developer,
+    s.publisher,
+    s.score_rank,
+    s.positive,
+    s.negative,
+    s.userscore,
+    s.owners,
+    s.average_forever,
+    s.average_2weeks,
+    s.median_forever,
+    s.median_2weeks,
+    s.price,
+    s.initialprice,
+    s.discount,
+    s.ccu,
+    s.languages,
+    s.genre,
+    s.tags,
+    s.updated_at
+FROM (
+        SELECT appid
+        FROM SteamSales.steam_games_raw
+        WHERE updated_at >= :since
+            AND appid BETWEEN :start_appid AND :end_appid
+        UNION
+        SELECT appid
+        FROM SteamSales.steamspy_games_raw
+        WHERE updated_at >= :since
+            AND appid BETWEEN :start_appid AND :end_appid
+    ) AS changed
+    INNER JOIN SteamSales.steam_games_raw AS r ON r.appid = changed.appid
+    INNER JOIN SteamSales.steamspy_games_raw AS s ON s.appid = changed.appid
+    LEFT JOIN SteamSales.clean_game_data AS c ON c.appid = changed.appid
+WHERE c.appid IS NULL
+    OR c.source_updated_at IS NULL
+    OR c.source_updated_at < GREATEST(r.updated_at, s.updated_at);
\ No newline at end of file
@@ -0,0 +1,46 @@
+SELECT due.source,
+    due.appid
+FROM (
+        SELECT 'steam' AS source,
+            r.appid,
+            DATE_ADD(
+                GREATEST(COALESCE(sched.checked_at, r.updated_at), r.updated_at),
+                INTERVAL CASE
+                    WHEN r.coming_soon THEN :coming_soon_ttl
+                    WHEN s.ccu >= :popular_ccu THEN :popular_ttl
+                    WHEN COALESCE(
+                        STR_TO_DATE(r.release_date, '%b %e, %Y'),
+                        STR_TO_DATE(r.release_date, '%e %b, %Y')
+                    ) >= :recent_since THEN :recent_ttl
+                    WHEN s.ccu >= :active_ccu THEN :active_ttl
+                    ELSE :default_ttl
+                END HOUR
+            ) AS due_at
+        FROM SteamSales.steam_games_raw AS r
+            LEFT JOIN SteamSales.steamspy_games_raw AS s ON s.appid = r.appid
+            LEFT JOIN SteamSales.refresh_schedule AS sched ON sched.source = 'steam'
+            AND sched.appid = r.appid
+        UNION ALL
+        SELECT 'steamspy' AS source,
+            s.appid,
+            DATE_ADD(
+                GREATEST(COALESCE(sched.checked_at, s.updated_at), s.updated_at),
+                INTERVAL CASE
+                    WHEN r.coming_soon THEN :coming_soon_ttl
+                    WHEN s.ccu >= :popular_ccu THEN :popular_ttl
+                    WHEN COALESCE(
+                        STR_TO_DATE(r.release_date, '%b %e, %Y'),
+                        STR_TO_DATE(r.release_date, '%e %b, %Y')
+                    ) >= :recent_since THEN :recent_ttl
+                    WHEN s.ccu >= :active_ccu THEN :active_ttl
+                    ELSE :default_ttl
+                END HOUR
+            ) AS due_at
+        FROM SteamSales.steamspy_games_raw AS s
+            LEFT JOIN SteamSales.steam_games_raw AS r ON r.appid = s.appid
+            LEFT JOIN SteamSales.refresh_schedule AS sched ON sched.source = 'steamspy'
+            AND sched.appid = s.appid
+    ) AS due
+WHERE due.due_at <= :now
+ORDER BY due.due_at ASC
+LIMIT :budget;
\ No newline at end of file
@@ -0,0 +1,5 @@
+SELECT appid,
+    CAST(REPLACE(SUBSTRING_INDEX(owners, ' .. ', 1), ',', '') AS UNSIGNED) AS owners,
+    ccu,
+    positive + negative AS reviews
+FROM SteamSales.steamspy_games_raw;
\ No newline at end of file
@@ -0,0 +1,4 @@
+SELECT appid
+FROM steam_games_raw
+WHERE NOT is_free
+ORDER BY appid ASC;
\ No newline at end of file
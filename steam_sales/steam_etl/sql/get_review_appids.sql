@@ -0,0 +1,4 @@
+SELECT appid
+FROM steam_games_raw
+WHERE type = 'game'
+ORDER BY appid ASC;
\ No newline at end of file
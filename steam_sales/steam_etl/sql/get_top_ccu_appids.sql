@@ -0,0 +1,5 @@
+SELECT appid
+FROM steamspy_games_raw
+WHERE ccu > 0
+ORDER BY ccu DESC
+LIMIT :limit;
\ No newline at end of file
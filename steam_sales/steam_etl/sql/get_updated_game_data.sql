@@ -0,0 +1,3 @@
+SELECT *
+FROM SteamSales.clean_game_data
+WHERE updated_at >= :since
\ No newline at end of file
@@ -0,0 +1,7 @@
+-- Adds the `content_hash` column to raw tables created before change detection.
+-- Rows without a hash are treated as changed the next time they are fetched.
+ALTER TABLE SteamSales.steamspy_games_raw
+    ADD COLUMN content_hash VARCHAR(32) NULL AFTER tags;
+
+ALTER TABLE SteamSales.steam_games_raw
+    ADD COLUMN content_hash VARCHAR(32) NULL AFTER coming_soon;
\ No newline at end of file
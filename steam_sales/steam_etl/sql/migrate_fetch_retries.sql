@@ -0,0 +1,12 @@
+-- Queues the app IDs flagged as faulty before `fetch_retries` existed, so the Steam Store fetcher tries them again.
+-- Run once, after the ETL has created the `fetch_retries` table. They are due on the next run and given up on with the
+-- backoff of a missing app if they still do not exist.
+INSERT IGNORE INTO SteamSales.fetch_retries (source, appid, kind, attempts, last_failed_at, next_attempt_at)
+SELECT 'steam',
+    appid,
+    'not_found',
+    1,
+    UTC_TIMESTAMP(),
+    UTC_TIMESTAMP()
+FROM SteamSales.steamspy_games_metadata
+WHERE dne;
\ No newline at end of file
@@ -0,0 +1,13 @@
+-- Moves the descriptions of databases created before `steam_game_descriptions` out of `steam_games_raw`.
+-- Run once, after the ETL has created the `steam_game_descriptions` table.
+INSERT IGNORE INTO SteamSales.steam_game_descriptions (appid, detailed_description, about_the_game, short_description)
+SELECT appid,
+    detailed_description,
+    about_the_game,
+    short_description
+FROM SteamSales.steam_games_raw;
+
+ALTER TABLE SteamSales.steam_games_raw
+    DROP COLUMN detailed_description,
+    DROP COLUMN about_the_game,
+    DROP COLUMN short_description;
\ No newline at end of file
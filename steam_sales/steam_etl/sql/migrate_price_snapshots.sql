@@ -0,0 +1,4 @@
+-- Adds the price before discount to `price_snapshots` tables created without it.
+-- The next snapshot of every game is appended, as the latest one has no initial price to compare with.
+ALTER TABLE SteamSales.price_snapshots
+    ADD COLUMN initial_price INT UNSIGNED NULL AFTER currency;
\ No newline at end of file
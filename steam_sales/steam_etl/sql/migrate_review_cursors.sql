@@ -0,0 +1,4 @@
+-- Adds the state of the interrupted reads of the newest reviews to `review_cursors` tables created without it.
+ALTER TABLE SteamSales.review_cursors
+    ADD COLUMN head_cursor VARCHAR(255) NULL AFTER newest_created_at,
+    ADD COLUMN head_newest_created_at DATETIME NULL AFTER head_cursor;
\ No newline at end of file
@@ -0,0 +1,4 @@
+-- Adds the `details_updated_at` column to SteamSpy raw tables created before the bulk mode.
+-- Games without it have their tags, languages and genre requested again by the next bulk run.
+ALTER TABLE SteamSales.steamspy_games_raw
+    ADD COLUMN details_updated_at DATETIME NULL AFTER content_hash;
\ No newline at end of file
@@ -0,0 +1,32 @@
+-- Adds the `updated_at` watermarks to tables created before incremental cleaning.
+-- Existing rows are stamped with the current UTC time, the clock of the watermarks, so the next clean processes them.
+ALTER TABLE SteamSales.steamspy_games_raw
+    ADD COLUMN updated_at DATETIME NULL,
+    ADD INDEX ix_steamspy_games_raw_updated_at (updated_at);
+
+UPDATE SteamSales.steamspy_games_raw
+SET updated_at = UTC_TIMESTAMP();
+
+ALTER TABLE SteamSales.steamspy_games_raw
+    MODIFY COLUMN updated_at DATETIME NOT NULL;
+
+ALTER TABLE SteamSales.steam_games_raw
+    ADD COLUMN updated_at DATETIME NULL,
+    ADD INDEX ix_steam_games_raw_updated_at (updated_at);
+
+UPDATE SteamSales.steam_games_raw
+SET updated_at = UTC_TIMESTAMP();
+
+ALTER TABLE SteamSales.steam_games_raw
+    MODIFY COLUMN updated_at DATETIME NOT NULL;
+
+ALTER TABLE SteamSales.clean_game_data
+    ADD COLUMN source_updated_at DATETIME NULL AFTER steamspy_tags,
+    ADD COLUMN updated_at DATETIME NULL AFTER source_updated_at,
+    ADD INDEX ix_clean_game_data_updated_at (updated_at);
+
+UPDATE SteamSales.clean_game_data
+SET updated_at = UTC_TIMESTAMP();
+
+ALTER TABLE SteamSales.clean_game_data
+    MODIFY COLUMN updated_at DATETIME NOT NULL;
\ No newline at end of file
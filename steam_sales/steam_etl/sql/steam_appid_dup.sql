@@ -4,5 +4,10 @@ WHERE appid NOT IN (
         SELECT appid
         FROM steam_games_raw
     )
+    AND appid NOT IN (
+        SELECT appid
+        FROM fetch_retries
+        WHERE source = 'steam'
+    )
     AND NOT dne
 ORDER BY appid ASC;
\ No newline at end of file
@@ -0,0 +1,9 @@
+SELECT DISTINCT appid
+FROM steamspy_games_metadata
+WHERE appid NOT IN (
+        SELECT appid
+        FROM fetch_retries
+        WHERE source = 'steam'
+    )
+    AND NOT dne
+ORDER BY appid ASC;
\ No newline at end of file
@@ -0,0 +1,4 @@
+SELECT DISTINCT appid
+FROM steamspy_games_metadata
+ORDER BY
+    appid ASC;
\ No newline at end of file
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import os
 import re
 from functools import wraps
@@ -7,7 +9,7 @@ from sqlalchemy import text
 from steam_sales.steam_etl.crud import log_last_run_time
 from steam_sales.steam_etl.db import get_db
 from steam_sales.steam_etl.settings import Path, config
-from steam_sales.steam_etl.validation import LastRun
+from steam_sales.steam_etl.validation import LastRun, get_current_utc_time
 
 
 def print_steam_links(df):
@@ -69,9 +71,28 @@ def get_sql_query(file_name: str):
     return query
 
 
+def content_hash(payload) -> str:
+    """
+    Computes a stable hash of a fetched payload.
+
+    The payload is serialized with sorted keys, so the hash only changes when the content does.
+
+    Args:
+        payload: The JSON payload returned by an API.
+
+    Returns:
+        str: The 32 character hexadecimal hash of the payload.
+    """
+    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(serialized.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def log_last_run(scraper_name):
     """
     Decorator function that logs the last run time of a function.
+
+    The time logged is when the function started, so that the changes made while it ran are newer than the time logged.
+    Nothing is logged if the function raises.
     Args:
         scraper_name (str): The name of the scraper.
     Returns:
@@ -86,10 +107,11 @@ def log_last_run(scraper_name):
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            started_at = get_current_utc_time()
             result = func(*args, **kwargs)
 
             with get_db() as db:
-                last_run = LastRun(scraper=scraper_name)
+                last_run = LastRun(scraper=scraper_name, last_run=started_at)
                 log_last_run_time(last_run, db)
 
             return result
@@ -1,9 +1,10 @@
 import re
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, List, Optional, Union
 
 import pandas as pd
-from pydantic import BaseModel, Field, HttpUrl, field_validator
+from pydantic import BaseModel, Field, HttpUrl, TypeAdapter, ValidationError, field_validator
 
 from steam_sales.steam_etl.settings import get_logger
 
@@ -15,6 +16,43 @@ def get_current_utc_time():
     return datetime.now(timezone.utc)
 
 
+@lru_cache(maxsize=None)
+def get_list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """
+    Returns a TypeAdapter for lists of the given model. The adapter is built once per model and reused.
+
+    Args:
+        model (type[BaseModel]): The model of the list items.
+
+    Returns:
+        TypeAdapter: The adapter.
+    """
+    return TypeAdapter(List[model])
+
+
+def validate_batch(model: type[BaseModel], records: list) -> list:
+    """
+    Validates a batch of raw records in a single call and returns the model instances.
+
+    Records that fail validation are logged and dropped instead of failing the whole batch.
+
+    Args:
+        model (type[BaseModel]): The model to validate the records against.
+        records (list): The raw records, as dictionaries.
+
+    Returns:
+        list: The model instances of the valid records.
+    """
+    adapter = get_list_adapter(model)
+    try:
+        return adapter.validate_python(records)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors()}
+        for index in sorted(invalid):
+            logger.error(f"Dropping invalid {model.__name__} record for appid {records[index].get('appid')}")
+        return adapter.validate_python([record for i, record in enumerate(records) if i not in invalid])
+
+
 class GameMetaData(BaseModel):
     appid: int = Field(..., description="The application ID")
     name: str = Field(..., max_length=255, description="The name of the game")
@@ -50,6 +88,10 @@ class GameDetails(BaseModel):
     languages: Optional[str] = Field(None, description="The supported languages")
     genre: str = Field(..., description="The genre of the game")
     tags: Optional[Dict[str, int]] = Field(None, description="The tags associated with the game")
+    content_hash: Optional[str] = Field(None, max_length=32, description="The hash of the fetched payload")
+    details_updated_at: Optional[datetime] = Field(
+        None, description="When the tags, languages and genre were fetched, None if fetched with the record"
+    )
 
     @field_validator("tags", mode="before")
     def validate_tags(cls, v):
@@ -107,6 +149,7 @@ class Game(BaseModel):
     achievements: int = Field(..., description="Total number of attainable achievements")
     release_date: Optional[str] = Field(..., description="Date when the game was released")
     coming_soon: bool = Field(..., description="Indicates if the game release is upcoming")
+    content_hash: Optional[str] = Field(default=None, max_length=32, description="Hash of the fetched payload")
 
     @field_validator("required_age", mode="before")
     def validate_required_age(cls, v):
@@ -137,39 +180,61 @@ class GameList(BaseModel):
         return len(self.games)
 
 
+# Steam User Reviews
+class GameReview(BaseModel):
+    recommendationid: int = Field(..., description="ID of the review")
+    appid: int = Field(..., description="Application ID of the reviewed game")
+    language: str = Field(..., max_length=32, description="Language the review is written in")
+    voted_up: bool = Field(..., description="Indicates if the review recommends the game")
+    votes_up: int = Field(..., ge=0, description="Number of users who found the review helpful")
+    votes_funny: int = Field(..., ge=0, description="Number of users who found the review funny")
+    weighted_vote_score: float = Field(..., description="Helpfulness score of the review")
+    playtime_at_review: Optional[int] = Field(
+        None, ge=0, description="Playtime of the author when reviewing, in minutes"
+    )
+    steam_purchase: bool = Field(..., description="Indicates if the author bought the game on Steam")
+    received_for_free: bool = Field(..., description="Indicates if the author received the game for free")
+    written_during_early_access: bool = Field(..., description="Indicates if the review was written in early access")
+    created_at: datetime = Field(..., description="Creation time of the review, in UTC")
+    updated_at: datetime = Field(..., description="Last update time of the review, in UTC")
+
+
 # # Clean Data Details
 class Clean(BaseModel):
     name: str = Field(..., max_length=255, description="Name of the game")
     appid: int = Field(..., description="Application ID of the game")
-    required_age: int = Field(..., description="Minimum required age to play the game.")
-    controller_support: int = Field(..., description="Type of controller support for the game, if available")
-    dlc: int = Field(..., description="List of downloadable content IDs associated with the game, if any")
+    required_age: int = Field(..., ge=0, le=18, description="Minimum required age to play the game.")
+    controller_support: int = Field(
+        ..., ge=0, le=1, description="Type of controller support for the game, if available"
+    )
+    dlc: int = Field(..., ge=0, description="List of downloadable content IDs associated with the game, if any")
     requirements: str = Field(..., description="PC system requirements for the game")
-    platform: str = Field(..., description="Indicates if the game is available on PC platforms")
-    metacritic: int = Field(..., description="Metacritic score of the game, if available")
+    platform: str = Field(..., max_length=255, description="Indicates if the game is available on PC platforms")
+    metacritic: int = Field(..., ge=0, le=100, description="Metacritic score of the game, if available")
     categories: str = Field(..., description="Categories or genres of the game")
     genres: str = Field(..., description="Genres the game belongs to")
-    recommendations: int = Field(..., description="Number of recommendations from Steam users")
-    achievements: int = Field(..., description="Total number of attainable achievements")
+    recommendations: int = Field(..., ge=0, description="Number of recommendations from Steam users")
+    achievements: int = Field(..., ge=0, description="Total number of attainable achievements")
     release_date: Optional[datetime] = Field(None, description="Date when the game was released")
-    coming_soon: int = Field(..., description="Indicates if the game release is upcoming")
-    english: int = Field(..., description="Indicates if the game supports English language")
+    coming_soon: int = Field(..., ge=0, le=1, description="Indicates if the game release is upcoming")
+    english: int = Field(..., ge=0, le=1, description="Indicates if the game supports English language")
     developer: str = Field(..., description="Developer of the game")
     publisher: str = Field(..., description="Publisher of the game")
-    price: float = Field(..., description="Current price of the game")
+    price: float = Field(..., ge=-1, description="Current price of the game")
     description: str = Field(..., description="Description of the game")
     website: Optional[HttpUrl | str] = Field(..., description="Official website of the game")
     header_image: HttpUrl = Field(..., description="URL to the header image of the game")
     year: Optional[int] = Field(None, description="Year of the game release")
-    month: Optional[int] = Field(None, description="Month of the game release")
-    day: Optional[int] = Field(None, description="Day of the game release")
-    positive_ratings: int = Field(..., description="Number of positive ratings")
-    negative_ratings: int = Field(..., description="Number of negative ratings")
-    owners_in_millions: str = Field(..., description="Number of owners in millions")
-    average_forever: int = Field(..., description="Average playtime forever in minutes")
-    median_forever: int = Field(..., description="Median playtime forever in minutes")
+    month: Optional[int] = Field(None, ge=1, le=12, description="Month of the game release")
+    day: Optional[int] = Field(None, ge=1, le=31, description="Day of the game release")
+    positive_ratings: int = Field(..., ge=0, description="Number of positive ratings")
+    negative_ratings: int = Field(..., ge=0, description="Number of negative ratings")
+    owners_in_millions: str = Field(..., max_length=255, description="Number of owners in millions")
+    average_forever: int = Field(..., ge=0, description="Average playtime forever in minutes")
+    median_forever: int = Field(..., ge=0, description="Median playtime forever in minutes")
     languages: str = Field(..., description="Supported languages")
     steamspy_tags: Dict[str, int] = Field(..., description="Tags associated with the game")
+    source_updated_at: Optional[datetime] = Field(None, description="Latest update time of the raw records")
 
     @field_validator("steamspy_tags", mode="before")
     def validate_steamspy_tags(cls, v):
@@ -205,7 +270,7 @@ class LastRun(BaseModel):
 
     @field_validator("scraper", mode="before")
     def validate_scraper(cls, v):
-        allowed = ["meta", "steamspy", "steam", "cleaner"]
+        allowed = ["meta", "steamspy", "steam", "cleaner", "prices", "regional", "reviews", "refresh"]
         if isinstance(v, str):
             if v in allowed:
                 return v.lower()
@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import sqlalchemy
+
+# The settings need a database to point to, but the tests stand in for it and never connect
+for name, value in {
+    "MYSQL_USERNAME": "steam",
+    "MYSQL_PASSWORD": "steam",
+    "MYSQL_HOST": "localhost",
+    "MYSQL_PORT": "3306",
+    "MYSQL_DB_NAME": "SteamSales",
+}.items():
+    os.environ.setdefault(name, value)
+
+# `model` creates the tables when it is imported
+sqlalchemy.MetaData.create_all = lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def stand_in_server():
+    """
+    Starts a local HTTP server answering GET requests with a handler of the test.
+
+    The fixture is called with the handler, which receives the path and the query parameters of every request and
+    returns a status code and a JSON body. It returns the base URL of the server and the list of the requests
+    received, as (path, parameters) tuples.
+    """
+    servers = []
+
+    def start(handler):
+        received = []
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                parameters = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                received.append((url.path, parameters))
+
+                status, body = handler(url.path, parameters)
+                content = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}", received
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
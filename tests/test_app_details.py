@@ -0,0 +1,113 @@
+import pytest
+
+from steam_sales.steam_etl import fetcher
+from steam_sales.steam_etl.fetcher import AppDetailsFields, SteamStoreFetcher
+
+APPID = 620
+
+# The fields Steam returns for the "basic" filter
+BASIC = {
+    "type",
+    "name",
+    "steam_appid",
+    "required_age",
+    "dlc",
+    "detailed_description",
+    "about_the_game",
+    "supported_languages",
+    "header_image",
+    "website",
+    "pc_requirements",
+    "mac_requirements",
+    "linux_requirements",
+}
+
+APP_DETAILS = {
+    "type": "game",
+    "name": "Portal 2",
+    "steam_appid": APPID,
+    "required_age": 0,
+    "is_free": False,
+    "controller_support": "full",
+    "dlc": [323180],
+    "detailed_description": "<h2>Single player</h2>Portal 2 draws from the award-winning formula",
+    "about_the_game": "Portal 2 draws from the award-winning formula",
+    "short_description": "The sequel to the acclaimed Portal",
+    "supported_languages": "English<strong>*</strong>, French",
+    "reviews": "“A masterpiece”<br>10/10 – IGN",
+    "header_image": "https://cdn.akamai.steamstatic.com/steam/apps/620/header.jpg",
+    "capsule_image": "https://cdn.akamai.steamstatic.com/steam/apps/620/capsule_231x87.jpg",
+    "website": "http://www.thinkwithportals.com/",
+    "pc_requirements": {"minimum": "<strong>Minimum:</strong> 3.0 GHz P4"},
+    "mac_requirements": {"minimum": "<strong>Minimum:</strong> OS X 10.6.7"},
+    "linux_requirements": [],
+    "legal_notice": "© Valve Corporation",
+    "developers": ["Valve"],
+    "publishers": ["Valve"],
+    "price_overview": {"currency": "USD", "initial": 999, "final": 199, "discount_percent": 80},
+    "packages": [7877],
+    "platforms": {"windows": True, "mac": True, "linux": True},
+    "metacritic": {"score": 95, "url": "https://www.metacritic.com/game/pc/portal-2"},
+    "categories": [{"id": 2, "description": "Single-player"}],
+    "genres": [{"id": "1", "description": "Action"}],
+    "screenshots": [{"id": 0, "path_full": "https://cdn.akamai.steamstatic.com/steam/apps/620/ss_1.jpg"}],
+    "movies": [{"id": 81613, "name": "Portal 2 Trailer"}],
+    "recommendations": {"total": 390000},
+    "achievements": {"total": 51},
+    "release_date": {"coming_soon": False, "date": "18 Apr, 2011"},
+}
+
+
+def app_details(path, parameters):
+    """
+    Stand-in for the appdetails endpoint, returning the fields named in `filters` and the group of the basic fields.
+    """
+    data = APP_DETAILS
+    if "filters" in parameters:
+        fields = set(parameters["filters"].split(","))
+        if "basic" in fields:
+            fields |= BASIC
+        data = {key: value for key, value in APP_DETAILS.items() if key in fields}
+    return 200, {str(APPID): {"success": True, "data": data}}
+
+
+@pytest.fixture
+def store_fetcher(stand_in_server, monkeypatch):
+    monkeypatch.setattr(fetcher, "flag_faulty_appid", lambda appid, db: None)
+    url, received = stand_in_server(app_details)
+
+    def store_fetcher(**kwargs):
+        store_fetcher = SteamStoreFetcher(**kwargs)
+        store_fetcher.url = url
+        return store_fetcher, received
+
+    return store_fetcher
+
+
+def test_filtered_payload_is_parsed_like_the_full_one(store_fetcher):
+    full_fetcher, _ = store_fetcher(fields=AppDetailsFields.all)
+    (_, full), _, _, _ = full_fetcher.fetch_app(APPID)
+
+    filtered_fetcher, received = store_fetcher()
+    (_, filtered), size, _, failure = filtered_fetcher.fetch_app(APPID)
+
+    assert received[-1][1]["filters"] == filtered_fetcher.filters
+    assert failure is None
+    assert filtered == full
+    assert filtered["capsule_image"] == APP_DETAILS["capsule_image"]
+    assert filtered["reviews"] == "“A masterpiece”\n10/10 – IGN"
+    assert 0 < size < full_fetcher.last_response_size
+
+
+def test_unfiltered_samples_are_drawn_at_random(store_fetcher, monkeypatch):
+    sampling_fetcher, received = store_fetcher(sample_payloads=True)
+
+    monkeypatch.setattr(fetcher.random, "random", lambda: 0.5)
+    _, size, unfiltered_size, _ = sampling_fetcher.fetch_app(APPID)
+    assert unfiltered_size is None
+    assert len(received) == 1
+
+    monkeypatch.setattr(fetcher.random, "random", lambda: 0.001)
+    _, size, unfiltered_size, _ = sampling_fetcher.fetch_app(APPID)
+    assert "filters" not in received[-1][1]
+    assert unfiltered_size > size
@@ -0,0 +1,80 @@
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+import pytest
+from requests.exceptions import RequestException
+
+from steam_sales.steam_etl import fetcher, utils
+from steam_sales.steam_etl.fetcher import SteamStoreFetcher
+
+LAST_RUN = datetime(2024, 6, 1, 12, 0)
+
+# The apps changed since the last run, served in pages of two
+CHANGED = [10, 20, 30, 40, 50]
+
+
+def app_list(path, parameters):
+    after = int(parameters["last_appid"])
+    apps = [appid for appid in CHANGED if appid > after][:2]
+    response = {"apps": [{"appid": appid, "last_modified": 0} for appid in apps]}
+    if apps and apps[-1] != CHANGED[-1]:
+        response.update(have_more_results=True, last_appid=apps[-1])
+    return 200, {"response": response}
+
+
+@pytest.fixture
+def store_fetcher(monkeypatch):
+    monkeypatch.setattr(fetcher, "get_last_run_time", lambda scraper, db: LAST_RUN)
+
+    store_fetcher = SteamStoreFetcher(changes=True)
+    store_fetcher.change_feed_page_size = 2
+    return store_fetcher
+
+
+def test_pages_through_last_appid(stand_in_server, store_fetcher):
+    url, received = stand_in_server(app_list)
+    store_fetcher.change_feed_url = f"{url}/IStoreService/GetAppList/v1/"
+
+    assert store_fetcher.get_changed_appids(db=None) == CHANGED
+
+    assert [parameters["last_appid"] for _, parameters in received] == ["0", "20", "40"]
+    since = LAST_RUN.replace(tzinfo=timezone.utc) - store_fetcher.change_feed_overlap
+    assert {parameters["if_modified_since"] for _, parameters in received} == {str(int(since.timestamp()))}
+    assert {path for path, _ in received} == {"/IStoreService/GetAppList/v1/"}
+
+
+def test_page_failure_raises(stand_in_server, store_fetcher):
+    def failing_app_list(path, parameters):
+        if parameters["last_appid"] == "20":
+            return 500, {}
+        return app_list(path, parameters)
+
+    url, received = stand_in_server(failing_app_list)
+    store_fetcher.change_feed_url = f"{url}/IStoreService/GetAppList/v1/"
+
+    with pytest.raises(RequestException):
+        store_fetcher.get_changed_appids(db=None)
+    assert len(received) == 2
+
+
+def test_last_run_is_logged_with_the_start_time(monkeypatch):
+    logged = []
+    monkeypatch.setattr(utils, "get_db", nullcontext)
+    monkeypatch.setattr(utils, "log_last_run_time", lambda log, db: logged.append(log))
+
+    started = []
+
+    @utils.log_last_run(scraper_name="steam")
+    def run():
+        started.append(utils.get_current_utc_time())
+
+    run()
+    assert len(logged) == 1 and logged[0].last_run <= started[0]
+
+    @utils.log_last_run(scraper_name="steam")
+    def failing_run():
+        raise RequestException("Change feed stopped after 0 app IDs")
+
+    with pytest.raises(RequestException):
+        failing_run()
+    assert len(logged) == 1
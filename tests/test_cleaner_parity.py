@@ -0,0 +1,89 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+import polars as pl
+import pytest
+
+from steam_sales.steam_etl.cleaner import SteamStoreCleaner
+from steam_sales.steam_etl.polars_cleaner import PolarsSteamStoreCleaner
+
+
+def app(appid: int, **values) -> dict:
+    row = {
+        "type": "game",
+        "name": f"Game {appid}",
+        "appid": appid,
+        "required_age": 0,
+        "is_free": 0,
+        "controller_support": "full",
+        "dlc": json.dumps([appid + 1, appid + 2]),
+        "detailed_description": "A game",
+        "about_the_game": "About the game",
+        "short_description": "Short",
+        "supported_languages": "English<strong>*</strong>, French",
+        "reviews": None,
+        "header_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg",
+        "capsule_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/capsule_231x87.jpg",
+        "website": f"https://game{appid}.example",
+        "requirements": json.dumps({"minimum": "<strong>OS:</strong> Windows 10"}),
+        "developers": '["Valve"]',
+        "publishers": '["Valve"]',
+        "price_overview": json.dumps({"currency": "USD", "initial": 1999, "final": 999, "discount_percent": 50}),
+        "platform": json.dumps({"windows": True, "mac": True, "linux": False}),
+        "metacritic": 80,
+        "categories": json.dumps([{"id": 2, "description": "Single-player"}]),
+        "genres": json.dumps([{"id": "1", "description": "Action"}]),
+        "recommendations": 100,
+        "achievements": 10,
+        "release_date": "21 Oct, 2008",
+        "coming_soon": 0,
+        "updated_at": datetime(2024, 6, 1, appid),
+    }
+    row.update(values)
+    return row
+
+
+# A batch with missing DLC lists, websites, header images and ages out of range
+APPS = [
+    app(1),
+    app(2, dlc=None, website=None),
+    app(3, required_age=-1, header_image=None, controller_support=None),
+    app(4, required_age=17, dlc=None, price_overview=None, website=""),
+    app(5, required_age=12, dlc="[]", release_date="Coming soon", coming_soon=1),
+]
+
+
+def category_dtype(dtype):
+    # The unused categories differ between the backends
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category", dtype.categories.dtype, dtype.ordered
+    return dtype
+
+
+@pytest.fixture
+def cleaned(monkeypatch):
+    monkeypatch.setattr(SteamStoreCleaner, "translate", staticmethod(lambda text: text))
+
+    pandas_cleaner = SteamStoreCleaner(profile=False)
+    df = pandas_cleaner.process(pandas_cleaner.apply_dtypes(pd.DataFrame(APPS)))
+    polars_df = PolarsSteamStoreCleaner(profile=False).process(pl.DataFrame(APPS, infer_schema_length=None))
+    return df, polars_df
+
+
+def test_polars_backend_matches_pandas(cleaned):
+    df, polars_df = cleaned
+
+    assert list(polars_df.columns) == list(df.columns)
+    for col in df.columns:
+        assert category_dtype(polars_df[col].dtype) == category_dtype(df[col].dtype), col
+        assert polars_df[col].astype(object).where(polars_df[col].notna(), None).tolist() == (
+            df[col].astype(object).where(df[col].notna(), None).tolist()
+        ), col
+
+
+def test_missing_dlc_keeps_integer_categories(cleaned):
+    _, polars_df = cleaned
+
+    assert polars_df["dlc"].cat.categories.dtype == "int64"
+    assert polars_df["required_age"].dtype == pd.CategoricalDtype([0, 3, 7, 12, 16, 18], ordered=True)
@@ -0,0 +1,92 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+import pyarrow.dataset as ds
+import pytest
+
+from steam_sales.steam_etl import exporter
+from steam_sales.steam_etl.exporter import CleanDataExporter
+
+COLUMNS = ["appid", "name", "genres", "categories", "platform", "year", "updated_at"]
+
+
+def game(appid: int, year: int, updated_at: datetime) -> tuple:
+    return (appid, f"Game {appid}", "Action", "Single-player", "windows", year, updated_at)
+
+
+class CleanGameData:
+    """
+    Stand-in for `clean_game_data`, answering the export queries with the rows updated since the watermark.
+    """
+
+    def __init__(self, rows: list):
+        self.rows = rows
+
+    def execute(self, query, parameters=None):
+        since = (parameters or {}).get("since")
+        rows = [row for row in self.rows if since is None or row[-1] >= since]
+
+        class Result:
+            def fetchall(self):
+                return rows
+
+            def keys(self):
+                return COLUMNS
+
+        return Result()
+
+
+@pytest.fixture
+def clean_game_data(monkeypatch):
+    clean_game_data = CleanGameData(
+        [
+            game(10, 2000, datetime(2024, 6, 1)),
+            game(20, 2004, datetime(2024, 5, 1)),
+            game(30, None, datetime(2024, 5, 1)),
+        ]
+    )
+
+    @contextmanager
+    def get_db():
+        yield clean_game_data
+
+    monkeypatch.setattr(exporter, "get_db", get_db)
+    return clean_game_data
+
+
+def read_years(output_dir: str) -> dict:
+    dataset = ds.dataset(output_dir, format="parquet", partitioning="hive")
+    table = dataset.to_table(columns=["appid", "release_year"]).to_pandas()
+    return dict(zip(table["appid"], table["release_year"]))
+
+
+def test_update_replaces_the_old_and_new_partitions_only(tmp_path, clean_game_data):
+    output_dir = str(tmp_path / "clean_game_data")
+    assert CleanDataExporter(output_dir=output_dir).run() == 3
+    untouched = os.listdir(os.path.join(output_dir, "release_year=0"))
+    untouched_mtime = os.path.getmtime(os.path.join(output_dir, "release_year=0", untouched[0]))
+
+    # Game 10 gets a new release year
+    clean_game_data.rows[0] = game(10, 2004, datetime(2024, 6, 2))
+    assert CleanDataExporter(output_dir=output_dir).run() == 1
+
+    assert read_years(output_dir) == {10: 2004, 20: 2004, 30: 0}
+    assert not os.path.exists(os.path.join(output_dir, "release_year=2000"))
+    assert os.path.getmtime(os.path.join(output_dir, "release_year=0", untouched[0])) == untouched_mtime
+    assert CleanDataExporter(output_dir=output_dir).read_watermark() == datetime(2024, 6, 2)
+
+
+def test_failed_write_keeps_the_watermark(tmp_path, clean_game_data, monkeypatch):
+    output_dir = str(tmp_path / "clean_game_data")
+    CleanDataExporter(output_dir=output_dir).run()
+    clean_game_data.rows[1] = game(20, 2004, datetime(2024, 6, 2))
+
+    def failing_write(self, df, touched):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(CleanDataExporter, "write", failing_write)
+    with pytest.raises(OSError):
+        CleanDataExporter(output_dir=output_dir).run()
+
+    assert CleanDataExporter(output_dir=output_dir).read_watermark() == datetime(2024, 6, 1)
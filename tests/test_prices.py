@@ -0,0 +1,137 @@
+from contextlib import contextmanager, nullcontext
+
+import pytest
+from sqlalchemy import Insert, Select, TextClause, Update
+
+from steam_sales.steam_etl import fetcher, model, utils
+from steam_sales.steam_etl.fetcher import SteamPriceFetcher
+
+PORTAL = 400
+HALF_LIFE = 70
+DOTA = 570
+UNRELEASED = 3000
+
+
+class Result(list):
+    def fetchall(self):
+        return list(self)
+
+
+class PriceTables:
+    """
+    Stand-in for a session on `steam_games_raw` and `price_snapshots`, answering the statements of the price refresh.
+    """
+
+    def __init__(self, priced: list):
+        self.priced = priced
+        self.raw_prices = {}
+        self.snapshots = []
+
+    def execute(self, statement, parameters=None):
+        if isinstance(statement, TextClause):
+            # The priced games
+            return Result((appid,) for appid in self.priced)
+        if isinstance(statement, Select):
+            # The latest snapshot of every game
+            latest = {snapshot["appid"]: snapshot for snapshot in sorted(self.snapshots, key=self.captured_at)}
+            value_columns = [col.name for col in model.PriceSnapshot.__table__.columns if not col.primary_key]
+            return Result((appid, *(snapshot[col] for col in value_columns)) for appid, snapshot in latest.items())
+        if isinstance(statement, Insert):
+            self.snapshots.extend(parameters)
+        elif isinstance(statement, Update):
+            self.raw_prices.update({row["b_appid"]: row["b_price_overview"] for row in parameters})
+        return Result()
+
+    def commit(self):
+        pass
+
+    @staticmethod
+    def captured_at(snapshot: dict):
+        return snapshot["captured_at"]
+
+
+def price(initial: int, final: int, discount_percent: int = 0) -> dict:
+    return {"currency": "USD", "initial": initial, "final": final, "discount_percent": discount_percent}
+
+
+class AppPrices:
+    """
+    Stand-in for the appdetails endpoint filtered down to the `price_overview` of several apps.
+    """
+
+    def __init__(self, prices: dict):
+        self.prices = prices
+
+    def __call__(self, path, parameters):
+        assert parameters["filters"] == "price_overview"
+        response = {}
+        for appid in map(int, parameters["appids"].split(",")):
+            # Free games have an empty list as data
+            data = {"price_overview": self.prices[appid]} if appid in self.prices else []
+            response[str(appid)] = {"success": True, "data": data}
+        return 200, response
+
+
+@pytest.fixture
+def price_tables(monkeypatch):
+    price_tables = PriceTables(priced=[HALF_LIFE, PORTAL, DOTA, UNRELEASED])
+
+    @contextmanager
+    def get_db():
+        yield price_tables
+
+    monkeypatch.setattr(fetcher, "get_db", get_db)
+    monkeypatch.setattr(fetcher, "ensure_monthly_partitions", lambda table, db: None)
+    monkeypatch.setattr(utils, "get_db", nullcontext)
+    monkeypatch.setattr(utils, "log_last_run_time", lambda log, db: None)
+    return price_tables
+
+
+@pytest.fixture
+def app_prices(stand_in_server):
+    app_prices = AppPrices(
+        {
+            HALF_LIFE: price(999, 999),
+            PORTAL: price(1999, 999, 50),
+            # Announced in the store without a price yet
+            UNRELEASED: {"currency": "USD", "initial": 1999},
+        }
+    )
+    url, _ = stand_in_server(app_prices)
+
+    def refresh_prices():
+        price_fetcher = SteamPriceFetcher()
+        price_fetcher.url = f"{url}/api/appdetails/"
+        price_fetcher.run()
+
+    app_prices.refresh = refresh_prices
+    return app_prices
+
+
+def snapshot_prices(price_tables) -> list:
+    return [
+        (snapshot["appid"], snapshot["initial_price"], snapshot["final_price"]) for snapshot in price_tables.snapshots
+    ]
+
+
+def test_prices_without_a_final_price_are_skipped(price_tables, app_prices):
+    app_prices.refresh()
+
+    assert snapshot_prices(price_tables) == [(HALF_LIFE, 999, 999), (PORTAL, 1999, 999)]
+    assert price_tables.raw_prices == {HALF_LIFE: price(999, 999), PORTAL: price(1999, 999, 50)}
+
+
+def test_only_changed_prices_are_written(price_tables, app_prices):
+    app_prices.refresh()
+    price_tables.raw_prices = {}
+
+    app_prices.refresh()
+    assert len(price_tables.snapshots) == 2
+    assert price_tables.raw_prices == {}
+
+    # A new price before discount, with the same final price and discount
+    app_prices.prices[PORTAL] = price(2499, 999, 50)
+    app_prices.refresh()
+
+    assert snapshot_prices(price_tables)[2:] == [(PORTAL, 2499, 999)]
+    assert price_tables.raw_prices == {PORTAL: price(2499, 999, 50)}
@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+import pytest
+
+from steam_sales.steam_etl import fetcher
+from steam_sales.steam_etl.fetcher import SteamStoreFetcher
+from steam_sales.steam_etl.validation import get_current_utc_time
+
+PORTAL = 400
+HALF_LIFE = 70
+
+
+def app_details(appid: int) -> dict:
+    return {
+        "type": "game",
+        "name": f"Game {appid}",
+        "steam_appid": appid,
+        "required_age": 0,
+        "is_free": False,
+        "header_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg",
+        "capsule_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/capsule_231x87.jpg",
+        "pc_requirements": {"minimum": "<strong>Minimum:</strong> 1.7 GHz Processor"},
+        "developers": ["Valve"],
+        "publishers": ["Valve"],
+        "platforms": {"windows": True, "mac": True, "linux": True},
+        "release_date": {"coming_soon": False, "date": "10 Oct, 2007"},
+    }
+
+
+class AppDetails:
+    """
+    Stand-in for the appdetails endpoint, answering for the apps that are in `found` and failing the others.
+    """
+
+    def __init__(self, found: set):
+        self.found = found
+
+    def __call__(self, path, parameters):
+        appid = int(parameters["appids"])
+        if appid in self.found:
+            return 200, {str(appid): {"success": True, "data": app_details(appid)}}
+        return 200, {str(appid): {"success": False}}
+
+
+class RetryQueue:
+    """
+    In-memory `fetch_retries` table, with the functions of `crud` that read and write it.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def get_retry_attempts(self, source, appids, db):
+        return {appid: self.rows[source, appid]["attempts"] for appid in appids if (source, appid) in self.rows}
+
+    def update_retries(self, source, retries, succeeded, db):
+        self.rows.update({(retry["source"], retry["appid"]): retry for retry in retries})
+        for appid in succeeded:
+            self.rows.pop((source, appid), None)
+
+    def get_due_retries(self, source, db):
+        now = get_current_utc_time()
+        due = [
+            row
+            for (row_source, _), row in self.rows.items()
+            if row_source == source and row["next_attempt_at"] is not None and row["next_attempt_at"] <= now
+        ]
+        return [row["appid"] for row in sorted(due, key=lambda row: row["next_attempt_at"])]
+
+    def wait(self, delay: timedelta):
+        for row in self.rows.values():
+            row["next_attempt_at"] -= delay
+
+
+@pytest.fixture
+def retry_queue(monkeypatch):
+    retry_queue = RetryQueue()
+    for name in ["get_retry_attempts", "update_retries", "get_due_retries"]:
+        monkeypatch.setattr(fetcher, name, getattr(retry_queue, name))
+    return retry_queue
+
+
+@pytest.fixture
+def written(monkeypatch):
+    written = []
+
+    def bulk_ingest_steam_data(games, db):
+        written.extend(games.games)
+        return len(games.games)
+
+    monkeypatch.setattr(fetcher, "get_content_hashes", lambda table, appids, db: {})
+    monkeypatch.setattr(fetcher, "bulk_ingest_steam_data", bulk_ingest_steam_data)
+    # The worker processes are forked after the patch, so they do not flag the missing apps in the database
+    monkeypatch.setattr(fetcher, "flag_faulty_appid", lambda appid, db: None)
+    return written
+
+
+def test_missing_app_is_retried_until_found(stand_in_server, retry_queue, written):
+    app_details_endpoint = AppDetails(found={HALF_LIFE})
+    url, _ = stand_in_server(app_details_endpoint)
+
+    store_fetcher = SteamStoreFetcher()
+    store_fetcher.url = url
+
+    # The missing app is queued, due after the delay of a missing app
+    store_fetcher.ingest_batches([HALF_LIFE, PORTAL], db=None)
+
+    assert [game.appid for game in written] == [HALF_LIFE]
+    assert store_fetcher.failed_appids == {PORTAL}
+    assert retry_queue.rows["steam", PORTAL]["kind"] == "not_found"
+    assert retry_queue.rows["steam", PORTAL]["attempts"] == 1
+    assert fetcher.get_due_retries("steam", None) == []
+
+    # It is retried once due, and waits twice as long after failing again
+    retry_queue.wait(SteamStoreFetcher.retry_delays["not_found"])
+    assert fetcher.get_due_retries("steam", None) == [PORTAL]
+
+    store_fetcher.ingest_batches(fetcher.get_due_retries("steam", None), db=None)
+
+    retry = retry_queue.rows["steam", PORTAL]
+    assert retry["attempts"] == 2
+    delay = retry["next_attempt_at"] - retry["last_failed_at"]
+    assert delay == 2 * SteamStoreFetcher.retry_delays["not_found"]
+
+    # Once found, it is written and leaves the queue
+    retry_queue.wait(delay)
+    app_details_endpoint.found.add(PORTAL)
+    store_fetcher.ingest_batches(fetcher.get_due_retries("steam", None), db=None)
+
+    assert [game.appid for game in written] == [HALF_LIFE, PORTAL]
+    assert store_fetcher.failed_appids == set()
+    assert retry_queue.rows == {}
+
+
+def test_failed_write_keeps_the_app_queued(stand_in_server, retry_queue, written, monkeypatch):
+    app_details_endpoint = AppDetails(found={HALF_LIFE})
+    url, _ = stand_in_server(app_details_endpoint)
+
+    store_fetcher = SteamStoreFetcher()
+    store_fetcher.url = url
+    store_fetcher.ingest_batches([PORTAL], db=None)
+
+    # Found on its retry, but the write fails
+    retry_queue.wait(SteamStoreFetcher.retry_delays["not_found"])
+    app_details_endpoint.found.add(PORTAL)
+    monkeypatch.setattr(fetcher, "bulk_ingest_steam_data", lambda games, db: 0)
+    store_fetcher.ingest_batches(fetcher.get_due_retries("steam", None), db=None)
+
+    assert written == []
+    assert retry_queue.rows["steam", PORTAL]["attempts"] == 1
+    assert fetcher.get_due_retries("steam", None) == [PORTAL]
@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from steam_sales.steam_etl.fetcher import SteamReviewFetcher
+
+APPID = 570
+START = int(datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp())
+
+
+def review(recommendationid: int) -> dict:
+    # One review an hour, in the order of their IDs
+    created = START + recommendationid * 3600
+    return {
+        "recommendationid": str(recommendationid),
+        "author": {"steamid": "76561197960287930", "playtime_at_review": 120},
+        "language": "english",
+        "voted_up": True,
+        "votes_up": 1,
+        "votes_funny": 0,
+        "weighted_vote_score": "0.5",
+        "steam_purchase": True,
+        "received_for_free": False,
+        "written_during_early_access": False,
+        "timestamp_created": created,
+        "timestamp_updated": created,
+    }
+
+
+def created_at(recommendationid: int) -> datetime:
+    return SteamReviewFetcher.parse_review(APPID, review(recommendationid))["created_at"]
+
+
+class AppReviews:
+    """
+    Stand-in for the appreviews endpoint, serving the reviews of an app newest first, two per page.
+
+    A cursor points after the last review of its page, so it stays valid when newer reviews are posted, and the last
+    page returns no reviews with the cursor it was asked with.
+    """
+
+    page_size = 2
+
+    def __init__(self, count: int):
+        self.reviews = [review(recommendationid) for recommendationid in range(count, 0, -1)]
+        self.failing_cursors = set()
+
+    def post(self, count: int):
+        newest = int(self.reviews[0]["recommendationid"])
+        self.reviews = [
+            review(recommendationid) for recommendationid in range(newest + count, newest, -1)
+        ] + self.reviews
+
+    def __call__(self, path, parameters):
+        cursor = parameters["cursor"]
+        if cursor in self.failing_cursors:
+            return 500, {}
+
+        ids = [item["recommendationid"] for item in self.reviews]
+        start = 0 if cursor == "*" else ids.index(cursor.removeprefix("after-")) + 1
+        page = self.reviews[start : start + self.page_size]
+        next_cursor = f"after-{page[-1]['recommendationid']}" if page else cursor
+        return 200, {"success": 1, "reviews": page, "cursor": next_cursor}
+
+
+@pytest.fixture
+def app_reviews():
+    return AppReviews(count=6)
+
+
+@pytest.fixture
+def review_fetcher(stand_in_server, app_reviews):
+    url, _ = stand_in_server(app_reviews)
+
+    review_fetcher = SteamReviewFetcher(max_pages=2, requests_per_minute=60000)
+    review_fetcher.url = f"{url}/appreviews"
+    review_fetcher.page_size = app_reviews.page_size
+    return review_fetcher
+
+
+def ids(reviews: list) -> list:
+    return [int(item["recommendationid"]) for item in reviews]
+
+
+def test_first_backfill(review_fetcher):
+    reviews, state = review_fetcher.fetch_app_reviews(APPID, None)
+
+    assert ids(reviews) == [6, 5, 4, 3]
+    assert state == {
+        "appid": APPID,
+        "cursor": "after-3",
+        "newest_created_at": created_at(6),
+        "head_cursor": None,
+        "head_newest_created_at": None,
+    }
+
+
+def test_resumes_from_the_stored_cursor(review_fetcher):
+    _, state = review_fetcher.fetch_app_reviews(APPID, None)
+    reviews, state = review_fetcher.fetch_app_reviews(APPID, state)
+
+    assert ids(reviews) == [2, 1]
+    assert state["cursor"] is None
+    assert state["newest_created_at"] == created_at(6)
+
+
+def test_head_read_stops_at_the_newest_stored_review(review_fetcher, app_reviews):
+    state = {"appid": APPID, "cursor": None, "newest_created_at": created_at(6)}
+    app_reviews.post(3)
+
+    reviews, state = review_fetcher.fetch_app_reviews(APPID, state)
+
+    assert ids(reviews) == [9, 8, 7]
+    assert state["cursor"] is None
+    assert state["newest_created_at"] == created_at(9)
+    assert state["head_cursor"] is None and state["head_newest_created_at"] is None
+
+
+def test_capped_head_read_resumes_where_it_stopped(review_fetcher, app_reviews):
+    state = {"appid": APPID, "cursor": None, "newest_created_at": created_at(6)}
+    app_reviews.post(5)
+
+    reviews, state = review_fetcher.fetch_app_reviews(APPID, state)
+
+    assert ids(reviews) == [11, 10, 9, 8]
+    assert state["newest_created_at"] == created_at(6)
+    assert state["head_cursor"] == "after-8"
+    assert state["head_newest_created_at"] == created_at(11)
+
+    # Reviews posted in between are read by the next head read, from the top
+    app_reviews.post(1)
+    reviews, state = review_fetcher.fetch_app_reviews(APPID, state)
+
+    assert ids(reviews) == [7]
+    assert state["newest_created_at"] == created_at(11)
+    assert state["head_cursor"] is None and state["head_newest_created_at"] is None
+
+    reviews, state = review_fetcher.fetch_app_reviews(APPID, state)
+    assert ids(reviews) == [12]
+    assert state["newest_created_at"] == created_at(12)
+
+
+def test_page_failure_keeps_the_cursor(review_fetcher, app_reviews):
+    _, state = review_fetcher.fetch_app_reviews(APPID, None)
+    app_reviews.failing_cursors.add(state["cursor"])
+
+    reviews, failed_state = review_fetcher.fetch_app_reviews(APPID, state)
+
+    assert reviews == []
+    assert failed_state == state
@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from steam_sales.steam_etl import fetcher
+from steam_sales.steam_etl.fetcher import PlayerCountSampler
+
+DOTA = 570
+COUNTER_STRIKE = 730
+TEAM_FORTRESS = 440
+PLAYER_COUNTS = {DOTA: 650000, COUNTER_STRIKE: 1300000}
+
+
+def current_players(path, parameters):
+    appid = int(parameters["appid"])
+    if appid not in PLAYER_COUNTS:
+        return 500, {}
+    return 200, {"response": {"player_count": PLAYER_COUNTS[appid], "result": 1}}
+
+
+class TopGames:
+    """
+    Stand-in for a session on `steamspy_games_raw`, answering the query of the most played games.
+    """
+
+    def execute(self, query, parameters=None):
+        class Result:
+            def fetchall(self):
+                return [(appid,) for appid in [COUNTER_STRIKE, DOTA, TEAM_FORTRESS]][: parameters["limit"]]
+
+        return Result()
+
+
+@pytest.fixture
+def samples(monkeypatch):
+    """
+    The samples written per session, with the second session losing its connection while writing.
+    """
+    samples = []
+
+    @contextmanager
+    def get_db():
+        samples.append([])
+        yield TopGames()
+
+    def insert_player_counts(records, db):
+        if len(samples) == 2:
+            raise OperationalError("INSERT INTO player_counts", {}, Exception("Lost connection to MySQL server"))
+        samples[-1].extend(records)
+        return len(records)
+
+    monkeypatch.setattr(fetcher, "get_db", get_db)
+    monkeypatch.setattr(fetcher, "ensure_monthly_partitions", lambda table, db: None)
+    monkeypatch.setattr(fetcher, "insert_player_counts", insert_player_counts)
+    return samples
+
+
+def test_sampler_keeps_running_through_a_failed_sample(stand_in_server, samples):
+    url, received = stand_in_server(current_players)
+
+    sampler = PlayerCountSampler(top_n=3, interval=timedelta(0), samples=3, requests_per_minute=60000, max_workers=2)
+    sampler.url = f"{url}/ISteamUserStats/GetNumberOfCurrentPlayers/v1/"
+    sampler.run()
+
+    # Every sample requests every game once, and the game that failed is left out of its sample
+    assert len(received) == 9
+    assert [sorted(record["appid"] for record in sample) for sample in samples] == [
+        [DOTA, COUNTER_STRIKE],
+        [],
+        [DOTA, COUNTER_STRIKE],
+    ]
+    assert {record["player_count"] for record in samples[2]} == set(PLAYER_COUNTS.values())
@@ -0,0 +1,147 @@
+from contextlib import contextmanager, nullcontext
+
+import pytest
+
+from steam_sales.steam_etl import fetcher, scheduler, utils
+from steam_sales.steam_etl.scheduler import RefreshScheduler
+from steam_sales.steam_etl.settings import config
+
+HALF_LIFE = 70
+PORTAL = 400
+TEAM_FORTRESS = 440
+DOTA = 570
+
+
+def app_details(appid: int) -> dict:
+    return {
+        "type": "game",
+        "name": f"Game {appid}",
+        "steam_appid": appid,
+        "required_age": 0,
+        "is_free": False,
+        "header_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/header.jpg",
+        "capsule_image": f"https://cdn.akamai.steamstatic.com/steam/apps/{appid}/capsule_231x87.jpg",
+        "pc_requirements": {"minimum": "<strong>Minimum:</strong> 1.7 GHz Processor"},
+        "developers": ["Valve"],
+        "publishers": ["Valve"],
+        "platforms": {"windows": True, "mac": True, "linux": True},
+        "release_date": {"coming_soon": False, "date": "10 Oct, 2007"},
+    }
+
+
+def steamspy_details(appid: int) -> dict:
+    return {
+        "appid": appid,
+        "name": f"Game {appid}",
+        "developer": "Valve",
+        "publisher": "Valve",
+        "score_rank": "",
+        "positive": 1000,
+        "negative": 100,
+        "userscore": 0,
+        "owners": "1,000,000 .. 2,000,000",
+        "average_forever": 600,
+        "average_2weeks": 30,
+        "median_forever": 300,
+        "median_2weeks": 15,
+        "price": "999",
+        "initialprice": "999",
+        "discount": "0",
+        "ccu": 500,
+        "languages": "English",
+        "genre": "Action",
+        "tags": {"Action": 100},
+    }
+
+
+class Stores:
+    """
+    Stand-in for the Steam Store and SteamSpy APIs, answering for the apps that are in `found` and failing the
+    others.
+    """
+
+    def __init__(self, found: set):
+        self.found = found
+
+    def __call__(self, path, parameters):
+        if path == "/api/appdetails/":
+            appid = int(parameters["appids"])
+            if appid in self.found:
+                return 200, {str(appid): {"success": True, "data": app_details(appid)}}
+            return 200, {str(appid): {"success": False}}
+
+        appid = int(parameters["appid"])
+        if appid in self.found:
+            return 200, steamspy_details(appid)
+        return 500, {}
+
+
+class RawTables:
+    """
+    Stand-in for a session on the raw tables, answering the query of the overdue records with the given rows.
+    """
+
+    def __init__(self, overdue: list):
+        self.overdue = overdue
+        self.parameters = None
+
+    def execute(self, query, parameters=None):
+        self.parameters = parameters
+        rows = self.overdue[: parameters["budget"]]
+
+        class Result:
+            def fetchall(self):
+                return rows
+
+        return Result()
+
+
+@pytest.fixture
+def raw_tables(monkeypatch):
+    raw_tables = RawTables([("steam", HALF_LIFE), ("steamspy", DOTA), ("steam", PORTAL), ("steamspy", TEAM_FORTRESS)])
+
+    @contextmanager
+    def get_db():
+        yield raw_tables
+
+    monkeypatch.setattr(scheduler, "get_db", get_db)
+    monkeypatch.setattr(scheduler, "ensure_monthly_partitions", lambda table, db: None)
+    monkeypatch.setattr(utils, "get_db", nullcontext)
+    monkeypatch.setattr(utils, "log_last_run_time", lambda log, db: None)
+    return raw_tables
+
+
+@pytest.fixture
+def refreshed(monkeypatch):
+    refreshed = {}
+    monkeypatch.setattr(scheduler, "mark_refreshed", lambda source, appids, db: refreshed.update({source: appids}))
+
+    monkeypatch.setattr(fetcher, "get_content_hashes", lambda table, appids, db: {})
+    monkeypatch.setattr(fetcher, "bulk_ingest_steam_data", lambda games, db: len(games.games))
+    monkeypatch.setattr(fetcher, "bulk_ingest_steamspy_data", lambda games, db: len(games.games))
+    monkeypatch.setattr(fetcher, "get_retry_attempts", lambda source, appids, db: {})
+    monkeypatch.setattr(fetcher, "update_retries", lambda source, retries, succeeded, db: None)
+    # The worker processes are forked after the patch, so they do not flag the missing apps in the database
+    monkeypatch.setattr(fetcher, "flag_faulty_appid", lambda appid, db: None)
+    return refreshed
+
+
+def test_overdue_records_are_grouped_per_source_within_the_budget(raw_tables):
+    overdue = RefreshScheduler(budget=3).get_overdue(raw_tables)
+
+    assert overdue == {"steam": [HALF_LIFE, PORTAL], "steamspy": [DOTA]}
+    assert raw_tables.parameters["budget"] == 3
+    assert raw_tables.parameters["popular_ttl"] == RefreshScheduler.ttl_hours["popular"]
+
+
+def test_failed_records_are_not_marked_refreshed(stand_in_server, raw_tables, refreshed, monkeypatch):
+    url, _ = stand_in_server(Stores(found={HALF_LIFE, DOTA}))
+    monkeypatch.setattr(config, "STEAMSPY_BASE_URL", f"{url}/api.php")
+
+    refresh_scheduler = RefreshScheduler()
+    refresh_scheduler.fetchers["steam"].url = url
+    refresh_scheduler.run()
+
+    assert refresh_scheduler.fetchers["steam"].failed_appids == {PORTAL}
+    assert refresh_scheduler.fetchers["steamspy"].failed_appids == {TEAM_FORTRESS}
+    assert refreshed == {"steam": [HALF_LIFE], "steamspy": [DOTA]}
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from steam_sales.steam_etl import cleaner
+from steam_sales.steam_etl.cleaner import SteamDataClean
+
+LAST_RUN = datetime(2024, 6, 1, 12, 0)
+
+
+@pytest.fixture
+def raw_tables(monkeypatch):
+    """
+    Stand-in for the raw and clean tables, in an in-memory SQLite database with the `SteamSales` schema.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS SteamSales")
+        dbapi_connection.create_function("GREATEST", -1, lambda *values: None if None in values else max(values))
+
+    with engine.begin() as db:
+        for table in ["steam_games_raw", "steamspy_games_raw"]:
+            db.execute(text(f"CREATE TABLE SteamSales.{table} (appid INTEGER PRIMARY KEY, updated_at DATETIME)"))
+        db.execute(
+            text("CREATE TABLE SteamSales.clean_game_data (appid INTEGER PRIMARY KEY, source_updated_at DATETIME)")
+        )
+
+    @contextmanager
+    def get_db():
+        with engine.begin() as db:
+            yield db
+
+    monkeypatch.setattr(cleaner, "get_db", get_db)
+    monkeypatch.setattr(cleaner, "get_last_run_time", lambda scraper, db: LAST_RUN)
+    return get_db
+
+
+def add_game(db, appid: int, steam_updated_at: datetime, steamspy_updated_at: datetime, cleaned_at: datetime = None):
+    for table, updated_at in [("steam_games_raw", steam_updated_at), ("steamspy_games_raw", steamspy_updated_at)]:
+        db.execute(
+            text(f"INSERT INTO SteamSales.{table} VALUES (:appid, :updated_at)"),
+            {"appid": appid, "updated_at": updated_at},
+        )
+    if cleaned_at:
+        db.execute(
+            text("INSERT INTO SteamSales.clean_game_data VALUES (:appid, :cleaned_at)"),
+            {"appid": appid, "cleaned_at": cleaned_at},
+        )
+
+
+def test_watermark_is_the_last_run_minus_the_overlap(raw_tables, monkeypatch):
+    assert SteamDataClean(watermark_overlap=timedelta(minutes=30)).get_watermark() == LAST_RUN - timedelta(minutes=30)
+
+    monkeypatch.setattr(cleaner, "get_last_run_time", lambda scraper, db: None)
+    assert SteamDataClean().get_watermark() == datetime(1970, 1, 1)
+
+
+def test_overlap_selects_the_records_not_cleaned_yet(raw_tables):
+    before = LAST_RUN - timedelta(hours=3)
+    in_overlap = LAST_RUN - timedelta(minutes=30)
+    after = LAST_RUN + timedelta(hours=1)
+
+    with raw_tables() as db:
+        # Cleaned by an earlier run
+        add_game(db, 1, before, before, cleaned_at=before)
+        # Cleaned by the last run while it was written, then left as is
+        add_game(db, 2, in_overlap, before, cleaned_at=in_overlap)
+        # Written while the last run was cleaning, after it read the raw records
+        add_game(db, 3, in_overlap, before, cleaned_at=before)
+        # SteamSpy record updated since the last run
+        add_game(db, 4, before, after, cleaned_at=before)
+        # New game
+        add_game(db, 5, after, after)
+
+    clean = SteamDataClean(watermark_overlap=timedelta(hours=1))
+    assert clean.get_changed_appids(clean.get_watermark()).tolist() == [3, 4, 5]
+
+    # Without the overlap, the record written during the last run is missed
+    clean = SteamDataClean(watermark_overlap=timedelta(0))
+    assert clean.get_changed_appids(clean.get_watermark()).tolist() == [4, 5]